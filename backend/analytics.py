@@ -0,0 +1,114 @@
+"""Kur geçmişi üzerinde vektörel analizler: getiri, volatilite, hareketli ortalama, korelasyon.
+
+Hesaplar ``history.load_history_frame`` ile yüklenen tarih × döviz kodu
+DataFrame'i üzerinde pandas ile yapılır. Sonuçlar parametreler ve kur
+sürümüyle anahtarlanarak Redis'te saklanır; yeni bir gün yazıldığında sürüm
+değiştiği için eski sonuçlar kendiliğinden geçersiz olur.
+"""
+import hashlib
+import json
+from datetime import timedelta
+
+import numpy as np
+
+from history import json_dates, json_values
+from metrics import record_cache
+
+METRICS = ('returns', 'volatility', 'moving-average', 'correlation')
+
+# Yıllıklandırmada kullanılan işlem günü sayısı
+TRADING_DAYS = 252
+
+# Kabul edilen en uzun pencere (iş günü); geriye dönük yükleme bununla sınırlı kalır
+MAX_WINDOW = 365
+
+
+def lookback_start(start_date, window):
+    """Pencerenin ilk günlerinin boş kalmaması için başlangıcı geriye çeker"""
+    if not start_date or not window:
+        return start_date
+    # İş günü sayısını takvim gününe çevir, tatiller için pay bırak
+    return start_date - timedelta(days=window * 7 // 5 + 10)
+
+
+def daily_returns(frame, log=False):
+    if log:
+        return np.log(frame / frame.shift(1))
+    return frame.pct_change(fill_method=None)
+
+
+def rolling_volatility(frame, window, annualize=True):
+    volatility = daily_returns(frame, log=True).rolling(window).std()
+    if annualize:
+        volatility = volatility * np.sqrt(TRADING_DAYS)
+    return volatility
+
+
+def moving_average(frame, window, kind='sma'):
+    if kind == 'ema':
+        return frame.ewm(span=window, adjust=False, min_periods=window).mean()
+    return frame.rolling(window).mean()
+
+
+def compute(metric, frame, window=20, log=False, kind='sma', method='pearson', start_date=None):
+    """İstenen analizi hesaplayıp API çıktısını döndürür"""
+    if metric == 'correlation':
+        returns = daily_returns(frame, log=log)
+        # Geriye dönük yüklenen gün yalnızca aralığın ilk getirisini hesaplamak içindir
+        if start_date is not None:
+            returns = returns[returns.index >= str(start_date)]
+        corr = returns.corr(method=method)
+        return {
+            'codes': list(corr.columns),
+            'matrix': [json_values(corr[code]) for code in corr.columns]
+        }
+
+    if metric == 'returns':
+        result = daily_returns(frame, log=log)
+    elif metric == 'volatility':
+        result = rolling_volatility(frame, window)
+    else:
+        result = moving_average(frame, window, kind)
+
+    # Geriye dönük yüklenen günler yalnızca pencereyi doldurmak içindir
+    if start_date is not None:
+        result = result[result.index >= str(start_date)]
+
+    return {
+        'dates': json_dates(result.index),
+        'series': {code: json_values(result[code]) for code in result.columns}
+    }
+
+
+class AnalyticsCache:
+    """Analiz sonuçlarını (parametreler, kur sürümü) anahtarıyla Redis'te saklar"""
+
+    def __init__(self, redis_client=None, ttl=86400):
+        self._redis = redis_client
+        self._ttl = ttl
+
+    def key(self, version, params):
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+        return f'analytics:{version}:{digest}'
+
+    def get_or_compute(self, version, params, compute):
+        if not self._redis or version is None:
+            return compute()
+
+        key = self.key(version, params)
+        try:
+            cached = self._redis.get(key)
+        except Exception as e:
+            print(f"Analiz cache okuma hatası: {e}")
+            cached = None
+
+        record_cache('analytics', bool(cached))
+        if cached:
+            return json.loads(cached)
+
+        result = compute()
+        try:
+            self._redis.setex(key, self._ttl, json.dumps(result))
+        except Exception as e:
+            print(f"Analiz cache yazma hatası: {e}")
+        return result
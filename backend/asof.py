@@ -0,0 +1,151 @@
+"""Geçmiş bir tarihteki kurlarla (as-of) döviz dönüşümü.
+
+Kur yayınlanmayan günler (hafta sonu, resmi tatil) o günden önceki son iş
+gününe çözülür. Çözümleme bellekteki sıralı tarih dizisi üzerinde ikili arama
+(``searchsorted``) ile yapılır, istek başına tarih sorgusu atılmaz. Kurlar
+mmap kur deposundan, depo yoksa yalnızca gereken günler için veritabanından
+okunur. Her kalemin kendi tarihi olabilir; aynı güne düşen kalemler tek bir
+kur satırını paylaşır.
+"""
+from collections import namedtuple
+
+import numpy as np
+from sqlalchemy import select
+
+from common.db import doviz_kurlari
+from conversion import lookup_codes, to_float
+
+AsOfResult = namedtuple('AsOfResult', ['converted', 'from_rates', 'to_rates', 'rate_dates', 'errors'])
+
+
+class StoreHistory:
+    """mmap kur deposu üzerinden geçmiş satış kurları"""
+
+    def __init__(self, store):
+        self._store = store
+        self._field = store.fields.index('satis_kuru')
+        self.dates = store.dates
+
+    def sell_rates(self, positions):
+        """Günlerin satış kurlarını (TRY son sütunda 1.0) ve kod → sütun eşlemesini döndürür"""
+        index = dict(self._store.code_index, TRY=len(self._store.codes))
+        rates = self._store.values[positions, :, self._field]
+        return index, np.hstack([rates, np.ones((len(positions), 1))])
+
+
+def load_dates(connection):
+    """Kur bulunan günleri sıralı olarak okur"""
+    stmt = select(doviz_kurlari.c.tarih).distinct().order_by(doviz_kurlari.c.tarih)
+    return np.array(connection.execute(stmt).scalars().all(), dtype='datetime64[D]')
+
+
+class DateIndexCache:
+    """Veritabanındaki tarih dizisini kur görüntüsünün sürümü değişene kadar bellekte tutar.
+
+    ``token`` süreç içi kur görüntüsünün sürümüdür (bkz. ``snapshot_token``);
+    Redis yokken de her yazımla değişir, bu yüzden hiçbir zaman None değildir.
+    """
+
+    def __init__(self):
+        self._token = None
+        self._dates = None
+
+    def get(self, token, connection):
+        if self._dates is None or token != self._token:
+            self._dates = load_dates(connection)
+            self._token = token
+        return self._dates
+
+
+class DatabaseHistory:
+    """Kur deposu yokken kullanılır; kurlar yalnızca gereken günler için okunur"""
+
+    def __init__(self, dates, connection):
+        self.dates = dates
+        self._connection = connection
+
+    def sell_rates(self, positions):
+        days = self.dates[positions].astype(object).tolist()
+        rows = self._connection.execute(
+            select(doviz_kurlari.c.tarih, doviz_kurlari.c.doviz_kodu, doviz_kurlari.c.satis_kuru)
+            .where(doviz_kurlari.c.tarih.in_(set(days)))
+        ).all()
+
+        codes = sorted({row.doviz_kodu for row in rows})
+        index = {code: i for i, code in enumerate(codes)}
+        index['TRY'] = len(codes)
+        row_of = {day: i for i, day in enumerate(days)}
+
+        rates = np.full((len(days), len(codes) + 1), np.nan)
+        rates[:, -1] = 1.0
+        for row in rows:
+            rates[row_of[row.tarih], index[row.doviz_kodu]] = row.satis_kuru
+        return index, rates
+
+
+def parse_days(values):
+    """YYYY-MM-DD metinlerini datetime64[D] dizisine çevirir; boşlar None, hatalılar NaT olur"""
+    days = np.full(len(values), np.datetime64('NaT'), dtype='datetime64[D]')
+    latest = np.zeros(len(values), dtype=bool)
+    for i, value in enumerate(values):
+        if value is None:
+            latest[i] = True
+        elif isinstance(value, str) and len(value) == 10:
+            try:
+                days[i] = np.datetime64(value, 'D')
+            except ValueError:
+                pass
+    return days, latest
+
+
+def convert_as_of(history, amounts, from_codes, to_codes, dates):
+    """Her kalemi kendi tarihindeki (veya önceki son iş günündeki) kurla çevirir.
+
+    ``dates`` YYYY-MM-DD metinleridir; None olan kalemler en son kur günüyle
+    çevrilir. Geçersiz kalemlerin sonucu NaN, hata mesajı ``errors`` içindedir.
+    """
+    n = len(amounts)
+    amounts = np.fromiter((to_float(a) for a in amounts), dtype=np.float64, count=n)
+    days, latest = parse_days(dates)
+
+    positions = np.searchsorted(history.dates, days, side='right') - 1
+    positions[latest] = len(history.dates) - 1
+    has_day = (~np.isnat(days) | latest) & (positions >= 0)
+
+    converted = np.full(n, np.nan)
+    from_rates = np.full(n, np.nan)
+    to_rates = np.full(n, np.nan)
+    rate_dates = [None] * n
+
+    unique_positions, inverse = np.unique(positions[has_day], return_inverse=True)
+    if len(unique_positions):
+        index, rates = history.sell_rates(unique_positions)
+        from_idx = lookup_codes(index, from_codes)
+        to_idx = lookup_codes(index, to_codes)
+
+        rows = np.full(n, -1, dtype=np.intp)
+        rows[has_day] = inverse
+        usable = has_day & (from_idx >= 0) & (to_idx >= 0)
+        from_rates[usable] = rates[rows[usable], from_idx[usable]]
+        to_rates[usable] = rates[rows[usable], to_idx[usable]]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            converted = amounts * from_rates / to_rates
+
+        resolved = history.dates[unique_positions].astype(str).tolist()
+        for i in np.flatnonzero(has_day):
+            rate_dates[i] = resolved[rows[i]]
+
+    errors = [None] * n
+    for i in np.flatnonzero(~np.isfinite(converted)):
+        if not np.isfinite(amounts[i]):
+            errors[i] = 'Geçersiz miktar'
+        elif np.isnat(days[i]) and not latest[i]:
+            errors[i] = 'Geçersiz tarih, YYYY-MM-DD olmalı'
+        elif not has_day[i]:
+            errors[i] = f'{dates[i]} veya öncesi için kur bulunamadı'
+        elif not np.isfinite(from_rates[i]):
+            errors[i] = f'{rate_dates[i]} tarihinde {from_codes[i]} para birimi için kur bulunamadı'
+        else:
+            errors[i] = f'{rate_dates[i]} tarihinde {to_codes[i]} para birimi için kur bulunamadı'
+
+    return AsOfResult(converted, from_rates, to_rates, rate_dates, errors)
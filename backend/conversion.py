@@ -0,0 +1,56 @@
+"""Toplu döviz dönüşümü için vektörel çapraz kur hesabı.
+
+Tüm kalemler tek bir kur görüntüsüne karşı, TL üzerinden satış kuru ile
+çevrilir: ``tutar * kur[kaynak] / kur[hedef]``.
+"""
+import math
+
+import numpy as np
+
+# Tek istekte kabul edilen en fazla kalem sayısı
+MAX_BATCH_ITEMS = 100000
+
+
+def to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def lookup_codes(index, codes):
+    """Döviz kodlarını kur dizisindeki konumlara çevirir, bilinmeyenler -1 olur"""
+    return np.fromiter((index.get(code, -1) for code in codes), dtype=np.intp, count=len(codes))
+
+
+def convert_batch(index, rates, amounts, from_codes, to_codes):
+    """Kalemleri tek seferde çevirir.
+
+    ``index`` kodu ``rates`` dizisindeki konuma eşler. Geçersiz kalemler için
+    sonuç NaN olur; ikinci dönüş değeri her kalemin hata mesajı (veya None)
+    listesidir.
+    """
+    amounts = np.fromiter((to_float(a) for a in amounts), dtype=np.float64, count=len(amounts))
+    from_idx = lookup_codes(index, from_codes)
+    to_idx = lookup_codes(index, to_codes)
+
+    valid = (from_idx >= 0) & (to_idx >= 0) & np.isfinite(amounts)
+
+    converted = np.full(len(amounts), np.nan)
+    converted[valid] = amounts[valid] * rates[from_idx[valid]] / rates[to_idx[valid]]
+
+    errors = [None] * len(amounts)
+    for i in np.flatnonzero(~valid):
+        if not np.isfinite(amounts[i]):
+            errors[i] = 'Geçersiz miktar'
+        elif from_idx[i] < 0:
+            errors[i] = f'{from_codes[i]} para birimi için kur bulunamadı'
+        else:
+            errors[i] = f'{to_codes[i]} para birimi için kur bulunamadı'
+
+    return converted, errors
+
+
+def rounded_list(values, digits=4):
+    """NaN değerleri None yaparak JSON'a uygun listeye çevirir"""
+    return [None if math.isnan(v) else v for v in np.round(values, digits).tolist()]
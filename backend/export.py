@@ -0,0 +1,157 @@
+"""Toplu kur dışa aktarımı: CSV, Parquet veya Arrow IPC akışı.
+
+``doviz_kurlari`` sunucu tarafı cursor ile ``EXPORT_CHUNK_SIZE`` satırlık
+parçalar halinde okunur, her parça hemen seçilen biçime çevrilip istemciye
+gönderilir; aralık ne kadar uzun olursa olsun sunucuda en fazla bir parça
+bellekte tutulur. Parquet'te her parça bir row group'tur, dosya sonu
+(footer) akışın sonunda yazılır.
+
+Parquet ve Arrow için pyarrow gerekir; kurulu değilse yalnızca CSV sunulur.
+"""
+import csv
+import io
+import zlib
+
+from sqlalchemy import select
+
+from common.db import doviz_kurlari
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+EXPORT_COLUMNS = (
+    'tarih', 'doviz_kodu', 'doviz_adi', 'alis_kuru', 'satis_kuru', 'efektif_alis', 'efektif_satis'
+)
+
+EXPORT_CHUNK_SIZE = 10000
+
+# biçim -> (mimetype, dosya uzantısı)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrows'),
+}
+
+
+def available_formats():
+    return [name for name in EXPORT_FORMATS if name == 'csv' or pa is not None]
+
+
+def export_statement(codes=None, start_date=None, end_date=None):
+    """Tarih ve döviz koduna göre sıralı dışa aktarım sorgusu (unique_tarih_doviz indeksini kullanır)"""
+    stmt = select(*[doviz_kurlari.c[column] for column in EXPORT_COLUMNS])
+    if codes:
+        stmt = stmt.where(doviz_kurlari.c.doviz_kodu.in_(codes))
+    if start_date:
+        stmt = stmt.where(doviz_kurlari.c.tarih >= start_date)
+    if end_date:
+        stmt = stmt.where(doviz_kurlari.c.tarih <= end_date)
+    return stmt.order_by(doviz_kurlari.c.tarih, doviz_kurlari.c.doviz_kodu)
+
+
+def iter_chunks(engine, stmt, chunk_size=EXPORT_CHUNK_SIZE):
+    """Sorgu sonucunu kendi bağlantısında, sunucu tarafı cursor ile parça parça okur.
+
+    Yanıt akarken istek bağlamı (ve session) kapanmış olabileceği için
+    bağlantı üreteç içinde açılır ve akış bitince (veya istemci
+    koptuğunda) kapanır.
+    """
+    with engine.connect() as connection:
+        result = connection.execution_options(stream_results=True, yield_per=chunk_size).execute(stmt)
+        for partition in result.partitions(chunk_size):
+            yield partition
+
+
+def csv_stream(chunks):
+    """Başlık satırı ve her parça için bir CSV metni üretir"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def gzip_stream(chunks, level=6):
+    """Bayt parçalarını tek bir gzip akışı olarak sıkıştırır"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class _ChunkSink(io.RawIOBase):
+    """pyarrow yazıcılarının yazdığı baytları biriktirir; her parçadan sonra boşaltılır"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _schema():
+    return pa.schema([
+        ('tarih', pa.date32()),
+        ('doviz_kodu', pa.string()),
+        ('doviz_adi', pa.string()),
+        ('alis_kuru', pa.float64()),
+        ('satis_kuru', pa.float64()),
+        ('efektif_alis', pa.float64()),
+        ('efektif_satis', pa.float64()),
+    ])
+
+
+def _record_batch(schema, rows):
+    columns = list(zip(*rows))
+    return pa.record_batch(
+        [pa.array(values, type=field.type) for values, field in zip(columns, schema)], schema=schema
+    )
+
+
+def arrow_stream(chunks):
+    """Arrow IPC akış biçimi; her parça bir record batch olarak gönderilir"""
+    schema = _schema()
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for rows in chunks:
+            writer.write_batch(_record_batch(schema, rows))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def parquet_stream(chunks, compression='zstd'):
+    """Parquet dosyası; her parça ayrı bir row group olarak yazılır"""
+    schema = _schema()
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema, compression=compression) as writer:
+        for rows in chunks:
+            writer.write_batch(_record_batch(schema, rows))
+            yield sink.drain()
+    yield sink.drain()
+
+
+STREAMS = {'csv': csv_stream, 'parquet': parquet_stream, 'arrow': arrow_stream}
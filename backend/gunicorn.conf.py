@@ -0,0 +1,40 @@
+"""Üretim sunucusu (gunicorn) ayarları; değerler ortam değişkenlerinden okunur.
+
+Her worker kendi veritabanı bağlantı havuzunu açar: toplam bağlantı sayısı
+``GUNICORN_WORKERS × (DB_POOL_SIZE + DB_MAX_OVERFLOW)`` Postgres'in
+``max_connections`` değerini aşmamalıdır.
+"""
+import os
+import shutil
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+workers = int(os.getenv('GUNICORN_WORKERS', '4'))
+
+# SSE bağlantıları worker'ı meşgul ettiği için thread'li worker kullanılır. Her açık
+# akış bir thread'i tutar; worker başına akış sayısı SSE_MAX_CLIENTS (varsayılan 16)
+# ile sınırlıdır, kalan thread'ler normal isteklere ayrılır
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '32'))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def on_starting(server):
+    # Prometheus multiprocess dizini önceki çalışmadan kalan değerlerden temizlenir
+    directory = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,231 @@
+"""Çok para birimli, sütun bazlı kur geçmişi.
+
+Geçmiş varsa mmap kur deposundan, yoksa sunucu tarafı cursor ile parça
+parça okunur ve pandas ile tarih × döviz kodu tablosuna çevrilir. İstenirse haftalık/aylık/yıllık
+OHLC'ye veya LTTB ile belirli sayıda noktaya indirgenir. Aylık ve yıllık OHLC,
+istenen aralıktaki tam dönemler için ham veri yerine özet tablolardan
+(``doviz_kurlari_aylik``/``doviz_kurlari_yillik``) okunur; yalnızca aralığın
+kenarındaki eksik dönemler ham veriden hesaplanır. Yanıt, uzun
+aralıklarda belleği şişirmemek için parça parça JSON olarak akıtılır.
+"""
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+
+from common.db import OHLC_PARTS, ROLLUP_TABLES, doviz_kurlari, next_period, period_start
+from serialization import dumps
+
+VALUE_FIELDS = ('alis_kuru', 'satis_kuru', 'efektif_alis', 'efektif_satis')
+
+# interval -> pandas resample kuralı; dönemler [başlangıç, sonraki başlangıç) aralığıdır ve
+# başlangıçla etiketlenir (haftalar pazartesi başlar)
+RESAMPLE_RULES = {
+    'week': 'W-MON',
+    'month': 'MS',
+    'year': 'YS',
+}
+
+FETCH_CHUNK_SIZE = 10000
+STREAM_CHUNK_SIZE = 5000
+
+
+def load_history_frame(connection, codes, field, start_date=None, end_date=None):
+    """Seçilen kolonu tarih indeksli, her döviz kodu bir sütun olan DataFrame olarak yükler"""
+    column = doviz_kurlari.c[field]
+    stmt = select(doviz_kurlari.c.tarih, doviz_kurlari.c.doviz_kodu, column).where(
+        doviz_kurlari.c.doviz_kodu.in_(codes)
+    )
+    if start_date:
+        stmt = stmt.where(doviz_kurlari.c.tarih >= start_date)
+    if end_date:
+        stmt = stmt.where(doviz_kurlari.c.tarih <= end_date)
+    stmt = stmt.order_by(doviz_kurlari.c.tarih)
+
+    dates = []
+    row_codes = []
+    values = []
+    result = connection.execution_options(stream_results=True).execute(stmt)
+    for partition in result.partitions(FETCH_CHUNK_SIZE):
+        for tarih, doviz_kodu, value in partition:
+            dates.append(tarih)
+            row_codes.append(doviz_kodu)
+            values.append(value)
+
+    frame = pd.DataFrame({'tarih': pd.to_datetime(dates), 'doviz_kodu': row_codes, 'value': values})
+    frame = frame.pivot(index='tarih', columns='doviz_kodu', values='value')
+    return frame.reindex(columns=[code for code in codes if code in frame.columns])
+
+
+def store_history_frame(store, codes, field, start_date=None, end_date=None):
+    """``load_history_frame`` ile aynı tabloyu veritabanına gitmeden mmap kur deposundan üretir"""
+    lo, hi = store.date_range(start_date, end_date)
+    present = [code for code in codes if code in store.code_index]
+    values = store.values[lo:hi, [store.code_index[code] for code in present], store.fields.index(field)]
+
+    frame = pd.DataFrame(values, index=pd.DatetimeIndex(store.dates[lo:hi], name='tarih'), columns=present)
+    frame.columns.name = 'doviz_kodu'
+    # Veritabanı sorgusu gibi yalnızca seçilen kodlardan en az birinin kuru olan günler döner
+    return frame.dropna(how='all')
+
+
+def resample_ohlc(frame, interval):
+    """Günlük tabloyu dönem başına (döviz kodu, open/high/low/close) sütunlarına indirger"""
+    # 'W-MON' varsayılan olarak sağdan kapalı ve sağ kenarla etiketlidir; pazartesi önceki haftaya düşerdi
+    resampler = frame.resample(RESAMPLE_RULES[interval], closed='left', label='left')
+    return resampler.ohlc().dropna(how='all')
+
+
+def load_rollup_ohlc(connection, interval, codes, field, start=None, end=None):
+    """``resample_ohlc`` ile aynı tabloyu özet tablodan okur; ``end`` hariç dönem başlangıcıdır"""
+    table = ROLLUP_TABLES[interval]
+    stmt = select(
+        table.c.donem, table.c.doviz_kodu, *[table.c[f'{field}_{suffix}'] for suffix in OHLC_PARTS.values()]
+    ).where(table.c.doviz_kodu.in_(codes))
+    if start:
+        stmt = stmt.where(table.c.donem >= start)
+    if end:
+        stmt = stmt.where(table.c.donem < end)
+
+    frame = pd.DataFrame(connection.execute(stmt).all(), columns=['donem', 'doviz_kodu', *OHLC_PARTS])
+    frame['donem'] = pd.to_datetime(frame['donem'])
+    ohlc = frame.pivot(index='donem', columns='doviz_kodu', values=list(OHLC_PARTS)).astype(np.float64)
+    return ohlc.swaplevel(axis=1)
+
+
+def split_periods(interval, start=None, end=None):
+    """Aralığı özet tablodan okunacak tam dönemlere ve ham veriden hesaplanacak kenarlara böler.
+
+    ``((ilk dönem, son dönemden sonraki gün), [(başlangıç, bitiş), ...])``
+    döndürür; aralık tek bir dönemin içinde kalıyorsa ilk eleman None'dır.
+    """
+    full_start = start
+    if start and period_start(interval, start) != start:
+        full_start = next_period(interval, start)
+
+    full_end = None
+    if end:
+        after = next_period(interval, end)
+        full_end = after if after - timedelta(days=1) == end else period_start(interval, end)
+
+    if full_start and full_end and full_start >= full_end:
+        return None, [(start, end)]
+
+    edges = []
+    if start and full_start != start:
+        edges.append((start, full_start - timedelta(days=1)))
+    if end and full_end <= end:
+        edges.append((full_end, end))
+    return (full_start, full_end), edges
+
+
+def rollup_history_ohlc(connection, load_frame, interval, codes, field, start=None, end=None):
+    """Aylık/yıllık OHLC'yi özet tablo ve gerekirse ``load_frame`` ile okunan ham kenarlardan birleştirir"""
+    full, edges = split_periods(interval, start, end)
+
+    parts = []
+    if full:
+        parts.append(load_rollup_ohlc(connection, interval, codes, field, *full))
+    for edge_start, edge_end in edges:
+        frame = load_frame(codes, field, edge_start, edge_end)
+        if not frame.empty:
+            parts.append(resample_ohlc(frame, interval))
+
+    ohlc = pd.concat(parts).sort_index() if parts else pd.DataFrame(index=pd.DatetimeIndex([]))
+    present = [code for code in codes if code in ohlc.columns.get_level_values(0)]
+    return ohlc.reindex(columns=pd.MultiIndex.from_product([present, list(OHLC_PARTS)])).dropna(how='all')
+
+
+def lttb_indices(x, y, threshold):
+    """Largest-Triangle-Three-Buckets ile korunacak noktaların indekslerini döndürür"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (threshold - 2)
+    indices = np.empty(threshold, dtype=np.intp)
+    indices[0] = 0
+    a = 0
+
+    for i in range(threshold - 2):
+        # Bir sonraki kovanın ortalaması üçgenin üçüncü köşesidir
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        indices[i + 1] = a
+
+    indices[-1] = n - 1
+    return indices
+
+
+def json_values(series):
+    """NaN değerleri null yaparak JSON'a uygun listeye çevirir"""
+    return [None if np.isnan(v) else v for v in series.to_numpy(dtype=np.float64).tolist()]
+
+
+def json_dates(index):
+    return index.strftime('%Y-%m-%d').tolist()
+
+
+def ohlc_payload(ohlc, field, interval):
+    """Dönem × (döviz kodu, OHLC) tablosunu sütun bazlı API çıktısına çevirir"""
+    return {
+        'field': field,
+        'interval': interval,
+        'dates': json_dates(ohlc.index),
+        'series': {
+            code: {part: json_values(ohlc[code][part]) for part in OHLC_PARTS}
+            for code in ohlc.columns.get_level_values(0).unique()
+        },
+    }
+
+
+def columnar_payload(frame, field, interval='day', points=None):
+    """DataFrame'i sütun bazlı API çıktısına çevirir"""
+    if interval in RESAMPLE_RULES:
+        return ohlc_payload(resample_ohlc(frame, interval), field, interval)
+
+    payload = {'field': field, 'interval': interval}
+
+    if points:
+        # Her seri kendi noktalarını seçtiği için tarihler seri başına döner
+        payload['points'] = points
+        payload['series'] = {}
+        for code in frame.columns:
+            series = frame[code].dropna()
+            x = series.index.to_numpy(dtype='datetime64[D]').astype(np.float64)
+            keep = lttb_indices(x, series.to_numpy(dtype=np.float64), points)
+            sampled = series.iloc[keep]
+            payload['series'][code] = {'dates': json_dates(sampled.index), 'values': json_values(sampled)}
+        return payload
+
+    payload['dates'] = json_dates(frame.index)
+    payload['series'] = {code: json_values(frame[code]) for code in frame.columns}
+    return payload
+
+
+def iter_json(value, chunk_size=STREAM_CHUNK_SIZE):
+    """Büyük listeleri parça parça serileştirerek JSON metnini üretir"""
+    if isinstance(value, dict):
+        yield '{'
+        for i, (key, item) in enumerate(value.items()):
+            yield (',' if i else '') + dumps(key) + ':'
+            yield from iter_json(item, chunk_size)
+        yield '}'
+    elif isinstance(value, list) and len(value) > chunk_size:
+        yield '['
+        for offset in range(0, len(value), chunk_size):
+            chunk = dumps(value[offset:offset + chunk_size])[1:-1]
+            yield (',' if offset else '') + chunk
+        yield ']'
+    else:
+        yield dumps(value)
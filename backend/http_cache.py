@@ -0,0 +1,229 @@
+"""Kur uç noktaları için ETag, koşullu GET ve Cache-Control başlıkları.
+
+ETag, isteğin yolu, sorgu parametreleri ve kur sürümünden türetilir. Veri
+günde bir kez değiştiği için ``If-None-Match`` eşleşen istekler view
+fonksiyonu hiç çalıştırılmadan 304 ile yanıtlanır. Geçmişte kalmış aralıklar
+da backfill, düzeltme veya saklama süresiyle değişebileceği için ETag her
+zaman sürümü içerir; tam veri dönen geçmiş aralıklarda yalnızca istemciye
+giden ``Cache-Control`` uzun süreli (``immutable``) olur.
+
+ETag, kur sürümüyle birlikte yanıt gövdesinin cache anahtarıdır: bir kez
+üretilen JSON (ve gzip'lenmiş hali) süreç içinde ve Redis'te saklanır,
+sonraki istekler yeniden serileştirme yapılmadan bu baytlarla yanıtlanır.
+"""
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+from functools import wraps
+
+from flask import current_app, g, make_response, request
+
+from metrics import record_cache
+
+# Güncel veriler için paylaşılan cache süresi (saniye)
+DEFAULT_MAX_AGE = 60
+
+# Değişmeyecek geçmiş veriler için bir yıl
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Bu boyutun altındaki gövdeler sıkıştırılmaz
+GZIP_MIN_SIZE = 1024
+
+# Güçlü ETag içerik kodlamasına özeldir; gzip'lenmiş gövde bu ekle ayrı bir ETag taşır
+GZIP_ETAG_SUFFIX = '-gzip'
+
+# immutable: gövde uzun süreli Cache-Control ile sunulabilir
+CachedBody = namedtuple('CachedBody', ['body', 'gzip_body', 'mimetype', 'immutable'])
+
+
+class ResponseCache:
+    """Üretilmiş yanıt gövdelerini (kur sürümü, ETag) anahtarıyla saklar.
+
+    Süreç içi LRU toplam ``max_bytes`` ile sınırlıdır ve yalnızca güncel
+    sürümün girdilerini tutar: farklı bir sürümle ilk erişimde boşaltılır.
+    Redis, worker'lar arasında paylaşılan ikinci katmandır; anahtar sürümü
+    içerdiği için bir yazımdan (backfill, düzeltme, saklama süresi) sonra
+    eski gövdeler hiçbir worker'da sunulmaz, TTL ile düşer.
+    """
+
+    def __init__(self, redis_client=None, max_bytes=32 * 1024 * 1024, redis_ttl=86400):
+        self._redis = redis_client
+        self._max_bytes = max_bytes
+        self._redis_ttl = redis_ttl
+        self._entries = OrderedDict()
+        self._size = 0
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            self._switch(version)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                record_cache('response_local', True)
+                return entry
+
+        record_cache('response_local', False)
+        entry = self._load(key, version)
+        if self._redis:
+            record_cache('response_redis', entry is not None)
+        if entry is not None:
+            self._remember(key, version, entry)
+        return entry
+
+    def put(self, key, version, body, mimetype, immutable=False):
+        gzip_body = gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_SIZE else None
+        entry = CachedBody(body, gzip_body, mimetype, immutable)
+        self._remember(key, version, entry)
+        self._store(key, version, entry)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _switch(self, version):
+        """Sürüm değiştiyse eski sürümün girdilerini atar (kilit altında çağrılır)"""
+        if version != self._version:
+            self._entries.clear()
+            self._size = 0
+            self._version = version
+
+    def _remember(self, key, version, entry):
+        size = len(entry.body) + len(entry.gzip_body or b'')
+        if size > self._max_bytes:
+            return
+        with self._lock:
+            self._switch(version)
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous.body) + len(previous.gzip_body or b'')
+            self._entries[key] = entry
+            self._size += size
+            while self._size > self._max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.body) + len(evicted.gzip_body or b'')
+
+    def _load(self, key, version):
+        if not self._redis:
+            return None
+        try:
+            cached = self._redis.hgetall(_redis_key(key, version))
+        except Exception as e:
+            print(f"Yanıt cache okuma hatası: {e}")
+            return None
+        if not cached:
+            return None
+        return CachedBody(
+            cached[b'body'], cached.get(b'gzip') or None, cached[b'mimetype'].decode(), cached.get(b'immutable') == b'1'
+        )
+
+    def _store(self, key, version, entry):
+        if not self._redis:
+            return
+        mapping = {'body': entry.body, 'mimetype': entry.mimetype, 'immutable': '1' if entry.immutable else '0'}
+        if entry.gzip_body:
+            mapping['gzip'] = entry.gzip_body
+        try:
+            pipe = self._redis.pipeline()
+            pipe.hset(_redis_key(key, version), mapping=mapping)
+            pipe.expire(_redis_key(key, version), self._redis_ttl)
+            pipe.execute()
+        except Exception as e:
+            print(f"Yanıt cache yazma hatası: {e}")
+
+
+def _redis_key(key, version):
+    return f'response:{version}:{key}'
+
+
+def cached_response(entry):
+    """Saklanan gövdeyi, istemci destekliyorsa sıkıştırılmış haliyle döndürür"""
+    if entry.gzip_body and 'gzip' in request.accept_encodings:
+        response = current_app.response_class(entry.gzip_body, mimetype=entry.mimetype)
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = current_app.response_class(entry.body, mimetype=entry.mimetype)
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def snapshot_token(snapshot):
+    """Görüntünün ETag'e girecek sürüm bilgisini döndürür.
+
+    Sürüm Redis'teki kur sürümü, Redis yoksa ``doviz_ozet``'ten türetilen veri
+    sürümüdür; ikisi de okunamadıysa kurların kendisinden türetilir.
+    """
+    if snapshot.version is not None:
+        return str(snapshot.version)
+    return hashlib.sha1(repr(snapshot.rows).encode()).hexdigest()
+
+
+def make_etag(*parts):
+    return hashlib.sha1('\x1f'.join(str(part) for part in parts).encode()).hexdigest()
+
+
+def encoded_etag(etag, response):
+    """Yanıtın içerik kodlamasına özel (güçlü) ETag"""
+    if response.headers.get('Content-Encoding') == 'gzip':
+        return etag + GZIP_ETAG_SUFFIX
+    return etag
+
+
+def mark_incomplete():
+    """View, yanıtı boş veya eksik veri içeriyorsa çağırır; yanıt uzun süreli cache'lenmez"""
+    g.response_incomplete = True
+
+
+def conditional(token_getter, max_age=DEFAULT_MAX_AGE, immutable_if=None, cache=None):
+    """View'e ETag tabanlı koşullu GET ve cache başlıkları ekler.
+
+    ``token_getter`` güncel kur sürümünü döndürür; ETag ve gövde cache'i
+    her zaman bu sürüme bağlıdır. ``immutable_if`` isteğin geçmişte kalmış
+    veriyi istediğini belirtirse ve view ``mark_incomplete`` çağırmadıysa
+    istemciye uzun süreli Cache-Control gönderilir. ``cache`` verilirse 200
+    yanıtlarının gövdesi saklanıp sonraki isteklerde aynen döndürülür (akış
+    halindeki yanıtlar hariç). Yalnızca 200 yanıtlarına başlık eklenir.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            version = token_getter()
+            etag = make_etag(request.path, request.query_string.decode(), version)
+            immutable = bool(immutable_if and immutable_if())
+
+            # İstemci kodlamaya özel ETag'lerden hangisini aldıysa o gönderilir
+            matched = next(
+                (tag for tag in (etag, etag + GZIP_ETAG_SUFFIX) if request.if_none_match.contains(tag)), None
+            )
+            not_modified = matched is not None
+            record_cache('etag', not_modified)
+            if not_modified:
+                response = current_app.response_class(status=304)
+                response.vary.add('Accept-Encoding')
+                # Gövdenin tam olduğu yalnızca saklanan girdiden bilinir
+                entry = cache.get(etag, version) if immutable and cache is not None else None
+                immutable = entry is not None and entry.immutable
+            elif cache is not None and (entry := cache.get(etag, version)) is not None:
+                response = cached_response(entry)
+                immutable = entry.immutable
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                immutable = immutable and not g.get('response_incomplete', False)
+                if cache is not None and not response.is_streamed:
+                    entry = cache.put(etag, version, response.get_data(), response.mimetype, immutable)
+                    response = cached_response(entry)
+
+            response.set_etag(matched if not_modified else encoded_etag(etag, response))
+            if immutable:
+                response.headers['Cache-Control'] = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+            else:
+                response.headers['Cache-Control'] = f'public, max-age={max_age}, must-revalidate'
+            return response
+        return wrapper
+    return decorator
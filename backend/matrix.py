@@ -0,0 +1,115 @@
+"""Bir tarihin tüm para birimleri arasındaki çapraz kur matrisi.
+
+Matris TL üzerinden hesaplanır: ``values[i, j]``, bir birim ``codes[i]``'nin
+``codes[j]`` cinsinden değeridir. Hesaplanan matris float64 dizisi ve kod
+listesi olarak hem süreç içinde hem Redis'te saklanır; kur sürümü
+değişene kadar (yeni bir yazıma kadar) tekrar hesaplanmaz.
+"""
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from metrics import record_cache
+
+# (type, side) -> doviz_kurlari kolonu
+RATE_FIELDS = {
+    ('forex', 'buying'): 'alis_kuru',
+    ('forex', 'selling'): 'satis_kuru',
+    ('banknote', 'buying'): 'efektif_alis',
+    ('banknote', 'selling'): 'efektif_satis',
+}
+
+CrossRateMatrix = namedtuple('CrossRateMatrix', ['tarih', 'field', 'codes', 'values'])
+
+
+def build_matrix(tarih, field, rows):
+    """Kur satırlarından N×N çapraz kur matrisini hesaplar.
+
+    Seçilen kuru yayınlanmamış (0) para birimleri matrise alınmaz.
+    """
+    rows = [row for row in rows if row[field] > 0]
+    codes = tuple(row['doviz_kodu'] for row in rows) + ('TRY',)
+    rates = np.array([row[field] for row in rows] + [1.0], dtype=np.float64)
+
+    values = rates[:, np.newaxis] / rates[np.newaxis, :]
+    values.setflags(write=False)
+    return CrossRateMatrix(tarih, field, codes, values)
+
+
+class MatrixCache:
+    """Matrisleri (tarih, kolon) başına, kur sürümüyle birlikte saklar"""
+
+    def __init__(self, redis_client=None, max_entries=64, redis_ttl=86400):
+        self._redis = redis_client
+        self._max_entries = max_entries
+        self._redis_ttl = redis_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, tarih, field, version, compute):
+        """Önbellekteki matrisi döndürür, yoksa ``compute()`` ile hesaplayıp saklar"""
+        # Sürüm bilinmiyorsa (Redis yok) önbellek güvenilir değildir
+        if version is None:
+            return compute()
+
+        key = (tarih, field)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == version:
+                self._entries.move_to_end(key)
+                record_cache('matrix_local', True)
+                return entry[1]
+
+        record_cache('matrix_local', False)
+        matrix = self._load(tarih, field, version)
+        if self._redis:
+            record_cache('matrix_redis', matrix is not None)
+        if matrix is None:
+            matrix = compute()
+            if matrix is not None:
+                self._store(matrix, version)
+
+        if matrix is not None:
+            with self._lock:
+                self._entries[key] = (version, matrix)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self._max_entries:
+                    self._entries.popitem(last=False)
+
+        return matrix
+
+    def _redis_key(self, tarih, field):
+        return f'rate_matrix:{tarih.isoformat()}:{field}'
+
+    def _load(self, tarih, field, version):
+        if not self._redis:
+            return None
+        try:
+            cached = self._redis.hgetall(self._redis_key(tarih, field))
+        except Exception as e:
+            print(f"Kur matrisi cache okuma hatası: {e}")
+            return None
+
+        if not cached or int(cached[b'version']) != version:
+            return None
+
+        codes = tuple(cached[b'codes'].decode().split(','))
+        values = np.frombuffer(cached[b'values'], dtype=np.float64).reshape(len(codes), len(codes))
+        return CrossRateMatrix(tarih, field, codes, values)
+
+    def _store(self, matrix, version):
+        if not self._redis:
+            return
+        key = self._redis_key(matrix.tarih, matrix.field)
+        try:
+            pipe = self._redis.pipeline()
+            pipe.hset(key, mapping={
+                'version': version,
+                'codes': ','.join(matrix.codes),
+                'values': matrix.values.tobytes()
+            })
+            pipe.expire(key, self._redis_ttl)
+            pipe.execute()
+        except Exception as e:
+            print(f"Kur matrisi cache yazma hatası: {e}")
@@ -0,0 +1,105 @@
+"""API için Prometheus metrikleri.
+
+Uç nokta başına gecikme histogramı, cache isabet/ıska sayaçları ve
+SQLAlchemy cursor olaylarından ölçülen sorgu süreleri ``/metrics`` üzerinden
+sunulur. Gunicorn'da her worker ayrı süreç olduğu için
+``PROMETHEUS_MULTIPROC_DIR`` tanımlıysa değerler bu dizin üzerinden
+birleştirilir (multiprocess modu).
+
+Akış halindeki yanıtlarda (SSE, sütun bazlı geçmiş) ölçülen süre, gövdenin
+tamamı değil ilk baytın hazır olduğu andır.
+"""
+import os
+import time
+
+from flask import Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest, multiprocess
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+REQUEST_LATENCY = Histogram(
+    'doviz_api_request_duration_seconds', 'API isteklerinin yanıt süresi',
+    ['method', 'route', 'status'],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+
+CACHE_REQUESTS = Counter(
+    'doviz_api_cache_requests_total', 'Cache okumaları (hit/miss/stale/refresh)',
+    ['cache', 'result']
+)
+
+DB_QUERY_DURATION = Histogram(
+    'doviz_api_db_query_duration_seconds', 'Veritabanı sorgularının süresi',
+    ['operation'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+)
+
+# Sorgu türü etiketi bu kümeyle sınırlıdır
+DB_OPERATIONS = {'SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH', 'COPY', 'CREATE', 'SET'}
+
+
+def record_cache(cache, hit):
+    record_cache_result(cache, 'hit' if hit else 'miss')
+
+
+def record_cache_result(cache, result):
+    """``stale``: bayat veriyle yanıt, ``refresh``: süresi dolmadan yenileme"""
+    CACHE_REQUESTS.labels(cache, result).inc()
+
+
+def _operation(statement):
+    word = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ''
+    return word if word in DB_OPERATIONS else 'OTHER'
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_started'].pop()
+    DB_QUERY_DURATION.labels(_operation(statement)).observe(time.perf_counter() - started)
+
+
+def _handle_error(context):
+    # Hatalı sorguda after_cursor_execute çağrılmaz, başlangıç zamanı atılır
+    started = context.connection.info.get('query_started') if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def _registry():
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def init_metrics(app):
+    """İstek ve sorgu süresi ölçümünü ve /metrics uç noktasını ekler"""
+    # Birincil ve replika dahil bütün motorların sorguları ölçülür
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(Engine, 'handle_error', _handle_error)
+
+    @app.before_request
+    def _start_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def _observe_request(response):
+        started = g.pop('request_started', None)
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            REQUEST_LATENCY.labels(request.method, route, response.status_code).observe(
+                time.perf_counter() - started
+            )
+        return response
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        """Prometheus metrikleri"""
+        return Response(generate_latest(_registry()), mimetype=CONTENT_TYPE_LATEST)
@@ -0,0 +1,50 @@
+"""Salt okunur sorguların okuma replikasına yönlendirilmesi.
+
+Yanıtlar kur sürümüyle cache'lendiği için gecikmeli bir replikadan okunan
+eski veri o sürüm boyunca saklanır. Bu yüzden replika, veri sürümü
+(``common.db.data_version``) birincil veritabanındakine eşit olana kadar
+kullanılmaz. Veri sürümü her yazımla değişir; en son günü değiştirmeyen
+backfill, düzeltme ve saklama süresi silmeleri de buna dahildir. Birincildeki
+değer her kur sürümü için bir kez okunur, replika yetiştiği doğrulanana kadar
+her istekte kontrol edilir. Yetişmemiş veya erişilemeyen replikada sorgular
+birincil veritabanına gider.
+"""
+from common.db import data_version
+
+
+class ReplicaRouter:
+    def __init__(self, db, bind_key='replica', enabled=False):
+        self._db = db
+        self._bind_key = bind_key
+        self._enabled = enabled
+        self._ready_version = None
+        # (kur sürümü, birincildeki veri sürümü)
+        self._target = (None, None)
+
+    def _primary_version(self, snapshot):
+        version, target = self._target
+        if snapshot.version is None or snapshot.version != version or target is None:
+            target = data_version(self._db.session.connection())
+            self._target = (snapshot.version, target)
+        return target
+
+    def bind_arguments(self, snapshot):
+        """Okuma sorgusu için ``Session.execute``/``connection`` bind argümanları"""
+        if not self._enabled:
+            return {}
+
+        engine = self._db.engines[self._bind_key]
+        if snapshot.version is not None and snapshot.version == self._ready_version:
+            return {'bind': engine}
+
+        try:
+            target = self._primary_version(snapshot)
+            current = data_version(self._db.session.connection(bind_arguments={'bind': engine}))
+        except Exception as e:
+            print(f"Replika kontrol hatası: {e}")
+            return {}
+
+        if current == target:
+            self._ready_version = snapshot.version
+            return {'bind': engine}
+        return {}
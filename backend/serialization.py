@@ -0,0 +1,35 @@
+"""Hızlı JSON serileştirme.
+
+orjson kuruluysa Flask'ın JSON sağlayıcısı ve akış halindeki yanıtlar onu
+kullanır; kurulu değilse standart ``json`` modülüne düşülür.
+"""
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj):
+    """Nesneyi JSON metni (str) olarak serileştirir"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """jsonify çıktısını orjson ile doğrudan bayt olarak üretir"""
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS), mimetype=self.mimetype)
@@ -0,0 +1,154 @@
+"""Güncel kurların süreç içi, değiştirilemez anlık görüntüsü.
+
+/api/rates/latest, /api/currencies ve /api/convert her istekte veritabanına
+gitmek yerine bu görüntüden beslenir. Görüntü yalnızca kur sürümü
+değiştiğinde (Redis pub/sub mesajı veya periyodik sürüm kontrolü) yeniden
+yüklenir; aradaki istekler ne Postgres'e ne de Redis'e uğrar.
+"""
+import threading
+import time
+from collections import namedtuple
+from datetime import date
+from types import MappingProxyType
+
+import numpy as np
+
+from common.events import RATES_CHANNEL, current_version
+from metrics import record_cache, record_cache_result
+
+RateRow = namedtuple('RateRow', [
+    'tarih', 'doviz_kodu', 'doviz_adi', 'alis_kuru', 'satis_kuru', 'efektif_alis', 'efektif_satis'
+])
+
+
+class RateSnapshot(namedtuple('RateSnapshot', ['version', 'tarih', 'rows', 'by_code', 'index', 'sell_rates'])):
+    """Tek bir tarihin kurları.
+
+    ``by_code`` döviz koduna göre salt okunur indekstir. Vektörel hesaplar için
+    ``index`` kodu (TRY dahil) ``sell_rates`` dizisindeki konuma eşler.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def build(cls, version, rates):
+        rows = tuple(RateRow(**{field: rate[field] for field in RateRow._fields}) for rate in rates)
+        tarih = date.fromisoformat(rows[0].tarih) if rows else None
+        by_code = MappingProxyType({row.doviz_kodu: row for row in rows})
+
+        # TL kuru 1.0 olarak dizinin sonuna eklenir
+        codes = [row.doviz_kodu for row in rows] + ['TRY']
+        index = MappingProxyType({code: i for i, code in enumerate(codes)})
+        sell_rates = np.array([row.satis_kuru for row in rows] + [1.0], dtype=np.float64)
+        sell_rates.setflags(write=False)
+
+        return cls(version, tarih, rows, by_code, index, sell_rates)
+
+    def as_dicts(self):
+        return [row._asdict() for row in self.rows]
+
+
+class SnapshotStore:
+    """Görüntüyü tutar ve sürüm değiştiğinde yeniden yükler.
+
+    ``loader`` kur sürümünü alıp en son tarihin kurlarını sözlük listesi
+    olarak döndüren bir fonksiyondur. Redis yoksa sürüm ``check_interval``
+    saniyede bir ``version_loader`` ile (veritabanından) okunur, görüntü
+    yalnızca sürüm değiştiyse yenilenir; ``version_loader`` da yoksa her
+    kontrolde yenilenir.
+    """
+
+    def __init__(self, loader, redis_client=None, check_interval=30, version_loader=None):
+        self._loader = loader
+        self._redis = redis_client
+        self._version_loader = version_loader
+        self._check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._stale = True
+        self._checked_at = 0.0
+        self._listener = None
+        self._callbacks = []
+
+    def get(self):
+        """Güncel görüntüyü döndürür, gerekiyorsa yeniden yükler.
+
+        Yenileme sürerken diğer thread'ler beklemez, eldeki görüntüyü alır.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and self._fresh():
+            record_cache('snapshot', True)
+            return snapshot
+
+        # İlk yüklemede herkes bekler, sonrasında yalnızca kilidi alan yeniler
+        if not self._lock.acquire(blocking=snapshot is None):
+            record_cache_result('snapshot', 'stale')
+            return snapshot
+
+        try:
+            self._start_listener()
+
+            # Kilidi beklerken başka bir thread yenilemiş olabilir
+            if self._snapshot is not None and self._fresh():
+                record_cache('snapshot', True)
+                return self._snapshot
+
+            version = self._current_version()
+            reload = self._snapshot is None or self._stale or version is None or version != self._snapshot.version
+            record_cache('snapshot', not reload)
+            if reload:
+                self._snapshot = RateSnapshot.build(version, self._loader(version))
+
+            self._stale = False
+            self._checked_at = time.monotonic()
+            return self._snapshot
+        finally:
+            self._lock.release()
+
+    def _fresh(self):
+        return not self._stale and time.monotonic() - self._checked_at < self._check_interval
+
+    def invalidate(self):
+        """Bir sonraki istekte görüntünün yeniden yüklenmesini sağlar"""
+        self._stale = True
+
+    def on_update(self, callback):
+        """Güncelleme mesajı geldiğinde dinleyici thread'inde çağrılacak fonksiyonu kaydeder"""
+        self._callbacks.append(callback)
+        with self._lock:
+            self._start_listener()
+
+    def _current_version(self):
+        try:
+            if self._redis:
+                return current_version(self._redis)
+            if self._version_loader:
+                return self._version_loader()
+        except Exception as e:
+            print(f"Kur sürümü okunamadı: {e}")
+        return None
+
+    def _start_listener(self):
+        """Gunicorn worker'ı fork edildikten sonra, ilk istekte dinleyiciyi başlatır"""
+        if self._redis is None or self._listener is not None:
+            return
+        self._listener = threading.Thread(target=self._listen, name='rates-listener', daemon=True)
+        self._listener.start()
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(RATES_CHANNEL)
+                # Bağlantı koptuğu sürede kaçan mesajlar olabilir
+                self._stale = True
+                for _ in pubsub.listen():
+                    self._stale = True
+                    for callback in self._callbacks:
+                        try:
+                            callback()
+                        except Exception as e:
+                            print(f"Kur güncelleme dinleyicisi hatası: {e}")
+            except Exception as e:
+                print(f"Kur güncelleme kanalı hatası: {e}")
+                time.sleep(5)
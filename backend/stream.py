@@ -0,0 +1,123 @@
+"""Kur güncellemelerinin Server-Sent Events ile istemcilere iletilmesi.
+
+Her worker kur görüntüsünün Redis pub/sub dinleyicisine bağlanır. Yeni kur
+yazıldığında görüntü bir kez yeniden yüklenir, önceki görüntüyle farkı
+hesaplanır ve o worker'a bağlı tüm istemcilerin kuyruğuna aynı olay konur.
+Veri değişmedikçe istemcilere yalnızca bağlantıyı canlı tutan yorum satırı
+gider.
+"""
+import json
+import os
+import queue
+import threading
+
+# Bağlantıyı proxy'lerin kapatmaması için gönderilen boş olay aralığı (saniye)
+HEARTBEAT_INTERVAL = 25
+
+# İstemci kuyruğu dolarsa en eski olay atılır
+CLIENT_QUEUE_SIZE = 8
+
+# Worker başına en fazla açık akış. gthread worker'ında her akış bağlantı boyunca
+# bir thread'i tutar; sınır GUNICORN_THREADS'ten küçük olmalı ki normal isteklere
+# thread kalsın. Sınır doluyken yeni akışlar 503 alır.
+MAX_CLIENTS = int(os.getenv('SSE_MAX_CLIENTS', '16'))
+
+# 503 yanıtındaki Retry-After (saniye)
+RETRY_AFTER = 30
+
+
+def diff_snapshots(old, new):
+    """İki görüntü arasındaki farkı döndürür, fark yoksa None.
+
+    Tarih değiştiyse bütün kurlar ``full`` olayıyla, aksi halde yalnızca
+    değişen kurlar ``diff`` olayıyla gönderilir.
+    """
+    if old is None or old.tarih != new.tarih:
+        return {
+            'type': 'full',
+            'version': new.version,
+            'tarih': new.tarih.isoformat() if new.tarih else None,
+            'data': new.as_dicts()
+        }
+
+    changed = [row._asdict() for row in new.rows if old.by_code.get(row.doviz_kodu) != row]
+    removed = [code for code in old.by_code if code not in new.by_code]
+    if not changed and not removed:
+        return None
+
+    return {
+        'type': 'diff',
+        'version': new.version,
+        'tarih': new.tarih.isoformat(),
+        'changed': changed,
+        'removed': removed
+    }
+
+
+class RateEventHub:
+    """Worker içindeki SSE istemcilerine kur farklarını dağıtır"""
+
+    def __init__(self, store, app_context, max_clients=MAX_CLIENTS):
+        self._store = store
+        self._app_context = app_context
+        self.max_clients = max_clients
+        self._clients = set()
+        self._lock = threading.Lock()
+        self._last = None
+        self._started = False
+
+    def subscribe(self):
+        """Yeni istemci kuyruğu döndürür; akış sınırı doluysa None"""
+        with self._lock:
+            if len(self._clients) >= self.max_clients:
+                return None
+            if not self._started:
+                # Farklar, ilk abonelik anındaki görüntüye göre hesaplanmaya başlar
+                self._last = self._store.get()
+                self._store.on_update(self._on_update)
+                self._started = True
+            client = queue.Queue(maxsize=CLIENT_QUEUE_SIZE)
+            self._clients.add(client)
+            return client
+
+    def unsubscribe(self, client):
+        with self._lock:
+            self._clients.discard(client)
+
+    def _on_update(self):
+        # Görüntü yüklemesi veritabanına gidebileceği için uygulama bağlamı gerekir
+        with self._app_context():
+            snapshot = self._store.get()
+
+        previous = self._last
+        self._last = snapshot
+
+        event = diff_snapshots(previous, snapshot)
+        if event is None:
+            return
+
+        with self._lock:
+            clients = list(self._clients)
+        for client in clients:
+            try:
+                client.put_nowait(event)
+            except queue.Full:
+                try:
+                    client.get_nowait()
+                except queue.Empty:
+                    pass
+                client.put_nowait(event)
+
+    def events(self, client):
+        """Tek bir istemcinin SSE akışını üretir"""
+        try:
+            yield 'retry: 10000\n\n'
+            while True:
+                try:
+                    event = client.get(timeout=HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    yield ': ping\n\n'
+                    continue
+                yield f"event: rates\ndata: {json.dumps(event)}\n\n"
+        finally:
+            self.unsubscribe(client)
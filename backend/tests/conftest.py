@@ -0,0 +1,92 @@
+"""Backend testleri için ortak ayarlar.
+
+Uygulama Docker imajındaki düzende (backend dizini ve ``common`` paketi
+import yolunda), geçici bir SQLite veritabanıyla ve Redis olmadan yüklenir.
+Redis yokken kur sürümü bilinmediği için görüntüler her istekte değil
+``invalidate`` veya kontrol aralığı dolunca yenilenir.
+"""
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROOT_DIR = os.path.dirname(BACKEND_DIR)
+
+_tmp = tempfile.mkdtemp(prefix='doviz-backend-test-')
+os.environ['DATABASE_URL'] = f'sqlite:///{_tmp}/test.db'
+os.environ['REDIS_URL'] = 'redis://127.0.0.1:1'
+os.environ['RATE_STORE_DIR'] = os.path.join(_tmp, 'rate_store')
+os.environ.pop('REPLICA_DATABASE_URL', None)
+os.environ.pop('PROMETHEUS_MULTIPROC_DIR', None)
+
+for path in (ROOT_DIR, BACKEND_DIR):
+    if path in sys.path:
+        sys.path.remove(path)
+    sys.path.insert(0, path)
+
+# Scheduler testleriyle aynı oturumda scheduler'ın metrics modülü yüklenmiş olabilir
+module = sys.modules.get('metrics')
+if module is not None and os.path.dirname(os.path.abspath(module.__file__)) != BACKEND_DIR:
+    del sys.modules['metrics']
+
+# Uygulama burada, test toplama sırasında yüklenir; ardından başka bir dizinin
+# conftest'i import yolunu değiştirse de backend modülleri doğru çözülür
+import app as api_module  # noqa: E402
+
+
+@pytest.fixture
+def api():
+    """Boş veritabanı ve sıfırlanmış görüntüyle uygulama modülü"""
+    from common.db import metadata
+
+    with api_module.app.app_context():
+        with api_module.db.engine.begin() as connection:
+            for table in reversed(metadata.sorted_tables):
+                connection.execute(table.delete())
+    api_module.rate_snapshots.invalidate()
+    api_module.response_cache.clear()
+    return api_module
+
+
+@pytest.fixture
+def client(api):
+    return api.app.test_client()
+
+
+@pytest.fixture
+def seed(api):
+    """``seed(tarih, {'USD': 32.1, ...})`` bir günün kurlarını yazar.
+
+    Yazım yolu (``upsert_rates``) Postgres'e özel olduğu için satırlar doğrudan
+    eklenir; ``doviz_ozet`` yazım yolundaki gibi güncellenir.
+    """
+    from common.db import doviz_kurlari, doviz_ozet
+
+    def insert(tarih, rates):
+        now = datetime.utcnow()
+        with api.app.app_context():
+            with api.db.engine.begin() as connection:
+                for code, value in rates.items():
+                    connection.execute(doviz_kurlari.insert().values(
+                        tarih=tarih, doviz_kodu=code, doviz_adi=code, alis_kuru=value, satis_kuru=value,
+                        efektif_alis=value, efektif_satis=value, created_at=now
+                    ))
+                    summary = connection.execute(
+                        doviz_ozet.select().where(doviz_ozet.c.doviz_kodu == code)
+                    ).mappings().first()
+                    if summary is None:
+                        connection.execute(doviz_ozet.insert().values(
+                            doviz_kodu=code, doviz_adi=code, kayit_sayisi=1, ilk_tarih=tarih, son_tarih=tarih,
+                            son_guncelleme=now
+                        ))
+                    else:
+                        connection.execute(doviz_ozet.update().where(doviz_ozet.c.doviz_kodu == code).values(
+                            kayit_sayisi=summary['kayit_sayisi'] + 1,
+                            ilk_tarih=min(summary['ilk_tarih'], tarih),
+                            son_tarih=max(summary['son_tarih'], tarih),
+                            son_guncelleme=now
+                        ))
+    return insert
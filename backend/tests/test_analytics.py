@@ -0,0 +1,60 @@
+from datetime import date, timedelta
+
+import pytest
+
+import analytics
+
+
+def test_lookback_start_covers_window():
+    start = date(2024, 5, 20)
+
+    # 20 iş günü ~ 28 takvim günü, tatiller için 10 gün pay
+    assert analytics.lookback_start(start, 20) == start - timedelta(days=38)
+    assert analytics.lookback_start(None, 20) is None
+    assert analytics.lookback_start(start, 0) == start
+
+
+def test_lookback_start_max_window_is_representable():
+    assert analytics.lookback_start(date(1990, 1, 1), analytics.MAX_WINDOW) > date.min
+
+
+@pytest.fixture
+def history(seed):
+    day = date(2024, 4, 1)
+    for i in range(30):
+        if (day + timedelta(days=i)).weekday() < 5:
+            seed(day + timedelta(days=i), {'USD': 32.0 + i / 10, 'EUR': 34.0 - i / 20})
+
+
+@pytest.mark.parametrize('window', [1, analytics.MAX_WINDOW + 1, 10 ** 12])
+def test_window_out_of_range_is_rejected(client, history, window):
+    response = client.get(f'/api/analytics/volatility?currencies=USD&window={window}')
+
+    assert response.status_code == 400
+
+
+def test_moving_average_window(client, history):
+    response = client.get('/api/analytics/moving-average?currencies=USD&window=5&start_date=2024-04-15')
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['dates'][0] == '2024-04-15'
+    # Pencere geriye dönük yüklenen günlerle dolar: 9-12 ve 15 Nisan (13-14 hafta sonu)
+    assert body['series']['USD'][0] == pytest.approx(32.0 + (8 + 9 + 10 + 11 + 14) / 50)
+
+
+def test_correlation_ignores_lookback_days(client, seed):
+    # Aralık öncesinde kurlar ters, aralıkta aynı yönde hareket eder
+    day = date(2024, 4, 1)
+    for i, (usd, eur) in enumerate([(30, 40), (33, 37), (30, 40), (33, 37), (30, 40)]):
+        seed(day + timedelta(days=i), {'USD': usd, 'EUR': eur})
+    day = date(2024, 4, 8)
+    for i, (usd, eur) in enumerate([(31, 41), (32, 42), (31, 41), (33, 43), (32, 42)]):
+        seed(day + timedelta(days=i), {'USD': usd, 'EUR': eur})
+
+    response = client.get('/api/analytics/correlation?currencies=USD,EUR&start_date=2024-04-08')
+    full = client.get('/api/analytics/correlation?currencies=USD,EUR&start_date=2024-03-01')
+
+    assert response.status_code == 200
+    assert response.get_json()['matrix'][0][1] > 0.9
+    assert full.get_json()['matrix'][0][1] < response.get_json()['matrix'][0][1]
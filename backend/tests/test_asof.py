@@ -0,0 +1,96 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+import asof
+from asof import DateIndexCache, convert_as_of
+
+
+class FakeHistory:
+    """2, 3 ve 6 Mayıs 2024 için USD/EUR satış kurları (3 Mayıs'ta EUR yok)"""
+
+    dates = np.array(['2024-05-02', '2024-05-03', '2024-05-06'], dtype='datetime64[D]')
+    rates = np.array([
+        [32.0, 34.0, 1.0],
+        [32.5, np.nan, 1.0],
+        [33.0, 35.0, 1.0],
+    ])
+
+    def __init__(self):
+        self.requested = []
+
+    def sell_rates(self, positions):
+        self.requested.append(list(positions))
+        return {'USD': 0, 'EUR': 1, 'TRY': 2}, self.rates[positions]
+
+
+def test_weekend_resolves_to_previous_business_day():
+    history = FakeHistory()
+    result = convert_as_of(history, [10, 1], ['USD', 'USD'], ['TRY', 'TRY'], ['2024-05-05', '2024-05-03'])
+
+    assert result.rate_dates == ['2024-05-03', '2024-05-03']
+    assert result.converted.tolist() == [325.0, 32.5]
+    assert result.errors == [None, None]
+    # Aynı güne düşen kalemler tek satırı paylaşır
+    assert history.requested == [[1]]
+
+
+def test_missing_date_uses_latest_day():
+    result = convert_as_of(FakeHistory(), [1], ['EUR'], ['USD'], [None])
+
+    assert result.rate_dates == ['2024-05-06']
+    assert result.converted[0] == pytest.approx(35.0 / 33.0)
+
+
+@pytest.mark.parametrize('amount, code, day, error', [
+    ('abc', 'USD', '2024-05-02', 'Geçersiz miktar'),
+    (1, 'USD', '02.05.2024', 'Geçersiz tarih, YYYY-MM-DD olmalı'),
+    (1, 'USD', '2024-05-01', '2024-05-01 veya öncesi için kur bulunamadı'),
+    (1, 'XYZ', '2024-05-02', '2024-05-02 tarihinde XYZ para birimi için kur bulunamadı'),
+    (1, 'EUR', '2024-05-03', '2024-05-03 tarihinde EUR para birimi için kur bulunamadı'),
+])
+def test_invalid_items_get_errors(amount, code, day, error):
+    result = convert_as_of(FakeHistory(), [amount, 1], [code, 'USD'], ['TRY', 'TRY'], [day, '2024-05-02'])
+
+    assert result.errors == [error, None]
+    assert np.isnan(result.converted[0])
+    assert result.converted[1] == 32.0
+
+
+def test_date_index_reloads_only_when_token_changes(monkeypatch):
+    loads = []
+    monkeypatch.setattr(asof, 'load_dates', lambda connection: loads.append(connection) or FakeHistory.dates)
+    cache = DateIndexCache()
+
+    cache.get('a', 'conn')
+    cache.get('a', 'conn')
+    assert len(loads) == 1
+
+    cache.get('b', 'conn')
+    assert len(loads) == 2
+
+
+def test_convert_endpoint_resolves_weekend(client, seed):
+    seed(date(2024, 5, 3), {'USD': 32.5})
+    seed(date(2024, 5, 6), {'USD': 33.0})
+
+    response = client.post('/api/convert', json={
+        'amount': 2, 'from_currency': 'USD', 'to_currency': 'TRY', 'date': '2024-05-05'
+    })
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['rate_date'] == '2024-05-03'
+    assert body['converted_amount'] == 65.0
+
+
+def test_convert_endpoint_sees_backfilled_day(api, client, seed):
+    seed(date(2024, 5, 6), {'USD': 33.0})
+    payload = {'amount': 1, 'from_currency': 'USD', 'to_currency': 'TRY', 'date': '2024-05-03'}
+    assert client.post('/api/convert', json=payload).status_code == 404
+
+    seed(date(2024, 5, 3), {'USD': 32.5})
+    api.rate_snapshots.invalidate()
+
+    assert client.post('/api/convert', json=payload).get_json()['rate_date'] == '2024-05-03'
@@ -0,0 +1,56 @@
+from datetime import date
+
+import pytest
+
+
+@pytest.fixture
+def rates(seed):
+    seed(date(2024, 5, 2), {'USD': 32.0, 'EUR': 34.0})
+
+
+def test_batch_items(client, rates):
+    response = client.post('/api/convert/batch', json={'items': [
+        {'amount': 100, 'from_currency': 'USD', 'to_currency': 'TRY'},
+        {'amount': 'x', 'from_currency': 'USD', 'to_currency': 'EUR'},
+        {'amount': 5, 'from_currency': 'ZZZ', 'to_currency': 'TRY'},
+    ]})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['converted_amounts'] == [3200.0, None, None]
+    assert [error['index'] for error in body['errors']] == [1, 2]
+
+
+@pytest.mark.parametrize('items, index', [
+    (['x'], 0),
+    ([{'amount': 1, 'from_currency': 'USD', 'to_currency': 'TRY'}, None], 1),
+    ([{'amount': 1, 'from_currency': 'USD', 'to_currency': 'TRY'}, [1, 'USD', 'TRY']], 1),
+])
+def test_batch_rejects_non_object_items(client, rates, items, index):
+    response = client.post('/api/convert/batch', json={'items': items})
+
+    assert response.status_code == 400
+    assert response.get_json()['index'] == index
+
+
+@pytest.mark.parametrize('item', [
+    {'from_currency': 'USD', 'to_currency': 'TRY'},
+    {'amount': 1, 'to_currency': 'TRY'},
+    {'amount': 1, 'from_currency': 'USD', 'to_currency': ''},
+    {'amount': 1, 'from_currency': ['USD'], 'to_currency': 'TRY'},
+])
+def test_batch_rejects_missing_fields(client, rates, item):
+    valid = {'amount': 1, 'from_currency': 'USD', 'to_currency': 'TRY'}
+    response = client.post('/api/convert/batch', json={'items': [valid, item]})
+
+    assert response.status_code == 400
+    assert response.get_json()['index'] == 1
+
+
+def test_batch_columnar_rejects_unhashable_codes(client, rates):
+    response = client.post('/api/convert/batch', json={
+        'amounts': [1, 2], 'from_currencies': ['USD', {'code': 'EUR'}], 'to_currencies': ['TRY', 'TRY']
+    })
+
+    assert response.status_code == 400
+    assert response.get_json()['index'] == 1
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from history import columnar_payload, lttb_indices, resample_ohlc
+
+
+def daily_frame(values):
+    """{'2024-05-09': 1.0, ...} sözlüğünden tek dövizli (USD) günlük tablo"""
+    index = pd.DatetimeIndex(pd.to_datetime(list(values)), name='tarih')
+    frame = pd.DataFrame({'USD': list(values.values())}, index=index, dtype=np.float64)
+    frame.columns.name = 'doviz_kodu'
+    return frame
+
+
+def test_weekly_buckets_start_on_monday():
+    # Perşembe, cuma ve sonraki pazartesi
+    frame = daily_frame({'2024-05-09': 1.0, '2024-05-10': 2.0, '2024-05-13': 3.0})
+
+    ohlc = resample_ohlc(frame, 'week')
+
+    assert list(ohlc.index.strftime('%Y-%m-%d')) == ['2024-05-06', '2024-05-13']
+    assert ohlc.loc['2024-05-06', ('USD', 'open')] == 1.0
+    assert ohlc.loc['2024-05-06', ('USD', 'close')] == 2.0
+    assert ohlc.loc['2024-05-13', ('USD', 'open')] == 3.0
+
+
+def test_weekly_bucket_spans_monday_to_sunday():
+    frame = daily_frame({'2024-05-13': 5.0, '2024-05-15': 7.0, '2024-05-19': 4.0, '2024-05-20': 6.0})
+
+    ohlc = resample_ohlc(frame, 'week')
+
+    assert list(ohlc.index.strftime('%Y-%m-%d')) == ['2024-05-13', '2024-05-20']
+    week = ohlc.loc['2024-05-13', 'USD']
+    assert (week['open'], week['high'], week['low'], week['close']) == (5.0, 7.0, 4.0, 4.0)
+
+
+@pytest.mark.parametrize('interval, labels', [
+    ('month', ['2024-01-01', '2024-02-01']),
+    ('year', ['2024-01-01']),
+])
+def test_month_and_year_buckets_labeled_with_period_start(interval, labels):
+    frame = daily_frame({'2024-01-02': 1.0, '2024-01-31': 2.0, '2024-02-01': 3.0})
+
+    assert list(resample_ohlc(frame, interval).index.strftime('%Y-%m-%d')) == labels
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    x = np.arange(100, dtype=np.float64)
+    y = np.zeros(100)
+    y[37] = 10.0
+    y[71] = -10.0
+
+    indices = lttb_indices(x, y, 10)
+
+    assert len(indices) == 10
+    assert indices[0] == 0 and indices[-1] == 99
+    assert np.all(np.diff(indices) > 0)
+    assert 37 in indices and 71 in indices
+
+
+@pytest.mark.parametrize('threshold', [2, 100, 150])
+def test_lttb_returns_all_points_when_not_reducing(threshold):
+    x = np.arange(100, dtype=np.float64)
+
+    assert np.array_equal(lttb_indices(x, np.sin(x), threshold), np.arange(100))
+
+
+def test_columnar_payload_points_per_series():
+    frame = daily_frame({f'2024-05-{day:02d}': float(day % 5) for day in range(1, 31)})
+
+    payload = columnar_payload(frame, 'satis_kuru', points=5)
+
+    series = payload['series']['USD']
+    assert len(series['dates']) == len(series['values']) == 5
+    assert series['dates'][0] == '2024-05-01' and series['dates'][-1] == '2024-05-30'
@@ -0,0 +1,145 @@
+from datetime import date, datetime
+
+import pytest
+from flask import Flask, jsonify, request
+
+from common.db import doviz_kurlari, doviz_ozet
+from http_cache import GZIP_ETAG_SUFFIX, GZIP_MIN_SIZE, IMMUTABLE_MAX_AGE, ResponseCache, conditional, mark_incomplete
+
+
+@pytest.fixture
+def state():
+    return {'version': '1', 'incomplete': False, 'calls': 0}
+
+
+@pytest.fixture
+def mini(state):
+    """``?past=1`` isteklerini geçmiş aralık sayan küçük bir uygulama"""
+    app = Flask(__name__)
+
+    @app.route('/data')
+    @conditional(
+        lambda: state['version'], cache=ResponseCache(),
+        immutable_if=lambda: request.args.get('past') == '1'
+    )
+    def data():
+        state['calls'] += 1
+        if state['incomplete']:
+            mark_incomplete()
+        return jsonify({'version': state['version'], 'padding': 'x' * state.get('padding', 0)})
+
+    return app.test_client()
+
+
+def is_immutable(response):
+    return f'max-age={IMMUTABLE_MAX_AGE}, immutable' in response.headers['Cache-Control']
+
+
+def test_past_range_etag_follows_version(mini, state):
+    first = mini.get('/data?past=1')
+    state['version'] = '2'
+    second = mini.get('/data?past=1', headers={'If-None-Match': first.headers['ETag']})
+
+    assert is_immutable(first)
+    assert second.status_code == 200
+    assert second.headers['ETag'] != first.headers['ETag']
+    assert second.get_json()['version'] == '2'
+
+
+def test_immutable_flag_survives_cache_hit_and_304(mini, state):
+    first = mini.get('/data?past=1')
+    cached = mini.get('/data?past=1')
+    revalidated = mini.get('/data?past=1', headers={'If-None-Match': first.headers['ETag']})
+
+    assert state['calls'] == 1
+    assert is_immutable(cached)
+    assert revalidated.status_code == 304
+    assert is_immutable(revalidated)
+
+
+def test_incomplete_past_range_is_not_immutable(mini, state):
+    state['incomplete'] = True
+    first = mini.get('/data?past=1')
+    cached = mini.get('/data?past=1')
+    revalidated = mini.get('/data?past=1', headers={'If-None-Match': first.headers['ETag']})
+
+    assert state['calls'] == 1
+    for response in (first, cached, revalidated):
+        assert 'must-revalidate' in response.headers['Cache-Control']
+
+
+def test_current_data_is_short_lived(mini):
+    assert mini.get('/data').headers['Cache-Control'] == 'public, max-age=60, must-revalidate'
+
+
+def test_gzip_body_has_its_own_etag(mini, state):
+    state['padding'] = GZIP_MIN_SIZE
+    plain = mini.get('/data')
+    gzipped = mini.get('/data', headers={'Accept-Encoding': 'gzip'})
+
+    assert gzipped.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Encoding' not in plain.headers
+    assert gzipped.headers['ETag'] != plain.headers['ETag']
+    assert gzipped.headers['ETag'] == plain.headers['ETag'][:-1] + GZIP_ETAG_SUFFIX + '"'
+
+
+def test_both_encoded_etags_revalidate(mini, state):
+    state['padding'] = GZIP_MIN_SIZE
+    plain = mini.get('/data')
+    gzipped = mini.get('/data', headers={'Accept-Encoding': 'gzip'})
+
+    for etag in (plain.headers['ETag'], gzipped.headers['ETag']):
+        response = mini.get('/data', headers={'If-None-Match': etag, 'Accept-Encoding': 'gzip'})
+        assert response.status_code == 304
+        assert response.headers['ETag'] == etag
+
+
+HISTORY_URL = '/api/rates/history?doviz_kodu=USD&start_date=2024-05-01&end_date=2024-05-03'
+
+
+def test_backfilled_past_range_is_served_fresh(api, client, seed):
+    seed(date(2024, 5, 2), {'USD': 32.0})
+    seed(date(2024, 5, 6), {'USD': 33.0})
+
+    first = client.get(HISTORY_URL)
+    assert len(first.get_json()['data']) == 1
+    # 1 Mayıs henüz yüklenmemiş; aralık backfill ile dolabilir
+    assert not is_immutable(first)
+
+    seed(date(2024, 5, 1), {'USD': 31.0})
+    # Scheduler'ın duyurusu veya sürüm kontrol aralığı
+    api.rate_snapshots.invalidate()
+
+    second = client.get(HISTORY_URL, headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 200
+    assert [row['tarih'] for row in second.get_json()['data']] == ['2024-05-02', '2024-05-01']
+    assert is_immutable(second)
+
+
+def test_corrected_past_day_is_served_fresh(api, client, seed):
+    seed(date(2024, 5, 1), {'USD': 31.0})
+    seed(date(2024, 5, 6), {'USD': 33.0})
+    first = client.get(HISTORY_URL)
+    assert is_immutable(first)
+
+    # upsert_rates(update=True) ile düzeltme: değer ve son_guncelleme değişir
+    with api.app.app_context():
+        with api.db.engine.begin() as connection:
+            connection.execute(doviz_kurlari.update().where(doviz_kurlari.c.tarih == date(2024, 5, 1)).values(
+                satis_kuru=31.5
+            ))
+            connection.execute(doviz_ozet.update().values(son_guncelleme=datetime.utcnow()))
+    api.rate_snapshots.invalidate()
+
+    second = client.get(HISTORY_URL, headers={'If-None-Match': first.headers['ETag']})
+    assert second.status_code == 200
+    assert second.get_json()['data'][0]['satis_kuru'] == 31.5
+
+
+def test_empty_past_analytics_is_not_immutable(client, seed):
+    seed(date(2024, 5, 6), {'USD': 33.0})
+
+    response = client.get('/api/analytics/returns?currencies=USD&start_date=2024-04-01&end_date=2024-04-30')
+
+    assert response.status_code == 200
+    assert not is_immutable(response)
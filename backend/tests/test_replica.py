@@ -0,0 +1,74 @@
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+import replica
+from replica import ReplicaRouter
+
+REPLICA = 'replica-engine'
+
+
+class FakeSession:
+    def connection(self, bind_arguments=None):
+        return (bind_arguments or {}).get('bind', 'primary')
+
+
+class FakeDB:
+    """Birincil ve replika bağlantılarının veri sürümlerini tutar"""
+
+    def __init__(self):
+        self.engines = {'replica': REPLICA}
+        self.session = FakeSession()
+        self.versions = {'primary': '2-10-a', REPLICA: '2-10-a'}
+        self.reads = []
+
+
+@pytest.fixture
+def db(monkeypatch):
+    db = FakeDB()
+
+    def fake_data_version(connection):
+        db.reads.append(connection)
+        return db.versions[connection]
+
+    monkeypatch.setattr(replica, 'data_version', fake_data_version)
+    return db
+
+
+def snapshot(version):
+    # Backfill ve düzeltmeler en son günü değiştirmez
+    return SimpleNamespace(version=version, tarih=date(2024, 5, 6))
+
+
+def test_caught_up_replica_is_checked_once_per_version(db):
+    router = ReplicaRouter(db, enabled=True)
+
+    assert router.bind_arguments(snapshot(1)) == {'bind': REPLICA}
+    assert router.bind_arguments(snapshot(1)) == {'bind': REPLICA}
+    assert db.reads == ['primary', REPLICA]
+
+
+def test_backfill_routes_to_primary_until_replica_catches_up(db):
+    router = ReplicaRouter(db, enabled=True)
+    router.bind_arguments(snapshot(1))
+
+    db.versions['primary'] = '2-12-b'
+    assert router.bind_arguments(snapshot(2)) == {}
+    assert router.bind_arguments(snapshot(2)) == {}
+
+    db.versions[REPLICA] = '2-12-b'
+    assert router.bind_arguments(snapshot(2)) == {'bind': REPLICA}
+    # Birincildeki değer sürüm başına bir kez okunur
+    assert db.reads.count('primary') == 2
+
+
+def test_unreachable_replica_falls_back_to_primary(db):
+    del db.versions[REPLICA]
+
+    assert ReplicaRouter(db, enabled=True).bind_arguments(snapshot(1)) == {}
+
+
+def test_disabled_router_uses_primary(db):
+    assert ReplicaRouter(db).bind_arguments(snapshot(1)) == {}
+    assert db.reads == []
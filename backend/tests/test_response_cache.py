@@ -0,0 +1,74 @@
+from http_cache import GZIP_MIN_SIZE, ResponseCache
+
+
+class FakeRedis:
+    """ResponseCache'in kullandığı hash komutlarının bellekteki karşılığı"""
+
+    def __init__(self):
+        self.hashes = {}
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def pipeline(self):
+        return self
+
+    def hset(self, key, mapping):
+        self.hashes[key] = {
+            name.encode(): value.encode() if isinstance(value, str) else value for name, value in mapping.items()
+        }
+
+    def expire(self, key, ttl):
+        pass
+
+    def execute(self):
+        pass
+
+
+def test_entries_are_served_only_for_their_version():
+    cache = ResponseCache()
+    cache.put('etag', 1, b'{"data": []}', 'application/json')
+
+    assert cache.get('etag', 1).body == b'{"data": []}'
+    assert cache.get('etag', 2) is None
+
+
+def test_version_change_drops_local_entries():
+    cache = ResponseCache()
+    cache.put('a', 1, b'1', 'application/json')
+    cache.get('b', 2)
+
+    # Eski sürüme dönülse de atılan girdi geri gelmez
+    assert cache.get('a', 1) is None
+    assert cache._size == 0
+
+
+def test_late_put_for_old_version_is_not_served_for_new_version():
+    cache = ResponseCache()
+    cache.put('a', 2, b'new', 'application/json')
+
+    # Eski sürümle hesaplanıp geç gelen gövde yeni sürümle sunulmaz
+    cache.put('a', 1, b'old', 'application/json')
+    assert cache.get('a', 2) is None
+
+
+def test_redis_entries_are_keyed_by_version():
+    redis = FakeRedis()
+    body = b'x' * GZIP_MIN_SIZE
+    ResponseCache(redis).put('etag', 7, body, 'application/json')
+
+    # Başka bir worker aynı sürümü Redis'ten alır, yeni sürümde eski gövdeyi görmez
+    other = ResponseCache(redis)
+    entry = other.get('etag', 7)
+    assert entry.body == body and entry.gzip_body
+    assert ResponseCache(redis).get('etag', 8) is None
+
+
+def test_local_size_is_bounded():
+    cache = ResponseCache(max_bytes=10)
+    for i in range(5):
+        cache.put(str(i), 1, b'abcd', 'text/plain')
+
+    assert cache._size <= 10
+    assert cache.get('4', 1) is not None
+    assert cache.get('0', 1) is None
@@ -0,0 +1,68 @@
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+
+from common.db import ROLLUP_TABLES, doviz_kurlari, metadata, refresh_rollups
+from history import load_history_frame, resample_ohlc, rollup_history_ohlc, split_periods
+
+
+@pytest.mark.parametrize('start, end, full, edges', [
+    (date(2024, 1, 15), date(2024, 4, 10), (date(2024, 2, 1), date(2024, 4, 1)), [
+        (date(2024, 1, 15), date(2024, 1, 31)), (date(2024, 4, 1), date(2024, 4, 10)),
+    ]),
+    (date(2024, 2, 1), date(2024, 3, 31), (date(2024, 2, 1), date(2024, 4, 1)), []),
+    (None, date(2024, 3, 31), (None, date(2024, 4, 1)), []),
+    (date(2024, 2, 1), None, (date(2024, 2, 1), None), []),
+    # Tam dönem içermeyen aralıklar tamamen ham veriden hesaplanır
+    (date(2024, 2, 3), date(2024, 2, 20), None, [(date(2024, 2, 3), date(2024, 2, 20))]),
+    (date(2024, 1, 15), date(2024, 2, 10), None, [(date(2024, 1, 15), date(2024, 2, 10))]),
+])
+def test_split_periods_month(start, end, full, edges):
+    assert split_periods('month', start, end) == (full, edges)
+
+
+def test_split_periods_year():
+    assert split_periods('year', date(2023, 6, 1), date(2024, 12, 31)) == (
+        (date(2024, 1, 1), date(2025, 1, 1)), [(date(2023, 6, 1), date(2023, 12, 31))]
+    )
+
+
+@pytest.fixture
+def connection():
+    engine = create_engine('sqlite://')
+    metadata.create_all(engine, tables=[doviz_kurlari, *ROLLUP_TABLES.values()])
+    with engine.begin() as connection:
+        day = date(2023, 11, 1)
+        rows = []
+        for i in range(200):
+            current = day + timedelta(days=i)
+            if current.weekday() < 5:
+                for code, base in (('USD', 30.0), ('EUR', 33.0)):
+                    value = base + (i % 17) / 10
+                    rows.append({
+                        'tarih': current, 'doviz_kodu': code, 'doviz_adi': code, 'alis_kuru': value,
+                        'satis_kuru': value + 0.1, 'efektif_alis': value, 'efektif_satis': value + 0.2
+                    })
+        connection.execute(doviz_kurlari.insert(), rows)
+        refresh_rollups(connection)
+        yield connection
+
+
+@pytest.mark.parametrize('interval, start, end', [
+    ('month', date(2023, 11, 15), date(2024, 3, 20)),
+    ('month', date(2023, 12, 1), date(2024, 2, 29)),
+    ('month', None, None),
+    ('year', date(2023, 11, 20), date(2024, 4, 5)),
+])
+def test_rollup_merge_matches_raw_resample(connection, interval, start, end):
+    codes = ['USD', 'EUR', 'GBP']
+
+    def load_frame(codes, field, start, end):
+        return load_history_frame(connection, codes, field, start, end)
+
+    merged = rollup_history_ohlc(connection, load_frame, interval, codes, 'satis_kuru', start, end)
+    expected = resample_ohlc(load_frame(codes, 'satis_kuru', start, end), interval)
+
+    pd.testing.assert_frame_equal(merged, expected, check_names=False, check_freq=False)
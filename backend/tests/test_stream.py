@@ -0,0 +1,47 @@
+from contextlib import nullcontext
+
+from stream import RateEventHub
+
+
+class FakeStore:
+    def __init__(self):
+        self.callbacks = []
+
+    def get(self):
+        return None
+
+    def on_update(self, callback):
+        self.callbacks.append(callback)
+
+
+def test_subscribe_stops_at_max_clients():
+    hub = RateEventHub(FakeStore(), nullcontext, max_clients=2)
+
+    first = hub.subscribe()
+    second = hub.subscribe()
+
+    assert first is not None and second is not None
+    assert hub.subscribe() is None
+
+    hub.unsubscribe(first)
+    assert hub.subscribe() is not None
+
+
+def test_closed_stream_frees_its_slot():
+    hub = RateEventHub(FakeStore(), nullcontext, max_clients=1)
+    client = hub.subscribe()
+
+    events = hub.events(client)
+    assert next(events).startswith('retry:')
+    events.close()
+
+    assert hub.subscribe() is not None
+
+
+def test_stream_endpoint_returns_503_when_full(api, client, monkeypatch):
+    monkeypatch.setattr(api.rate_events, 'max_clients', 0)
+
+    response = client.get('/api/rates/stream')
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '30'
@@ -0,0 +1 @@
+"""API ve veri toplama yolları için yerel yük testi ve mikro benchmark araçları."""
@@ -0,0 +1,241 @@
+"""API yük testi: uç nokta başına saniyedeki istek sayısı ve p50/p90/p99 gecikme.
+
+Varsayılan olarak geçici bir SQLite veritabanı sentetik kurlarla doldurulur,
+API ayrı bir süreçte (kuruluysa gunicorn, yoksa Flask geliştirme sunucusu)
+başlatılır ve her senaryo verilen eş zamanlılık düzeylerinde sabit süre
+boyunca çalıştırılır. ``--url`` ile çalışan bir sunucu da ölçülebilir.
+
+    python -m benchmarks.api_bench --years 5 --duration 10 --concurrency 1,16 --output api.json
+"""
+import argparse
+import itertools
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+import requests
+
+from benchmarks.results import run_info, summarize, write_results
+from benchmarks.seed import seed_database
+from benchmarks.synthetic import CURRENCIES, DEFAULT_END, SyntheticRates
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(ROOT_DIR, 'backend')
+
+# Redis verilmezse API Redis'siz (yalnızca süreç içi cache ile) çalışır
+NO_REDIS_URL = 'redis://127.0.0.1:1'
+
+
+def scenarios(data):
+    """(ad, metot, yol, gövde üreteci) listesi; gövdeler istek sırasına göre döner"""
+    codes = [code for code, _, _ in data.currencies]
+    pairs = [(a, b) for a in codes for b in codes + ['TRY'] if a != b]
+    last = data.days[-1]
+    year_ago = (last - timedelta(days=365)).isoformat()
+    quarter_ago = (last - timedelta(days=90)).isoformat()
+
+    def convert_bodies():
+        for i, (from_code, to_code) in enumerate(itertools.cycle(pairs)):
+            yield {'amount': 100 + i % 1000, 'from_currency': from_code, 'to_currency': to_code}
+
+    def as_of_bodies():
+        days = data.days
+        for i, (from_code, to_code) in enumerate(itertools.cycle(pairs)):
+            day = days[(i * 7919) % len(days)]
+            yield {'amount': 100, 'from_currency': from_code, 'to_currency': to_code, 'date': day.isoformat()}
+
+    main = codes[0]
+    return [
+        ('rates_latest', 'GET', '/api/rates/latest', None),
+        ('convert', 'POST', '/api/convert', convert_bodies),
+        ('convert_as_of', 'POST', '/api/convert', as_of_bodies),
+        ('rates_history', 'GET', f'/api/rates/history?doviz_kodu={main}&start_date={quarter_ago}', None),
+        ('rates_history_columnar', 'GET',
+         f'/api/rates/history?format=columnar&currencies={",".join(codes[:5])}&start_date={year_ago}', None),
+        ('stats', 'GET', '/api/stats', None),
+        ('export_csv', 'GET', f'/api/rates/export?start_date={year_ago}', None),
+    ]
+
+
+def run_load(base_url, method, path, bodies, concurrency, duration, warmup):
+    """Senaryoyu ``concurrency`` thread ile ``duration`` saniye çalıştırır"""
+    url = base_url + path
+    body_iter = bodies() if bodies else None
+    body_lock = threading.Lock()
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    start_at = time.perf_counter() + warmup
+    stop_at = start_at + duration
+
+    def next_body():
+        if body_iter is None:
+            return None
+        with body_lock:
+            return next(body_iter)
+
+    def worker(slot):
+        session = requests.Session()
+        while True:
+            body = next_body()
+            started = time.perf_counter()
+            if started >= stop_at:
+                break
+            try:
+                response = session.request(method, url, json=body, timeout=30)
+                failed = response.status_code >= 400
+            except requests.RequestException:
+                failed = True
+            finished = time.perf_counter()
+            # Isınma süresindeki istekler sayılmaz
+            if started >= start_at:
+                latencies[slot].append(finished - started)
+                errors[slot] += failed
+        session.close()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return summarize(
+        [value for values in latencies for value in values], duration, sum(errors), concurrency=concurrency
+    )
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(kind, env, port, log_path):
+    """API'yi ayrı süreçte başlatır ve sağlık kontrolü yanıt verene kadar bekler"""
+    if kind == 'gunicorn':
+        command = [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py', 'app:app']
+    else:
+        command = [sys.executable, '-m', 'flask', '--app', 'app', 'run', '--port', str(port), '--with-threads']
+
+    log = open(log_path, 'w')
+    process = subprocess.Popen(
+        command, cwd=BACKEND_DIR, env=dict(env, PORT=str(port)), stdout=log, stderr=subprocess.STDOUT
+    )
+
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"API başlatılamadı, log: {log_path}")
+        try:
+            requests.get(base_url + '/api/health', timeout=1)
+            return process, base_url
+        except requests.RequestException:
+            time.sleep(0.2)
+
+    process.terminate()
+    raise RuntimeError(f"API 60 saniyede yanıt vermedi, log: {log_path}")
+
+
+def default_server():
+    try:
+        import gunicorn  # noqa: F401
+        return 'gunicorn'
+    except ImportError:
+        return 'flask'
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='API uç noktaları için yük testi')
+    parser.add_argument('--url', help='Ölçülecek çalışan API adresi (verilirse tohumlama ve sunucu atlanır)')
+    parser.add_argument('--database-url', help='Tohumlanacak veritabanı (varsayılan: geçici SQLite)')
+    parser.add_argument('--redis-url', help='API için Redis adresi (varsayılan: Redis yok)')
+    parser.add_argument('--server', choices=['gunicorn', 'flask'], default=default_server())
+    parser.add_argument('--rate-store', action='store_true', help='API için mmap kur deposunu kur')
+    parser.add_argument('--years', type=int, default=5, help='Sentetik veri yılı')
+    parser.add_argument('--end', type=date.fromisoformat, default=DEFAULT_END, help='Son kur günü (YYYY-MM-DD)')
+    parser.add_argument('--currencies', type=int, default=len(CURRENCIES), help='Döviz sayısı')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--duration', type=float, default=10, help='Senaryo başına ölçüm süresi (sn)')
+    parser.add_argument('--warmup', type=float, default=1, help='Ölçüme alınmayan ısınma süresi (sn)')
+    parser.add_argument('--concurrency', default='1,16', help='Virgülle ayrılmış eş zamanlı istemci sayıları')
+    parser.add_argument('--scenarios', help='Yalnızca verilen senaryolar (virgülle ayrılmış)')
+    parser.add_argument('--output', help='JSON sonuç dosyası (varsayılan: standart çıktı)')
+    parser.add_argument('--keep', action='store_true', help='Geçici çalışma dizinini silme')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    concurrency_levels = [int(value) for value in args.concurrency.split(',')]
+
+    data = SyntheticRates.years_until(args.end, args.years, args.currencies, args.seed)
+    selected = scenarios(data)
+    if args.scenarios:
+        names = set(args.scenarios.split(','))
+        selected = [scenario for scenario in selected if scenario[0] in names]
+
+    workdir = tempfile.mkdtemp(prefix='doviz-bench-')
+    process = None
+    results = run_info(vars(args))
+    try:
+        if args.url:
+            base_url = args.url.rstrip('/')
+        else:
+            database_url = args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+            env = dict(
+                os.environ,
+                DATABASE_URL=database_url,
+                REDIS_URL=args.redis_url or NO_REDIS_URL,
+                RATE_STORE_DIR=os.path.join(workdir, 'rate_store'),
+                GUNICORN_ACCESS_LOG='/dev/null',
+                # Docker'daki gibi ortak paket (common) içe aktarılabilsin
+                PYTHONPATH=os.pathsep.join(filter(None, [ROOT_DIR, os.environ.get('PYTHONPATH')]))
+            )
+            env.pop('PROMETHEUS_MULTIPROC_DIR', None)
+
+            from sqlalchemy import create_engine
+            engine = create_engine(database_url)
+            started = time.perf_counter()
+            rows = seed_database(engine, data)
+            results['seed'] = {'rows': rows, 'days': len(data.days), 'elapsed_s': round(time.perf_counter() - started, 3)}
+
+            if args.rate_store:
+                from common.store import RateStoreWriter
+                with engine.connect() as connection:
+                    RateStoreWriter(env['RATE_STORE_DIR']).rebuild(connection)
+            engine.dispose()
+
+            process, base_url = start_server(args.server, env, free_port(), os.path.join(workdir, 'api.log'))
+
+        results['scenarios'] = {}
+        for name, method, path, bodies in selected:
+            for concurrency in concurrency_levels:
+                key = f'{name}@c{concurrency}'
+                summary = run_load(base_url, method, path, bodies, concurrency, args.duration, args.warmup)
+                results['scenarios'][key] = dict(summary, endpoint=f'{method} {path.split("?")[0]}')
+                print(
+                    f"{key}: {summary['throughput_per_s']} istek/sn, p50 {summary.get('p50_ms')} ms, "
+                    f"p99 {summary.get('p99_ms')} ms, {summary['errors']} hata",
+                    file=sys.stderr
+                )
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+        if args.keep:
+            print(f"Çalışma dizini: {workdir}", file=sys.stderr)
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    write_results(results, args.output)
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""İki benchmark sonuç dosyasını karşılaştırır.
+
+Ortak senaryoların p50/p99 gecikme ve saniyedeki işlem sayısı değişimleri
+yüzde olarak listelenir. p99 gecikmesi eşikten fazla artan veya işlem
+sayısı eşikten fazla düşen senaryo varsa komut 1 ile çıkar.
+
+    python -m benchmarks.compare base.json new.json --threshold 15
+"""
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def change(old, new):
+    """Yüzde değişim; değerlerden biri yoksa None"""
+    if old in (None, 0) or new is None:
+        return None
+    return (new - old) / old * 100
+
+
+def compare(base, new, threshold):
+    """(senaryo, p50 %, p99 %, işlem/sn %, gerileme mi) satırları"""
+    rows = []
+    for name in sorted(set(base['scenarios']) & set(new['scenarios'])):
+        old, current = base['scenarios'][name], new['scenarios'][name]
+        p50 = change(old.get('p50_ms'), current.get('p50_ms'))
+        p99 = change(old.get('p99_ms'), current.get('p99_ms'))
+        throughput = change(old.get('throughput_per_s'), current.get('throughput_per_s'))
+        regressed = (p99 is not None and p99 > threshold) or (throughput is not None and throughput < -threshold)
+        rows.append((name, p50, p99, throughput, regressed))
+    return rows
+
+
+def _format(value):
+    return '-' if value is None else f'{value:+.1f}%'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark sonuçlarını karşılaştırır')
+    parser.add_argument('base', help='Referans sonuç dosyası')
+    parser.add_argument('new', help='Yeni sonuç dosyası')
+    parser.add_argument('--threshold', type=float, default=10, help='Gerileme eşiği (yüzde)')
+    args = parser.parse_args(argv)
+
+    base, new = load(args.base), load(args.new)
+    print(f"{base.get('git_revision')} -> {new.get('git_revision')}")
+    rows = compare(base, new, args.threshold)
+
+    width = max((len(row[0]) for row in rows), default=10)
+    print(f"{'senaryo':<{width}}  {'p50':>8}  {'p99':>8}  {'işlem/sn':>9}")
+    for name, p50, p99, throughput, regressed in rows:
+        flag = '  GERİLEME' if regressed else ''
+        print(f"{name:<{width}}  {_format(p50):>8}  {_format(p99):>8}  {_format(throughput):>9}{flag}")
+
+    missing = set(base['scenarios']) ^ set(new['scenarios'])
+    if missing:
+        print(f"Yalnızca bir dosyada olan senaryolar: {', '.join(sorted(missing))}")
+
+    sys.exit(1 if any(row[4] for row in rows) else 0)
+
+
+if __name__ == '__main__':
+    main()
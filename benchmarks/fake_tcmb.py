@@ -0,0 +1,122 @@
+"""Sentetik kurları TCMB'nin XML biçiminde sunan yerel HTTP sunucusu.
+
+``/kurlar/today.xml`` son günün, ``/kurlar/YYYYMM/DDMMYYYY.xml`` ilgili
+günün dosyasını döndürür; hafta sonu ve aralık dışı günler 404'tür. İstek
+başına yapay gecikme eklenebilir. Scheduler ``TCMB_BASE_URL`` bu sunucuya
+yönlendirilerek ağa çıkmadan çalıştırılır.
+"""
+import re
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+
+
+def to_xml(day, rates):
+    """Günün kurlarını TCMB kur dosyası biçiminde bayt olarak üretir"""
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        f'<Tarih_Date Tarih="{day:%d.%m.%Y}" Date="{day:%m/%d/%Y}" Bulten_No="{day:%Y}/{day.timetuple().tm_yday}">'
+    ]
+    for rate in rates:
+        parts.append(
+            f'<Currency CrossOrder="0" Kod="{rate.doviz_kodu}" CurrencyCode="{rate.doviz_kodu}">'
+            f'<Unit>1</Unit><Isim>{escape(rate.doviz_adi)}</Isim><CurrencyName>{rate.doviz_kodu}</CurrencyName>'
+            f'<ForexBuying>{rate.alis_kuru}</ForexBuying><ForexSelling>{rate.satis_kuru}</ForexSelling>'
+            f'<BanknoteBuying>{rate.efektif_alis}</BanknoteBuying><BanknoteSelling>{rate.efektif_satis}</BanknoteSelling>'
+            f'</Currency>'
+        )
+    parts.append('</Tarih_Date>')
+    return '\n'.join(parts).encode('utf-8')
+
+
+# /kurlar/YYYYMM/DDMMYYYY.xml
+DAILY_PATH = re.compile(r'^/kurlar/\d{6}/(\d{2})(\d{2})(\d{4})\.xml$')
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        if server.delay:
+            time.sleep(server.delay)
+
+        day = self._day()
+        rates = server.data.rates(day) if day and server.data else None
+        if rates is None:
+            self.send_error(404)
+            return
+
+        body = to_xml(day, rates)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/xml; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _day(self):
+        path = self.path.split('?', 1)[0]
+        if path == '/kurlar/today.xml':
+            data = self.server.data
+            return data.days[-1] if data and data.days else None
+        match = DAILY_PATH.match(path)
+        if not match:
+            return None
+        day, month, year = map(int, match.groups())
+        try:
+            return date(year, month, day)
+        except ValueError:
+            return None
+
+    def log_message(self, format, *args):
+        # İstek başına log benchmark çıktısını boğmasın
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Yüksek eş zamanlılıkta bağlantılar reddedilip yeniden denenmesin
+    request_queue_size = 128
+
+
+class FakeTCMBServer:
+    """``with FakeTCMBServer(data) as server:`` ile arka planda çalışır.
+
+    Adres ``TCMB_BASE_URL`` ortam değişkeni olarak scheduler modüllerinden
+    önce ayarlanması gerektiği için sunucu verisiz kurulup veri sonradan
+    (``server.data = ...``) verilebilir.
+    """
+
+    def __init__(self, data=None, host='127.0.0.1', port=0, delay_ms=0):
+        self._server = _Server((host, port), _Handler)
+        self._server.data = data
+        self._server.delay = delay_ms / 1000
+        self._thread = None
+
+    @property
+    def data(self):
+        return self._server.data
+
+    @data.setter
+    def data(self, data):
+        self._server.data = data
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/kurlar'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-tcmb', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
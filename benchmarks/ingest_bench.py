@@ -0,0 +1,166 @@
+"""Veri toplama yolu benchmark'ı: XML ayrıştırma, TCMB çekimi ve veritabanı yazımı.
+
+- ``parse``: tek günlük TCMB XML'inin ``parse_rates`` ile ayrıştırılması
+- ``fetch``: sahte TCMB sunucusundan ``fetch_many_rates`` ile paralel çekim
+  (farklı eş zamanlılık düzeylerinde, istenirse yapay ağ gecikmesiyle)
+- ``write``: backfill'in kullandığı ``write_rows`` ile farklı
+  grup boyutlarında (gün) ekleme, değişen kurların güncellenmesi ve
+  değişmeyen kurların yeniden yazılması
+
+Yazım yolu (``INSERT ... ON CONFLICT``, COPY) PostgreSQL'e özeldir; SQLite
+ile çalıştırıldığında ``write`` senaryoları atlanır.
+
+    python -m benchmarks.ingest_bench --database-url postgresql://... --batch-sizes 1,10,100 --output ingest.json
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from benchmarks.fake_tcmb import FakeTCMBServer, to_xml
+from benchmarks.results import run_info, summarize, write_results
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCHEDULER_DIR = os.path.join(ROOT_DIR, 'scheduler')
+
+
+def bench_parse(data, repeat):
+    from common.parser import parse_rates
+
+    documents = [to_xml(day, data.rates(day)) for day in data.days[:repeat]]
+    latencies = []
+    started = time.perf_counter()
+    for document in documents:
+        t0 = time.perf_counter()
+        parse_rates(document)
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - started, bytes_per_document=len(documents[0]))
+
+
+def bench_fetch(data, days, concurrency):
+    from common.fetcher import TCMBFetcher
+    from common.parser import UrlSource
+    from scheduler import TCMBDataCollector
+
+    latencies = []
+    errors = 0
+    fetcher = TCMBFetcher(max_concurrency=concurrency, on_response=lambda status, seconds: latencies.append(seconds))
+    # Arşiv kullanılmaz, her gün ağdan (sahte sunucudan) okunur
+    collector = TCMBDataCollector(fetcher=fetcher, source=UrlSource(fetcher))
+
+    started = time.perf_counter()
+    for _, rates in collector.fetch_many_rates(days):
+        errors += isinstance(rates, Exception)
+    elapsed = time.perf_counter() - started
+    return summarize(latencies, elapsed, errors, concurrency=concurrency, days_per_s=round(len(days) / elapsed, 2))
+
+
+def bench_write(engine, data, batch_size, max_days):
+    """Grup boyutu başına ekleme, güncelleme ve değişmeyen yeniden yazım süreleri"""
+    from benchmarks.seed import reset_database
+    from scheduler import DatabaseManager
+
+    db_manager = DatabaseManager()
+    reset_database(engine)
+    days = data.days[:max_days]
+    batches = [days[i:i + batch_size] for i in range(0, len(days), batch_size)]
+
+    def run(phase, adjust):
+        latencies = []
+        rows_total = 0
+        started = time.perf_counter()
+        for batch in batches:
+            rows = [adjust(row) for row in data.rows(batch)]
+            t0 = time.perf_counter()
+            db_manager.write_rows(rows)
+            latencies.append(time.perf_counter() - t0)
+            rows_total += len(rows)
+        elapsed = sum(latencies)
+        return phase, summarize(
+            latencies, time.perf_counter() - started,
+            batch_days=batch_size, rows=rows_total,
+            rows_per_s=round(rows_total / elapsed, 1) if elapsed else None
+        )
+
+    def changed(row):
+        return dict(row, satis_kuru=row['satis_kuru'] * 1.001)
+
+    return dict([
+        run('insert', lambda row: row),
+        run('update', changed),
+        run('unchanged', changed),
+    ])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Veri toplama yolu benchmark\'ı')
+    parser.add_argument('--database-url', help='Yazım senaryoları için PostgreSQL (varsayılan: geçici SQLite)')
+    parser.add_argument('--years', type=int, default=2, help='Sentetik veri yılı')
+    parser.add_argument('--currencies', type=int, default=22, help='Döviz sayısı')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--parse-repeat', type=int, default=200, help='Ayrıştırılacak gün sayısı')
+    parser.add_argument('--fetch-days', type=int, default=250, help='Çekilecek gün sayısı')
+    parser.add_argument('--fetch-concurrency', default='1,8', help='Virgülle ayrılmış eş zamanlı istek sayıları')
+    parser.add_argument('--fetch-delay-ms', type=float, default=20, help='Sahte sunucuda istek başına ağ gecikmesi')
+    parser.add_argument('--batch-sizes', default='1,10,100,250', help='Virgülle ayrılmış yazım grup boyutları (gün)')
+    parser.add_argument('--write-days', type=int, default=500, help='Yazılacak gün sayısı')
+    parser.add_argument('--output', help='JSON sonuç dosyası (varsayılan: standart çıktı)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix='doviz-ingest-bench-')
+    database_url = args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+
+    server = FakeTCMBServer(delay_ms=args.fetch_delay_ms).start()
+    # Scheduler modülleri adresleri ve bağlantıları içe aktarılırken okur
+    os.environ.update(
+        TCMB_BASE_URL=server.base_url,
+        DATABASE_URL=database_url,
+        TCMB_ARCHIVE_DIR=os.path.join(workdir, 'tcmb_archive'),
+        RATE_STORE_DIR=os.path.join(workdir, 'rate_store'),
+    )
+    sys.path[:0] = [SCHEDULER_DIR, ROOT_DIR]
+    # scheduler.log çalışma dizinine yazılır, depo ağacı kirlenmesin
+    cwd = os.getcwd()
+    os.chdir(workdir)
+
+    from benchmarks.synthetic import DEFAULT_END, SyntheticRates
+    from scheduler import engine
+
+    results = run_info(vars(args))
+    results['scenarios'] = {}
+    try:
+        data = SyntheticRates.years_until(DEFAULT_END, args.years, args.currencies, args.seed)
+        server.data = data
+
+        results['scenarios']['parse'] = bench_parse(data, args.parse_repeat)
+
+        fetch_days = data.days[-args.fetch_days:]
+        for concurrency in (int(value) for value in args.fetch_concurrency.split(',')):
+            key = f'fetch@c{concurrency}'
+            results['scenarios'][key] = summary = bench_fetch(data, fetch_days, concurrency)
+            print(f"{key}: {summary['days_per_s']} gün/sn, p99 {summary.get('p99_ms')} ms", file=sys.stderr)
+
+        if engine.dialect.name != 'postgresql':
+            results['scenarios']['write'] = {'skipped': 'Yazım yolu PostgreSQL gerektirir (--database-url)'}
+        else:
+            for batch_size in (int(value) for value in args.batch_sizes.split(',')):
+                for phase, summary in bench_write(engine, data, batch_size, args.write_days).items():
+                    key = f'write_{phase}@b{batch_size}'
+                    results['scenarios'][key] = summary
+                    print(f"{key}: {summary['rows_per_s']} satır/sn, p99 {summary.get('p99_ms')} ms", file=sys.stderr)
+    finally:
+        server.stop()
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    write_results(results, args.output)
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Ölçümlerin özetlenmesi ve makinece okunabilir JSON sonuç dosyası.
+
+Sonuç dosyası çalıştırma bilgisini (git sürümü, Python, platform, tarih,
+parametreler) ve senaryo başına özetleri içerir; ``compare`` iki dosyayı
+senaryo adlarıyla eşleştirir.
+"""
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+
+SCHEMA_VERSION = 1
+
+
+def summarize(latencies, elapsed, errors=0, **extra):
+    """Saniye cinsinden gecikmelerden p50/p90/p99 (ms) ve saniyedeki işlem sayısını hesaplar"""
+    values = np.asarray(latencies, dtype=np.float64) * 1000
+    summary = {
+        'count': int(len(values)),
+        'errors': int(errors),
+        'elapsed_s': round(elapsed, 4),
+        'throughput_per_s': round(len(values) / elapsed, 2) if elapsed > 0 else None,
+    }
+    if len(values):
+        p50, p90, p99 = np.percentile(values, [50, 90, 99])
+        summary.update({
+            'mean_ms': round(float(values.mean()), 3),
+            'p50_ms': round(float(p50), 3),
+            'p90_ms': round(float(p90), 3),
+            'p99_ms': round(float(p99), 3),
+            'max_ms': round(float(values.max()), 3),
+        })
+    summary.update(extra)
+    return summary
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'describe', '--always', '--dirty'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_info(parameters):
+    return {
+        'schema_version': SCHEMA_VERSION,
+        'git_revision': git_revision(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'started_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'parameters': parameters,
+    }
+
+
+def write_results(results, path=None):
+    """Sonucu dosyaya, yol verilmezse standart çıktıya yazar"""
+    text = json.dumps(results, indent=2, ensure_ascii=False, default=str)
+    if path:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
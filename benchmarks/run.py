@@ -0,0 +1,70 @@
+"""API ve veri toplama benchmark'larını çalıştırıp tek bir sonuç dosyasında birleştirir.
+
+Backend ve scheduler aynı adlı modüller (``metrics``) içerdiği için iki
+benchmark ayrı Python süreçlerinde çalışır. Senaryo adları ``api.`` ve
+``ingest.`` önekleriyle birleştirilir.
+
+    python -m benchmarks.run --output results/$(git rev-parse --short HEAD).json
+    python -m benchmarks.run --quick --output quick.json -- --database-url postgresql://...
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.results import run_info, write_results
+
+# Geliştirme sırasında hızlı bir kontrol için kısa ayarlar
+QUICK_ARGS = {
+    'api': ['--years', '2', '--duration', '3', '--warmup', '0.5', '--concurrency', '1,8'],
+    'ingest': ['--parse-repeat', '50', '--fetch-days', '100', '--write-days', '100', '--batch-sizes', '1,50'],
+}
+
+
+def run_suite(name, extra_args):
+    """``benchmarks.<name>_bench`` modülünü ayrı süreçte çalıştırıp sonucunu okur"""
+    fd, path = tempfile.mkstemp(prefix=f'doviz-{name}-', suffix='.json')
+    os.close(fd)
+    try:
+        subprocess.run(
+            [sys.executable, '-m', f'benchmarks.{name}_bench', '--output', path] + extra_args, check=True
+        )
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    finally:
+        os.remove(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Bütün benchmark\'ları çalıştırır')
+    parser.add_argument('--only', choices=['api', 'ingest'], help='Yalnızca bir benchmark')
+    parser.add_argument('--database-url', help='İki benchmark için de kullanılacak veritabanı')
+    parser.add_argument('--quick', action='store_true', help='Kısa süreli, küçük veriyle çalıştır')
+    parser.add_argument('--output', help='JSON sonuç dosyası (varsayılan: standart çıktı)')
+    args = parser.parse_args(argv)
+
+    results = run_info(vars(args))
+    results['suites'] = {}
+    results['scenarios'] = {}
+    for name in ('api', 'ingest'):
+        if args.only and args.only != name:
+            continue
+
+        extra_args = list(QUICK_ARGS[name]) if args.quick else []
+        if args.database_url:
+            extra_args += ['--database-url', args.database_url]
+
+        suite = run_suite(name, extra_args)
+        results['suites'][name] = {key: suite[key] for key in ('parameters', 'seed') if key in suite}
+        for key, summary in suite['scenarios'].items():
+            results['scenarios'][f'{name}.{key}'] = summary
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    write_results(results, args.output)
+
+
+if __name__ == '__main__':
+    main()
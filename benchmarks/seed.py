@@ -0,0 +1,72 @@
+"""Benchmark veritabanının sentetik kurlarla doldurulması.
+
+Yazım yolundaki ``upsert_rates`` PostgreSQL'e özel olduğu için tohumlama
+dialekt bağımsız toplu INSERT ile yapılır; SQLite da Postgres yerine
+kullanılabilir. ``doviz_ozet`` yüklenen satırlardan tek sorguda, aylık/yıllık
+özetler ``refresh_rollups`` ile hesaplanır.
+Mevcut kur satırları silinir, ayrı bir benchmark veritabanı kullanılmalıdır.
+"""
+from datetime import datetime
+
+from sqlalchemy import delete, func, insert, select
+
+from common.db import (
+    ROLLUP_TABLES, VALUE_COLUMNS, doviz_kurlari, doviz_ozet, ensure_partitions, metadata, refresh_rollups
+)
+from common.migrations import apply_migrations
+
+SEED_BATCH_SIZE = 10000
+
+
+def reset_database(engine):
+    """Şemayı kurar ve kur tablolarını boşaltır"""
+    metadata.create_all(engine)
+    with engine.begin() as connection:
+        apply_migrations(connection)
+        connection.execute(delete(doviz_ozet))
+        for table in ROLLUP_TABLES.values():
+            connection.execute(delete(table))
+        connection.execute(delete(doviz_kurlari))
+
+
+def seed_database(engine, data, batch_size=SEED_BATCH_SIZE):
+    """Tabloları boşaltıp ``data`` serisini yazar; satır sayısını döndürür"""
+    reset_database(engine)
+
+    created_at = datetime.utcnow()
+    count = 0
+    with engine.begin() as connection:
+        ensure_partitions(connection, {day.year for day in data.days})
+        batch = []
+        for row in data.rows():
+            batch.append(dict({column: row[column] for column in VALUE_COLUMNS}, created_at=created_at))
+            if len(batch) >= batch_size:
+                connection.execute(insert(doviz_kurlari), batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            connection.execute(insert(doviz_kurlari), batch)
+            count += len(batch)
+
+        connection.execute(insert(doviz_ozet).from_select(
+            ['doviz_kodu', 'doviz_adi', 'kayit_sayisi', 'ilk_tarih', 'son_tarih', 'son_guncelleme'],
+            select(
+                doviz_kurlari.c.doviz_kodu,
+                func.max(doviz_kurlari.c.doviz_adi),
+                func.count(),
+                func.min(doviz_kurlari.c.tarih),
+                func.max(doviz_kurlari.c.tarih),
+                func.max(doviz_kurlari.c.created_at)
+            ).group_by(doviz_kurlari.c.doviz_kodu)
+        ))
+        refresh_rollups(connection)
+
+    # Postgres'te planlayıcı istatistikleri yüklemeden sonra güncellenir
+    if engine.dialect.name == 'postgresql':
+        with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+            connection.exec_driver_sql('VACUUM ANALYZE doviz_kurlari')
+            connection.exec_driver_sql('ANALYZE doviz_ozet')
+            for table in ROLLUP_TABLES.values():
+                connection.exec_driver_sql(f'ANALYZE {table.name}')
+
+    return count
@@ -0,0 +1,103 @@
+"""Tekrarlanabilir sentetik kur verisi.
+
+Her döviz için sabit bir başlangıç kurundan, verilen tohumla (seed) üretilen
+günlük log-getiri rastgele yürüyüşü kullanılır. Aynı parametreler her
+çalıştırmada aynı kurları verir; veritabanı tohumlaması ve sahte TCMB sunucusu
+aynı seriden beslenir. TCMB gibi hafta sonları kur yayınlanmaz.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+
+from common.parser import Rate
+
+# (kod, TCMB'deki adı, başlangıç satış kuru)
+CURRENCIES = [
+    ('USD', 'ABD DOLARI', 18.7),
+    ('AUD', 'AVUSTRALYA DOLARI', 12.7),
+    ('DKK', 'DANİMARKA KRONU', 2.6),
+    ('EUR', 'EURO', 19.9),
+    ('GBP', 'İNGİLİZ STERLİNİ', 22.5),
+    ('CHF', 'İSVİÇRE FRANGI', 20.2),
+    ('SEK', 'İSVEÇ KRONU', 1.8),
+    ('CAD', 'KANADA DOLARI', 13.8),
+    ('KWD', 'KUVEYT DİNARI', 61.1),
+    ('NOK', 'NORVEÇ KRONU', 1.9),
+    ('SAR', 'SUUDİ ARABİSTAN RİYALİ', 5.0),
+    ('JPY', 'JAPON YENİ', 0.14),
+    ('BGN', 'BULGAR LEVASI', 10.2),
+    ('RON', 'RUMEN LEYİ', 4.0),
+    ('RUB', 'RUS RUBLESİ', 0.3),
+    ('IRR', 'İRAN RİYALİ', 0.0004),
+    ('CNY', 'ÇİN YUANI', 2.7),
+    ('PKR', 'PAKİSTAN RUPİSİ', 0.08),
+    ('QAR', 'KATAR RİYALİ', 5.1),
+    ('KRW', 'GÜNEY KORE WONU', 0.015),
+    ('AZN', 'AZERBAYCAN YENİ MANATI', 11.0),
+    ('AED', 'BİRLEŞİK ARAP EMİRLİKLERİ DİRHEMİ', 5.1),
+]
+
+# Sonuçlar çalıştırıldığı günden bağımsız olsun diye seri sabit bir günde biter
+DEFAULT_END = date(2024, 12, 31)
+
+# Alış-satış ve efektif kur makasları
+SPREAD = 0.002
+BANKNOTE_SPREAD = 0.005
+
+
+def business_days(start, end):
+    """[start, end] aralığındaki hafta içi günleri"""
+    days = []
+    day = start
+    while day <= end:
+        if day.weekday() < 5:
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+
+class SyntheticRates:
+    """Gün → ``Rate`` listesi eşlemesi; bütün seri oluşturulurken üretilir"""
+
+    def __init__(self, start, end, currencies=len(CURRENCIES), seed=42):
+        if not 1 <= currencies <= len(CURRENCIES):
+            raise ValueError(f"Döviz sayısı 1 ile {len(CURRENCIES)} arasında olmalı")
+
+        self.days = business_days(start, end)
+        self.currencies = CURRENCIES[:currencies]
+
+        rng = np.random.default_rng(seed)
+        steps = rng.normal(0.0003, 0.006, size=(len(self.days), len(self.currencies)))
+        bases = np.array([base for _, _, base in self.currencies])
+        self.sell = bases * np.exp(np.cumsum(steps, axis=0))
+        self._index = {day: i for i, day in enumerate(self.days)}
+
+    @classmethod
+    def years_until(cls, end=DEFAULT_END, years=5, currencies=len(CURRENCIES), seed=42):
+        """``end`` gününde biten ``years`` yıllık seri"""
+        return cls(date(end.year - years, end.month, min(end.day, 28)), end, currencies, seed)
+
+    def rates(self, day):
+        """Günün kurları, hafta sonu veya aralık dışıysa None"""
+        i = self._index.get(day)
+        if i is None:
+            return None
+
+        result = []
+        for j, (code, name, _) in enumerate(self.currencies):
+            sell = round(float(self.sell[i, j]), 4)
+            buy = round(sell * (1 - SPREAD), 4)
+            result.append(Rate(
+                code, name, buy, sell,
+                round(buy * (1 - BANKNOTE_SPREAD), 4), round(sell * (1 + BANKNOTE_SPREAD), 4)
+            ))
+        return result
+
+    def rows(self, days=None):
+        """``doviz_kurlari`` satırları (``rate_rows`` biçiminde)"""
+        for day in days if days is not None else self.days:
+            for rate in self.rates(day) or ():
+                yield dict(rate._asdict(), tarih=day)
+
+    def __len__(self):
+        return len(self.days) * len(self.currencies)
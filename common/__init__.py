@@ -0,0 +1 @@
+"""Backend ve scheduler servislerinin ortak kullandığı modüller."""
@@ -0,0 +1,140 @@
+"""TCMB'den çekilen ham XML dosyalarının yerel arşivi.
+
+Dosyalar içeriklerinin SHA-256 özetiyle ``objects/`` altında gzip'li olarak
+bir kez saklanır; günler ``dates/YYYY/MM/YYYY-MM-DD`` referans dosyalarıyla
+bu nesnelere bağlanır. Yayınlanmamış (404) geçmiş günler de referansta
+işaretlenir, tekrar sorulmaz.
+
+``ArchiveSource`` parser kaynaklarıyla aynı ``open(date)`` arayüzünü sunar:
+geçmiş günler önce arşivden okunur, yalnızca arşivde olmayanlar ağdan çekilip
+arşive eklenir. Çekici verilmezse tamamen yerel çalışır; veritabanı ağa
+çıkmadan arşivden yeniden kurulabilir.
+"""
+import gzip
+import hashlib
+import io
+import logging
+import os
+import uuid
+from contextlib import contextmanager
+from datetime import date
+
+from common.fetcher import daily_url
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ARCHIVE_DIR = os.getenv('TCMB_ARCHIVE_DIR', 'tcmb_archive')
+
+# Referans dosyasında yayınlanmamış günü belirten işaret
+UNPUBLISHED = '404'
+
+
+class RawArchive:
+    def __init__(self, root=DEFAULT_ARCHIVE_DIR):
+        self.root = root
+
+    def _object_path(self, digest):
+        return os.path.join(self.root, 'objects', digest[:2], f'{digest}.xml.gz')
+
+    def _ref_path(self, day):
+        return os.path.join(self.root, 'dates', f'{day:%Y}', f'{day:%m}', day.isoformat())
+
+    def _write_atomic(self, path, data):
+        """Yarım yazılmış dosya bırakmadan yazar; eş zamanlı yazımlar birbirini bozmaz"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def lookup(self, day):
+        """Günün nesne özetini, yayınlanmamışsa UNPUBLISHED, arşivde yoksa None döndürür"""
+        try:
+            with open(self._ref_path(day), encoding='ascii') as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def store(self, day, content):
+        """Ham XML'i saklar ve güne bağlar; aynı içerik yalnızca bir kez yazılır"""
+        digest = hashlib.sha256(content).hexdigest()
+        object_path = self._object_path(digest)
+        if not os.path.exists(object_path):
+            self._write_atomic(object_path, gzip.compress(content, compresslevel=9))
+        self._write_atomic(self._ref_path(day), digest.encode('ascii'))
+        return digest
+
+    def mark_unpublished(self, day):
+        self._write_atomic(self._ref_path(day), UNPUBLISHED.encode('ascii'))
+
+    def open_object(self, digest):
+        return gzip.open(self._object_path(digest), 'rb')
+
+    def dates(self):
+        """İçeriği arşivlenmiş günleri sıralı olarak döndürür"""
+        days = []
+        for _, _, filenames in os.walk(os.path.join(self.root, 'dates')):
+            for name in filenames:
+                try:
+                    day = date.fromisoformat(name)
+                except ValueError:
+                    continue
+                if self.lookup(day) != UNPUBLISHED:
+                    days.append(day)
+        return sorted(days)
+
+
+class ArchiveSource:
+    """Önce arşivden, yoksa TCMB'den okuyan ve çekileni arşive ekleyen kaynak.
+
+    ``fetcher`` None ise yalnızca arşiv okunur. Bugün ve sonrası her zaman
+    ağdan çekilir; yayın gününde dosya henüz çıkmamış veya düzeltilmiş olabilir.
+    """
+
+    def __init__(self, archive, fetcher=None, today=date.today):
+        self.archive = archive
+        self.fetcher = fetcher
+        self.today = today
+        self.live = fetcher is not None
+        self.concurrency = fetcher.max_concurrency if fetcher else 1
+
+    @contextmanager
+    def open(self, day):
+        refresh = self.fetcher is not None and day >= self.today()
+        digest = None if refresh else self.archive.lookup(day)
+
+        if digest == UNPUBLISHED:
+            yield None
+            return
+        if digest is not None:
+            with self.archive.open_object(digest) as f:
+                yield f
+            return
+        if self.fetcher is None:
+            yield None
+            return
+
+        result = self.fetcher.fetch(daily_url(day), conditional=False)
+        if result.status == 404:
+            # Bugünün dosyası daha sonra yayınlanabilir, yalnızca geçmiş işaretlenir
+            if day < self.today():
+                _quietly(self.archive.mark_unpublished, day)
+            yield None
+            return
+
+        store_quietly(self.archive, day, result.content)
+        yield io.BytesIO(result.content)
+
+
+def _quietly(write, *args):
+    # Arşive yazılamaması (ör. disk dolu) veri toplamayı durdurmaz
+    try:
+        return write(*args)
+    except OSError as e:
+        logger.warning(f"TCMB arşivine yazılamadı: {e}")
+        return None
+
+
+def store_quietly(archive, day, content):
+    """Ham XML'i arşive ekler; yazma hatası yalnızca loglanır"""
+    return _quietly(archive.store, day, content)
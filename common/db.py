@@ -0,0 +1,488 @@
+"""doviz_kurlari tablosu ve iki servisin paylaştığı toplu yazma yolu.
+
+Kayıtlar satır satır SELECT + INSERT yerine tek bir çok satırlı
+``INSERT ... ON CONFLICT ON CONSTRAINT unique_tarih_doviz`` ile yazılır.
+Büyük yüklemelerde (backfill) satırlar önce COPY ile geçici tabloya alınır,
+oradan aynı ON CONFLICT ifadesiyle ana tabloya aktarılır.
+
+Her yazım aynı transaction içinde ``doviz_ozet`` özet tablosunu da günceller;
+/api/stats tüm tabloyu taramak yerine bu tablodan okur.
+
+Postgres'te ``doviz_kurlari`` tarihe göre yıllık bölümlere (partition)
+ayrılmıştır (``doviz_kurlari_y2024``); yazımdan önce satırların yılları için
+bölüm yoksa oluşturulur. Aylık ve yıllık OHLC özetleri (``doviz_kurlari_aylik``,
+``doviz_kurlari_yillik``) de yazımla aynı transaction'da, yalnızca değişen
+dövizlerin değişen dönemleri için yeniden hesaplanır. Eski ham veri silinse
+de (bkz. ``common.retention``) özetler kalır.
+
+Her kaynaktan en son alınan içeriğin özeti ``ingest_durumu`` tablosunda,
+yazımla aynı transaction'da tutulur; aynı içerik tekrar geldiğinde yazım
+yapılmaz.
+
+Gün içi kaynaklardan gelen kotasyonlar ayrı ``doviz_kurlari_anlik`` tablosuna
+zaman damgasıyla yalnızca eklenir (append-only): satırlar güncellenmez, sık ve
+küçük yazımlar okuyucuları ve birbirini kilitlemez.
+"""
+import csv
+import io
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import (
+    BigInteger, Column, Date, DateTime, Float, Index, Integer, MetaData, String, Table, UniqueConstraint,
+    case, cast, delete, func, literal_column, or_, select, text
+)
+from sqlalchemy.dialects.postgresql import insert
+
+metadata = MetaData()
+
+# Postgres'te migrasyon tabloyu tarihe göre bölümlere ayırır ve birincil
+# anahtarı (id, tarih) yapar; tanım SQLite ile de çalışsın diye burada tek kolonludur
+doviz_kurlari = Table(
+    'doviz_kurlari', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('tarih', Date, nullable=False),
+    Column('doviz_kodu', String(10), nullable=False),
+    Column('doviz_adi', String(50), nullable=False),
+    Column('alis_kuru', Float, nullable=False),
+    Column('satis_kuru', Float, nullable=False),
+    Column('efektif_alis', Float, nullable=False),
+    Column('efektif_satis', Float, nullable=False),
+    Column('created_at', DateTime, default=datetime.utcnow),
+    UniqueConstraint('tarih', 'doviz_kodu', name='unique_tarih_doviz'),
+    # Geçmiş sorguları önce döviz koduna, sonra tarih aralığına göre filtreler;
+    # kur kolonları indekste tutulduğu için tabloya gitmeden (index-only) okunur
+    Index(
+        'ix_doviz_kurlari_kod_tarih', 'doviz_kodu', 'tarih',
+        postgresql_include=['alis_kuru', 'satis_kuru', 'efektif_alis', 'efektif_satis']
+    ),
+)
+
+# Döviz kodu başına kayıt sayısı ve tarih aralığı, yazımlarla birlikte güncellenir
+doviz_ozet = Table(
+    'doviz_ozet', metadata,
+    Column('doviz_kodu', String(10), primary_key=True),
+    Column('doviz_adi', String(50), nullable=False),
+    Column('kayit_sayisi', Integer, nullable=False, default=0),
+    Column('ilk_tarih', Date),
+    Column('son_tarih', Date),
+    Column('son_guncelleme', DateTime),
+)
+
+# Kaynak başına en son işlenen içeriğin özeti ve yayın tarihi
+ingest_durumu = Table(
+    'ingest_durumu', metadata,
+    Column('kaynak', String(64), primary_key=True),
+    Column('ozet', String(64), nullable=False),
+    Column('tarih', Date),
+    Column('guncellendi', DateTime, nullable=False),
+)
+
+# OHLC kolon son ekleri (API çıktısındaki open/high/low/close)
+OHLC_PARTS = {'open': 'acilis', 'high': 'en_yuksek', 'low': 'en_dusuk', 'close': 'kapanis'}
+OHLC_FIELDS = ('alis_kuru', 'satis_kuru', 'efektif_alis', 'efektif_satis')
+
+
+def _rollup_table(name):
+    """Döviz ve dönem (ayın/yılın ilk günü) başına her kur alanının OHLC'si"""
+    return Table(
+        name, metadata,
+        Column('doviz_kodu', String(10), primary_key=True),
+        Column('donem', Date, primary_key=True),
+        Column('gun_sayisi', Integer, nullable=False),
+        *[Column(f'{field}_{part}', Float) for field in OHLC_FIELDS for part in OHLC_PARTS.values()]
+    )
+
+
+doviz_kurlari_aylik = _rollup_table('doviz_kurlari_aylik')
+doviz_kurlari_yillik = _rollup_table('doviz_kurlari_yillik')
+
+# interval -> özet tablo
+ROLLUP_TABLES = {'month': doviz_kurlari_aylik, 'year': doviz_kurlari_yillik}
+
+# Gün içi kotasyonlar; kaynak başına aynı zaman damgası bir kez yazılır
+doviz_kurlari_anlik = Table(
+    'doviz_kurlari_anlik', metadata,
+    Column('id', BigInteger().with_variant(Integer, 'sqlite'), primary_key=True),
+    Column('kaynak', String(32), nullable=False),
+    Column('doviz_kodu', String(10), nullable=False),
+    Column('zaman', DateTime(timezone=True), nullable=False),
+    Column('alis_kuru', Float),
+    Column('satis_kuru', Float),
+    Column('created_at', DateTime, default=datetime.utcnow),
+    UniqueConstraint('kaynak', 'doviz_kodu', 'zaman', name='unique_anlik_kaynak_doviz_zaman'),
+    # Döviz başına en son kotasyon ve zaman aralığı sorguları için
+    Index('ix_doviz_kurlari_anlik_kod_zaman', 'doviz_kodu', 'zaman'),
+)
+
+QUOTE_COLUMNS = ('kaynak', 'doviz_kodu', 'zaman', 'alis_kuru', 'satis_kuru')
+
+# Çakışmada güncellenen alanlar
+RATE_FIELDS = ('doviz_adi', 'alis_kuru', 'satis_kuru', 'efektif_alis', 'efektif_satis')
+VALUE_COLUMNS = ('tarih', 'doviz_kodu') + RATE_FIELDS
+INSERT_COLUMNS = VALUE_COLUMNS + ('created_at',)
+
+# Bu sayının üzerindeki yazımlar varsayılan olarak COPY yolunu kullanır
+COPY_THRESHOLD = 5000
+
+# Şema değişikliklerinin (migrasyonlar, yeni bölümler) pg_advisory_xact_lock anahtarı
+MIGRATION_LOCK_KEY = 4242001
+
+UpsertResult = namedtuple('UpsertResult', ['inserted', 'updated'])
+
+
+def period_start(unit, day):
+    """Günün ait olduğu ayın veya yılın ilk günü"""
+    return day.replace(day=1) if unit == 'month' else day.replace(month=1, day=1)
+
+
+def next_period(unit, day):
+    """Günün ait olduğu dönemden sonraki dönemin ilk günü"""
+    if unit == 'month':
+        return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+    return date(day.year + 1, 1, 1)
+
+
+def partition_name(year):
+    return f'doviz_kurlari_y{year}'
+
+
+def _missing_partitions(connection, years):
+    # Migrasyon uygulanmadan (tablo bölümlü değilken) yapılacak bir şey yoktur
+    return connection.execute(text("""
+        SELECT y FROM unnest(CAST(:years AS integer[])) AS y
+        WHERE EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'doviz_kurlari'::regclass)
+          AND to_regclass('doviz_kurlari_y' || y) IS NULL
+        ORDER BY y
+    """), {'years': years}).scalars().all()
+
+
+def ensure_partitions(connection, years):
+    """Verilen yıllar için eksik ``doviz_kurlari`` bölümlerini oluşturur (yalnızca Postgres)"""
+    if connection.dialect.name != 'postgresql' or not years:
+        return []
+
+    years = sorted(set(years))
+    if not _missing_partitions(connection, years):
+        return []
+
+    # Scheduler ve backfill aynı bölümü aynı anda oluşturursa IF NOT EXISTS katalog
+    # yarışını önlemez; migrasyonların kilidi alınır ve eksikler yeniden okunur
+    connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {'key': MIGRATION_LOCK_KEY})
+    missing = _missing_partitions(connection, years)
+
+    for year in missing:
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(year)} PARTITION OF doviz_kurlari "
+            f"FOR VALUES FROM ('{year}-01-01') TO ('{year + 1}-01-01')"
+        ))
+    return missing
+
+
+def _period_expression(connection, unit, column):
+    if connection.dialect.name == 'postgresql':
+        return cast(func.date_trunc(unit, column), Date)
+    # SQLite (geliştirme ve benchmark veritabanı)
+    return func.date(column, f'start of {unit}')
+
+
+def refresh_rollups(connection, start=None, end=None, codes=None):
+    """``start``-``end`` aralığına değen dönemlerin özetlerini ham veriden yeniden hesaplar.
+
+    Aralık verilmezse özet tabloların tamamı, ``codes`` verilirse yalnızca o
+    dövizler yeniden yazılır. İşlem çağıranın transaction'ı içinde yapılır.
+    """
+    rates = doviz_kurlari.c
+    for unit, table in ROLLUP_TABLES.items():
+        period = _period_expression(connection, unit, rates.tarih).label('donem')
+        # Dönemin ilk ve son günü pencere fonksiyonlarıyla bulunur
+        ordered = select(
+            rates.doviz_kodu, period, *[rates[field] for field in OHLC_FIELDS],
+            func.row_number().over(partition_by=[rates.doviz_kodu, period], order_by=rates.tarih).label('ilk'),
+            func.row_number().over(partition_by=[rates.doviz_kodu, period], order_by=rates.tarih.desc()).label('son'),
+        )
+        stale = delete(table)
+        if start:
+            first = period_start(unit, start)
+            ordered = ordered.where(rates.tarih >= first)
+            stale = stale.where(table.c.donem >= first)
+        if end:
+            after = next_period(unit, end)
+            ordered = ordered.where(rates.tarih < after)
+            stale = stale.where(table.c.donem < after)
+        if codes:
+            ordered = ordered.where(rates.doviz_kodu.in_(codes))
+            stale = stale.where(table.c.doviz_kodu.in_(codes))
+        ordered = ordered.subquery()
+
+        aggregates = []
+        for field in OHLC_FIELDS:
+            value = ordered.c[field]
+            aggregates += [
+                func.max(case((ordered.c.ilk == 1, value))),
+                func.max(value),
+                func.min(value),
+                func.max(case((ordered.c.son == 1, value))),
+            ]
+
+        connection.execute(stale)
+        connection.execute(table.insert().from_select(
+            ['doviz_kodu', 'donem', 'gun_sayisi'] + [
+                f'{field}_{part}' for field in OHLC_FIELDS for part in OHLC_PARTS.values()
+            ],
+            select(ordered.c.doviz_kodu, ordered.c.donem, func.count(), *aggregates)
+            .group_by(ordered.c.doviz_kodu, ordered.c.donem)
+        ))
+
+
+def rate_rows(rates, tarih):
+    """Tek bir güne ait ``Rate`` demetlerini tarih alanı eklenmiş satırlara çevirir"""
+    return [dict(rate._asdict(), tarih=tarih) for rate in rates]
+
+
+def load_latest_rates(connection):
+    """En son kur gününün kurlarını API çıktısındaki sözlük biçiminde okur"""
+    latest = select(func.max(doviz_kurlari.c.tarih)).scalar_subquery()
+    rows = connection.execute(
+        select(*[doviz_kurlari.c[column] for column in VALUE_COLUMNS]).where(doviz_kurlari.c.tarih == latest)
+    ).mappings()
+    return [dict(row, tarih=row['tarih'].isoformat()) for row in rows]
+
+
+def data_version(connection):
+    """``doviz_ozet``'ten türetilen veri sürümü; Redis'teki kur sürümünün yerine kullanılır.
+
+    Her yazım değişen dövizlerin ``son_guncelleme`` alanını, eklemeler ve
+    saklama süresi silmeleri ``kayit_sayisi``'nı değiştirir; geçmiş günlere
+    yapılan backfill ve düzeltmeler de sürümü değiştirir.
+    """
+    count, total, updated = connection.execute(select(
+        func.count(), func.sum(doviz_ozet.c.kayit_sayisi), func.max(doviz_ozet.c.son_guncelleme)
+    )).one()
+    return f"{count}-{total or 0}-{updated.isoformat() if updated else ''}"
+
+
+def last_ingest_digest(connection, kaynak):
+    """Kaynaktan en son işlenen içeriğin özeti; hiç işlenmemişse None"""
+    return connection.execute(
+        select(ingest_durumu.c.ozet).where(ingest_durumu.c.kaynak == kaynak)
+    ).scalar()
+
+
+def record_ingest(connection, kaynak, ozet, tarih=None):
+    """Kaynaktan işlenen içeriğin özetini kaydeder; yazımla aynı transaction'da çağrılmalı"""
+    stmt = insert(ingest_durumu).values(kaynak=kaynak, ozet=ozet, tarih=tarih, guncellendi=datetime.utcnow())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['kaynak'],
+        set_={column: stmt.excluded[column] for column in ('ozet', 'tarih', 'guncellendi')}
+    )
+    connection.execute(stmt)
+
+
+def insert_quotes(connection, quotes):
+    """Gün içi kotasyonları ekler, daha önce yazılmış olanları atlar; eklenen sayısını döndürür.
+
+    ``quotes`` ``common.providers.Quote`` demetleridir. Postgres'te commit
+    diske yazılmayı beklemez (``synchronous_commit = off``): çökmede son
+    birkaç kotasyon kaybolabilir, bir sonraki çekimde yeniden gelir.
+    """
+    if not quotes:
+        return 0
+
+    if connection.dialect.name == 'postgresql':
+        connection.execute(text("SET LOCAL synchronous_commit = off"))
+
+    created_at = datetime.utcnow()
+    stmt = insert(doviz_kurlari_anlik).values([
+        dict(zip(QUOTE_COLUMNS, quote), created_at=created_at) for quote in quotes
+    ]).on_conflict_do_nothing(constraint='unique_anlik_kaynak_doviz_zaman')
+    return connection.execute(stmt).rowcount
+
+
+def load_latest_quotes(connection, codes=None, kaynak=None):
+    """Kaynak ve döviz başına en son kotasyonu okur"""
+    quotes = doviz_kurlari_anlik.c
+    latest = select(quotes.kaynak, quotes.doviz_kodu, func.max(quotes.zaman).label('zaman')) \
+        .group_by(quotes.kaynak, quotes.doviz_kodu)
+    if codes:
+        latest = latest.where(quotes.doviz_kodu.in_(codes))
+    if kaynak:
+        latest = latest.where(quotes.kaynak == kaynak)
+    latest = latest.subquery()
+
+    stmt = select(*[quotes[column] for column in QUOTE_COLUMNS]).join(
+        latest,
+        (quotes.kaynak == latest.c.kaynak) & (quotes.doviz_kodu == latest.c.doviz_kodu) & (quotes.zaman == latest.c.zaman)
+    ).order_by(quotes.doviz_kodu, quotes.kaynak)
+    return connection.execute(stmt).mappings().all()
+
+
+def load_quote_series(connection, codes, since, until=None, kaynak=None, limit=10000):
+    """Dövizlerin ``since`` sonrasındaki kotasyonlarını zaman sırasıyla okur"""
+    quotes = doviz_kurlari_anlik.c
+    stmt = select(*[quotes[column] for column in QUOTE_COLUMNS]) \
+        .where(quotes.doviz_kodu.in_(codes), quotes.zaman >= since)
+    if until:
+        stmt = stmt.where(quotes.zaman <= until)
+    if kaynak:
+        stmt = stmt.where(quotes.kaynak == kaynak)
+    stmt = stmt.order_by(quotes.doviz_kodu, quotes.zaman).limit(limit)
+    return connection.execute(stmt).mappings().all()
+
+
+def upsert_rates(connection, rows, update=True, batch_size=1000, use_copy=None):
+    """Kur satırlarını toplu olarak yazar ve eklenen/güncellenen sayısını döndürür.
+
+    ``rows`` her biri ``tarih`` içeren kur sözlükleridir. ``update=False`` ise
+    mevcut kayıtlara dokunulmaz (DO NOTHING). Değerleri değişmemiş satırlar
+    güncellenmiş sayılmaz. İşlem çağıranın transaction'ı içinde yapılır.
+    """
+    if not rows:
+        return UpsertResult(0, 0)
+
+    if use_copy is None:
+        use_copy = len(rows) >= COPY_THRESHOLD
+
+    ensure_partitions(connection, {row['tarih'].year for row in rows})
+
+    created_at = datetime.utcnow()
+    summary = {}
+    if use_copy:
+        result = _copy_upsert(connection, rows, update, created_at, summary)
+    else:
+        inserted = updated = 0
+        for offset in range(0, len(rows), batch_size):
+            values = [
+                dict({column: row[column] for column in VALUE_COLUMNS}, created_at=created_at)
+                for row in rows[offset:offset + batch_size]
+            ]
+
+            stmt = _on_conflict(insert(doviz_kurlari).values(values), update)
+            batch_inserted, batch_updated = _count_returning(connection.execute(stmt), summary)
+            inserted += batch_inserted
+            updated += batch_updated
+        result = UpsertResult(inserted, updated)
+
+    _update_summary(connection, summary, created_at)
+    if summary:
+        # Yalnızca eklenen/değişen dövizlerin yazılan dönemleri yeniden hesaplanır
+        refresh_rollups(
+            connection,
+            min(entry[2] for entry in summary.values()),
+            max(entry[3] for entry in summary.values()),
+            sorted(summary)
+        )
+    return result
+
+
+def _on_conflict(stmt, update):
+    """unique_tarih_doviz çakışmasında DO UPDATE veya DO NOTHING ekler"""
+    if update:
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            constraint='unique_tarih_doviz',
+            set_={field: excluded[field] for field in RATE_FIELDS},
+            where=or_(*[doviz_kurlari.c[field].is_distinct_from(excluded[field]) for field in RATE_FIELDS])
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(constraint='unique_tarih_doviz')
+
+    # xmax = 0 yalnızca yeni eklenen satırlarda doğrudur
+    return stmt.returning(
+        doviz_kurlari.c.doviz_kodu, doviz_kurlari.c.doviz_adi, doviz_kurlari.c.tarih,
+        literal_column('(xmax = 0)').label('inserted')
+    )
+
+
+def _count_returning(result, summary):
+    """Eklenen/güncellenen satırları sayar, özet tablo için döviz bazında toplar"""
+    inserted = updated = 0
+    for doviz_kodu, doviz_adi, tarih, is_inserted in result:
+        if is_inserted:
+            inserted += 1
+        else:
+            updated += 1
+
+        entry = summary.get(doviz_kodu)
+        if entry is None:
+            summary[doviz_kodu] = [doviz_adi, int(is_inserted), tarih, tarih]
+        else:
+            entry[1] += int(is_inserted)
+            if tarih < entry[2]:
+                entry[2] = tarih
+            if tarih >= entry[3]:
+                entry[0] = doviz_adi
+                entry[3] = tarih
+    return inserted, updated
+
+
+def _update_summary(connection, summary, updated_at):
+    """Yazılan satırları doviz_ozet tablosuna tek ifadeyle işler"""
+    if not summary:
+        return
+
+    values = [
+        {
+            'doviz_kodu': doviz_kodu,
+            'doviz_adi': doviz_adi,
+            'kayit_sayisi': inserted,
+            'ilk_tarih': ilk_tarih,
+            'son_tarih': son_tarih,
+            'son_guncelleme': updated_at,
+        }
+        for doviz_kodu, (doviz_adi, inserted, ilk_tarih, son_tarih) in summary.items()
+    ]
+    stmt = insert(doviz_ozet).values(values)
+    excluded = stmt.excluded
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['doviz_kodu'],
+        set_={
+            'kayit_sayisi': doviz_ozet.c.kayit_sayisi + excluded.kayit_sayisi,
+            'ilk_tarih': func.least(doviz_ozet.c.ilk_tarih, excluded.ilk_tarih),
+            'son_tarih': func.greatest(doviz_ozet.c.son_tarih, excluded.son_tarih),
+            # Ad, en yeni tarihte yayınlanan isimle güncel tutulur
+            'doviz_adi': case(
+                (excluded.son_tarih >= doviz_ozet.c.son_tarih, excluded.doviz_adi),
+                else_=doviz_ozet.c.doviz_adi
+            ),
+            'son_guncelleme': excluded.son_guncelleme,
+        }
+    )
+    connection.execute(stmt)
+
+
+def _copy_upsert(connection, rows, update, created_at, summary):
+    """Satırları COPY ile geçici tabloya alıp tek ifadeyle ana tabloya aktarır"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([row[column] for column in VALUE_COLUMNS] + [created_at])
+    buffer.seek(0)
+
+    columns = ', '.join(INSERT_COLUMNS)
+    connection.execute(text(
+        f"CREATE TEMP TABLE IF NOT EXISTS doviz_kurlari_stage ON COMMIT DROP AS "
+        f"SELECT {columns} FROM doviz_kurlari WITH NO DATA"
+    ))
+    connection.execute(text("TRUNCATE doviz_kurlari_stage"))
+
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY doviz_kurlari_stage ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+    if update:
+        assignments = ', '.join(f"{field} = EXCLUDED.{field}" for field in RATE_FIELDS)
+        changed = ' OR '.join(f"doviz_kurlari.{field} IS DISTINCT FROM EXCLUDED.{field}" for field in RATE_FIELDS)
+        conflict = f"DO UPDATE SET {assignments} WHERE {changed}"
+    else:
+        conflict = "DO NOTHING"
+
+    result = connection.execute(text(
+        f"INSERT INTO doviz_kurlari ({columns}) "
+        f"SELECT {columns} FROM doviz_kurlari_stage "
+        f"ON CONFLICT ON CONSTRAINT unique_tarih_doviz {conflict} "
+        f"RETURNING doviz_kodu, doviz_adi, tarih, (xmax = 0) AS inserted"
+    ))
+    return UpsertResult(*_count_returning(result, summary))
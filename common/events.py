@@ -0,0 +1,47 @@
+"""Kur güncellemelerinin Redis üzerinden servisler arasında duyurulması.
+
+Her yazımda ``rates_version`` sayacı artırılır ve ``rates_updated`` kanalına
+yeni sürüm yayınlanır. API süreçleri kanalı dinleyerek bellekteki kur
+görüntülerini yeniler; mesajı kaçıran süreçler sayaçtan fark eder.
+
+Yazan taraf en son günün kurlarını da verirse ``latest_rates`` anahtarı
+silinmek yerine sayaçla aynı atomik adımda yeni kurlarla doldurulur; sürüm
+değişince bütün API süreçlerinin aynı anda veritabanına gitmesi önlenir.
+"""
+import json
+import time
+
+from common.latest_rates import LATEST_RATES_KEY, PUBLISH_SCRIPT, STALE_TTL
+
+RATES_VERSION_KEY = 'rates_version'
+RATES_CHANNEL = 'rates_updated'
+QUOTES_CHANNEL = 'quotes_updated'
+
+
+def publish_rates_update(redis_client, tarih=None, latest=None, load_seconds=0.0):
+    """Kur sürümünü artırır, ``latest_rates``'i yeniler (verilmediyse siler) ve güncellemeyi yayınlar"""
+    if latest is not None:
+        version = redis_client.eval(
+            PUBLISH_SCRIPT, 2, RATES_VERSION_KEY, LATEST_RATES_KEY,
+            json.dumps(latest), repr(time.time()), repr(load_seconds), STALE_TTL
+        )
+    else:
+        pipe = redis_client.pipeline()
+        pipe.delete(LATEST_RATES_KEY)
+        pipe.incr(RATES_VERSION_KEY)
+        version = pipe.execute()[1]
+
+    message = {'version': version, 'tarih': tarih.isoformat() if tarih else None}
+    redis_client.publish(RATES_CHANNEL, json.dumps(message))
+    return version
+
+
+def publish_quotes_update(redis_client, kaynak, count):
+    """Gün içi kaynaktan yeni kotasyon geldiğini ``quotes_updated`` kanalına duyurur"""
+    redis_client.publish(QUOTES_CHANNEL, json.dumps({'kaynak': kaynak, 'count': count}))
+
+
+def current_version(redis_client):
+    """Redis'teki güncel kur sürümünü döndürür"""
+    value = redis_client.get(RATES_VERSION_KEY)
+    return int(value) if value else 0
@@ -0,0 +1,119 @@
+"""TCMB kur dosyalarını çekmek için ortak HTTP istemcisi.
+
+Tek bir ``requests.Session`` üzerinde keep-alive bağlantı havuzu, üstel
+beklemeli yeniden deneme (urllib3 Retry), ``If-Modified-Since`` ile koşullu
+istek ve semafor ile sınırlanmış eş zamanlılık sağlar. ``open`` gövdeyi
+belleğe almadan akış olarak verir; paralel çekimlerde de aynı sınır geçerlidir.
+
+``on_response(status, seconds)`` verilirse her isteğin sonucu (HTTP durum
+kodu, ağ hatasında ``'error'``) ve yanıt başlıklarının gelme süresi bildirilir.
+"""
+import os
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Benchmark ve testlerde yerel bir sunucuya yönlendirilebilir
+TCMB_BASE_URL = os.getenv('TCMB_BASE_URL', "https://www.tcmb.gov.tr/kurlar")
+TODAY_URL = f"{TCMB_BASE_URL}/today.xml"
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# status: 200 içerik geldi, 304 son çekimden beri değişmedi, 404 yayınlanmamış
+FetchResult = namedtuple('FetchResult', ['url', 'status', 'content', 'last_modified'])
+
+
+def daily_url(date):
+    """Verilen günün TCMB arşiv dosyası adresini döndürür (kurlar/YYYYMM/DDMMYYYY.xml)"""
+    return f"{TCMB_BASE_URL}/{date:%Y%m}/{date:%d%m%Y}.xml"
+
+
+class TCMBFetcher:
+    def __init__(self, max_concurrency=8, retries=3, backoff_factor=0.5, timeout=(5, 15), on_response=None):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.on_response = on_response
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._last_modified = {}
+
+        # Bağlantı hataları ve 429/5xx yanıtları 0.5, 1, 2... saniye arayla tekrar denenir
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = USER_AGENT
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def _get(self, url, **kwargs):
+        # Süre yeniden denemeler dahil, yanıt başlıkları gelene kadar ölçülür
+        started = time.perf_counter()
+        try:
+            response = self.session.get(url, timeout=self.timeout, **kwargs)
+        except requests.exceptions.RequestException:
+            self._report('error', started)
+            raise
+        self._report(response.status_code, started)
+        return response
+
+    def _report(self, status, started):
+        if self.on_response is not None:
+            self.on_response(status, time.perf_counter() - started)
+
+    def fetch(self, url, conditional=True):
+        """Tek bir dosyayı çeker; ağ hataları ve 404 dışı hata kodları istisna olarak iletilir.
+
+        ``conditional`` açıksa aynı adres için son görülen Last-Modified
+        değeri gönderilir ve dosya değişmediyse içerik yerine 304 döner.
+        """
+        headers = {}
+        last_modified = self._last_modified.get(url) if conditional else None
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        with self._semaphore:
+            response = self._get(url, headers=headers)
+
+        if response.status_code == 304:
+            return FetchResult(url, 304, None, last_modified)
+        if response.status_code == 404:
+            return FetchResult(url, 404, None, None)
+
+        response.raise_for_status()
+
+        last_modified = response.headers.get('Last-Modified')
+        if last_modified:
+            self._last_modified[url] = last_modified
+        return FetchResult(url, 200, response.content, last_modified)
+
+    @contextmanager
+    def open(self, url):
+        """Dosyayı akış olarak açar, yayınlanmamışsa (404) None verir.
+
+        Eş zamanlılık sınırı gövde okunup bağlantı kapanana kadar tutulur.
+        """
+        with self._semaphore:
+            response = self._get(url, stream=True)
+            try:
+                if response.status_code == 404:
+                    yield None
+                    return
+
+                response.raise_for_status()
+                # gzip/deflate ile gelen gövde okunurken açılır
+                response.raw.decode_content = True
+                yield response.raw
+            finally:
+                response.close()
@@ -0,0 +1,114 @@
+"""Manuel kur güncellemeleri için Redis tabanlı iş kuyruğu.
+
+API isteği işi kuyruğa koyup hemen iş numarasını döndürür; çekme ve yazma
+işini scheduler süreci yapar. Aynı anda yalnızca bir güncelleme işi olabilir:
+kilit (``SET NX``) tutulurken gelen istekler mevcut işin numarasını alır.
+İş durumu ``queued`` → ``running`` → ``done`` / ``failed`` olarak ilerler.
+"""
+import json
+import time
+import uuid
+from datetime import datetime
+
+JOB_QUEUE_KEY = 'rate_update_jobs'
+JOB_LOCK_KEY = 'rate_update_lock'
+JOB_KEY_PREFIX = 'rate_update_job:'
+
+# İş kayıtları bir gün saklanır
+JOB_TTL = 86400
+
+# Scheduler iş ortasında çökerse kilit bu süre sonunda kendiliğinden açılır
+LOCK_TTL = 300
+
+# Kilidi yalnızca sahibi olan iş bırakabilir
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def _job_key(job_id):
+    return f'{JOB_KEY_PREFIX}{job_id}'
+
+
+def _now():
+    return datetime.utcnow().isoformat()
+
+
+def enqueue_update_job(redis_client):
+    """Güncelleme işini kuyruğa koyar, ``(iş numarası, yeni mi)`` döndürür.
+
+    Bekleyen veya çalışan bir iş varsa yeni iş açılmaz, onun numarası döner.
+    """
+    for _ in range(3):
+        job_id = uuid.uuid4().hex
+        if redis_client.set(JOB_LOCK_KEY, job_id, nx=True, ex=LOCK_TTL):
+            pipe = redis_client.pipeline()
+            pipe.hset(_job_key(job_id), mapping={'state': 'queued', 'created_at': _now()})
+            pipe.expire(_job_key(job_id), JOB_TTL)
+            pipe.lpush(JOB_QUEUE_KEY, job_id)
+            pipe.execute()
+            return job_id, True
+
+        existing = redis_client.get(JOB_LOCK_KEY)
+        if existing:
+            return existing.decode(), False
+        # Kilit bu arada açıldı, tekrar dene
+
+    raise RuntimeError('Güncelleme işi kuyruğa alınamadı')
+
+
+def get_job(redis_client, job_id):
+    """İş kaydını sözlük olarak döndürür, yoksa None"""
+    raw = redis_client.hgetall(_job_key(job_id))
+    if not raw:
+        return None
+
+    job = {key.decode(): value.decode() for key, value in raw.items()}
+    job['id'] = job_id
+    if 'result' in job:
+        job['result'] = json.loads(job['result'])
+    return job
+
+
+def update_job(redis_client, job_id, state, **fields):
+    mapping = {'state': state}
+    for key, value in fields.items():
+        mapping[key] = json.dumps(value) if key == 'result' else value
+    redis_client.hset(_job_key(job_id), mapping=mapping)
+
+
+def consume_jobs(redis_client, handler, poll_timeout=5, logger=None):
+    """Kuyruktaki işleri sırayla çalıştırır; hiç dönmez.
+
+    ``handler()`` işin sonucunu JSON'a çevrilebilir bir sözlük olarak döndürür,
+    hata durumunda istisna fırlatır.
+    """
+    release_lock = redis_client.register_script(_RELEASE_LOCK_SCRIPT)
+
+    while True:
+        try:
+            item = redis_client.brpop(JOB_QUEUE_KEY, timeout=poll_timeout)
+        except Exception as e:
+            if logger:
+                logger.error(f"İş kuyruğu okunamadı: {e}")
+            time.sleep(poll_timeout)
+            continue
+
+        if item is None:
+            continue
+
+        job_id = item[1].decode()
+        update_job(redis_client, job_id, 'running', started_at=_now())
+        try:
+            result = handler()
+        except Exception as e:
+            if logger:
+                logger.error(f"Güncelleme işi başarısız ({job_id}): {e}")
+            update_job(redis_client, job_id, 'failed', finished_at=_now(), error=str(e))
+        else:
+            update_job(redis_client, job_id, 'done', finished_at=_now(), result=result)
+        finally:
+            release_lock(keys=[JOB_LOCK_KEY], args=[job_id])
@@ -0,0 +1,183 @@
+"""``latest_rates`` Redis anahtarı: tek seferde yenileme ve bayat veriyle yanıt.
+
+Anahtar bir hash'tir: kurların JSON'u, ait olduğu kur sürümü, yenilenme
+zamanı ve veritabanından yüklemenin ne kadar sürdüğü. Veri ``FRESH_TTL``
+saniye taze sayılır, Redis'te ise ``STALE_TTL`` saniye tutulur:
+
+- Anahtar yoksa veya sürümü eskiyse yalnızca kilidi (``SET NX``) alan istek
+  veritabanına gider; diğerleri anahtarın dolmasını kısa bir süre bekler.
+- Taze süresi dolmuş ama aynı sürümdeki veri, kilidi alan istek yenilerken
+  diğer isteklere bayat olarak verilir (stale-while-revalidate).
+- Süre dolmadan, kalan süre ve yükleme süresine göre olasılıkla erken
+  yenilenir (XFetch); yenileme anları süreçler arasında dağılır.
+
+Scheduler yazımdan sonra anahtarı silmek yerine yeni kurlarla, sürüm
+sayacıyla aynı atomik adımda doldurur (``publish_rates_update``).
+"""
+import json
+import logging
+import math
+import random
+import time
+import uuid
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+LATEST_RATES_KEY = 'latest_rates'
+LATEST_RATES_LOCK_KEY = 'latest_rates:lock'
+
+# Verinin taze sayıldığı ve bayat olarak sunulabildiği süreler (saniye)
+FRESH_TTL = 300
+STALE_TTL = 3600
+
+# Yenileyen süreç çökerse kilit bu süre sonunda açılır (milisaniye)
+LOCK_TTL_MS = 10000
+
+# Kilidi alamayan isteklerin anahtarın dolmasını bekleme süresi
+WAIT_TIMEOUT = 2.0
+WAIT_INTERVAL = 0.05
+
+# XFetch katsayısı; büyüdükçe daha erken yenilenir
+XFETCH_BETA = 1.0
+
+Entry = namedtuple('Entry', ['data', 'version', 'refreshed_at', 'delta'])
+
+# Daha yeni sürümün verisi eskisiyle ezilmez. Anahtar eski biçimde (string)
+# kalmışsa silinip hash olarak yazılır.
+STORE_SCRIPT = """
+local kind = redis.call('type', KEYS[1])['ok']
+if kind ~= 'hash' and kind ~= 'none' then
+    redis.call('del', KEYS[1])
+end
+local current = tonumber(redis.call('hget', KEYS[1], 'version') or '-1')
+if current > tonumber(ARGV[1]) then
+    return 0
+end
+redis.call('hset', KEYS[1], 'version', ARGV[1], 'data', ARGV[2], 'refreshed_at', ARGV[3], 'delta', ARGV[4])
+redis.call('expire', KEYS[1], ARGV[5])
+return 1
+"""
+
+# Sürüm sayacını artırır ve yeni kurları o sürümle yazar
+PUBLISH_SCRIPT = """
+local version = redis.call('incr', KEYS[1])
+redis.call('del', KEYS[2])
+redis.call('hset', KEYS[2], 'version', version, 'data', ARGV[1], 'refreshed_at', ARGV[2], 'delta', ARGV[3])
+redis.call('expire', KEYS[2], ARGV[4])
+return version
+"""
+
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def should_refresh_early(entry, now, beta=XFETCH_BETA):
+    """XFetch: yükleme süresi uzun ve son kullanma yakın oldukça olasılık artar"""
+    expires_at = entry.refreshed_at + FRESH_TTL
+    return now - entry.delta * beta * math.log(1.0 - random.random()) >= expires_at
+
+
+class LatestRatesCache:
+    """API tarafı: ``loader`` veritabanından en son günün kurlarını yükler"""
+
+    def __init__(self, redis_client, loader, record=None):
+        self._redis = redis_client
+        self._loader = loader
+        # Metrik için sonuç: hit, stale, refresh (erken/bayat yenileme) veya miss
+        self._record = record or (lambda result: None)
+
+    def get(self, version=None):
+        """``version`` sürümündeki kurları döndürür; sürüm bilinmiyorsa (None) kontrol edilmez"""
+        if not self._redis:
+            return self._loader()
+
+        entry = self._read()
+        now = time.time()
+        usable = entry is not None and (version is None or entry.version >= version)
+
+        if usable and now < entry.refreshed_at + FRESH_TTL and not should_refresh_early(entry, now):
+            self._record('hit')
+            return entry.data
+
+        token = self._acquire()
+        if token is None:
+            if usable:
+                # Başka bir istek yeniliyor, o bitene kadar bayat veri verilir
+                self._record('stale')
+                return entry.data
+            entry = self._wait(version)
+            if entry is not None:
+                self._record('hit')
+                return entry.data
+            # Kilit sahibi yetişmedi, veri doğrudan yüklenir
+            self._record('miss')
+            return self._loader()
+
+        try:
+            self._record('refresh' if usable else 'miss')
+            return self._refresh(version)
+        finally:
+            self._release(token)
+
+    def _read(self, quiet=False):
+        try:
+            fields = self._redis.hgetall(LATEST_RATES_KEY)
+        except Exception as e:
+            # Eski biçimdeki anahtar (WRONGTYPE) veya Redis hatası, ıska sayılır
+            if not quiet:
+                logger.warning(f"latest_rates okunamadı: {e}")
+            return None
+        if not fields or b'data' not in fields:
+            return None
+        return Entry(
+            json.loads(fields[b'data']),
+            int(fields[b'version']),
+            float(fields[b'refreshed_at']),
+            float(fields.get(b'delta', 0))
+        )
+
+    def _refresh(self, version):
+        started = time.perf_counter()
+        data = self._loader()
+        delta = time.perf_counter() - started
+        try:
+            self._redis.eval(
+                STORE_SCRIPT, 1, LATEST_RATES_KEY,
+                version if version is not None else 0, json.dumps(data), repr(time.time()), repr(delta), STALE_TTL
+            )
+        except Exception as e:
+            logger.warning(f"latest_rates yazılamadı: {e}")
+        return data
+
+    def _wait(self, version):
+        deadline = time.monotonic() + WAIT_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(WAIT_INTERVAL)
+            entry = self._read(quiet=True)
+            if entry is not None and (version is None or entry.version >= version):
+                return entry
+        return None
+
+    def _acquire(self):
+        token = uuid.uuid4().hex
+        try:
+            if self._redis.set(LATEST_RATES_LOCK_KEY, token, nx=True, px=LOCK_TTL_MS):
+                return token
+        except Exception as e:
+            logger.warning(f"latest_rates kilidi alınamadı: {e}")
+            # Redis'e ulaşılamıyorsa herkes kendisi yükler
+            return ''
+        return None
+
+    def _release(self, token):
+        if not token:
+            return
+        try:
+            self._redis.eval(_RELEASE_LOCK_SCRIPT, 1, LATEST_RATES_LOCK_KEY, token)
+        except Exception as e:
+            logger.warning(f"latest_rates kilidi bırakılamadı: {e}")
@@ -0,0 +1,168 @@
+"""Sıralı şema migrasyonları.
+
+``db.create_all()`` yalnızca eksik tabloları oluşturur; mevcut veritabanlarına
+indeks, özet tablo gibi değişiklikler buradaki migrasyonlarla uygulanır.
+Uygulanan sürümler ``schema_migrations`` tablosunda tutulur. API ve scheduler
+aynı anda başlasa da advisory lock sayesinde her migrasyon bir kez çalışır.
+Migrasyon adımları SQL metni ya da bağlantıyı alan bir fonksiyondur.
+"""
+from sqlalchemy import text
+
+from common.db import MIGRATION_LOCK_KEY, OHLC_FIELDS, OHLC_PARTS, refresh_rollups
+
+MIGRATIONS = [
+    (1, "doviz_kurlari (doviz_kodu, tarih) covering indeksi", [
+        # get_rate_history: WHERE doviz_kodu = ? AND tarih BETWEEN ? AND ? ORDER BY tarih
+        # unique_tarih_doviz (tarih, doviz_kodu) sırasıyla bu sorguya uymaz; bu indeksle
+        # plan Index Only Scan olur
+        """
+        CREATE INDEX IF NOT EXISTS ix_doviz_kurlari_kod_tarih
+        ON doviz_kurlari (doviz_kodu, tarih)
+        INCLUDE (alis_kuru, satis_kuru, efektif_alis, efektif_satis)
+        """,
+    ]),
+    (2, "doviz_ozet özet tablosu", [
+        """
+        CREATE TABLE IF NOT EXISTS doviz_ozet (
+            doviz_kodu VARCHAR(10) PRIMARY KEY,
+            doviz_adi VARCHAR(50) NOT NULL,
+            kayit_sayisi INTEGER NOT NULL DEFAULT 0,
+            ilk_tarih DATE,
+            son_tarih DATE,
+            son_guncelleme TIMESTAMP
+        )
+        """,
+        # Mevcut veriden ilk doldurma; sonrasında yazım yolu tabloyu güncel tutar
+        """
+        INSERT INTO doviz_ozet (doviz_kodu, doviz_adi, kayit_sayisi, ilk_tarih, son_tarih, son_guncelleme)
+        SELECT doviz_kodu,
+               (array_agg(doviz_adi ORDER BY tarih DESC))[1],
+               count(*),
+               min(tarih),
+               max(tarih),
+               max(created_at)
+        FROM doviz_kurlari
+        GROUP BY doviz_kodu
+        ON CONFLICT (doviz_kodu) DO UPDATE SET
+            doviz_adi = EXCLUDED.doviz_adi,
+            kayit_sayisi = EXCLUDED.kayit_sayisi,
+            ilk_tarih = EXCLUDED.ilk_tarih,
+            son_tarih = EXCLUDED.son_tarih,
+            son_guncelleme = EXCLUDED.son_guncelleme
+        """,
+    ]),
+    (3, "doviz_kurlari tablosunun yıllık bölümlere ayrılması", [
+        # Eski tablonun kısıt, indeks ve sekans adları yeni tabloya bırakılır
+        "ALTER TABLE doviz_kurlari RENAME TO doviz_kurlari_eski",
+        "ALTER TABLE doviz_kurlari_eski RENAME CONSTRAINT doviz_kurlari_pkey TO doviz_kurlari_eski_pkey",
+        "ALTER TABLE doviz_kurlari_eski RENAME CONSTRAINT unique_tarih_doviz TO unique_tarih_doviz_eski",
+        "ALTER INDEX IF EXISTS ix_doviz_kurlari_kod_tarih RENAME TO ix_doviz_kurlari_eski_kod_tarih",
+        "ALTER SEQUENCE doviz_kurlari_id_seq OWNED BY NONE",
+        # Bölümlü tabloda birincil anahtar ve tekil kısıtlar bölüm anahtarını (tarih) içermeli
+        """
+        CREATE TABLE doviz_kurlari (
+            id INTEGER NOT NULL DEFAULT nextval('doviz_kurlari_id_seq'),
+            tarih DATE NOT NULL,
+            doviz_kodu VARCHAR(10) NOT NULL,
+            doviz_adi VARCHAR(50) NOT NULL,
+            alis_kuru FLOAT NOT NULL,
+            satis_kuru FLOAT NOT NULL,
+            efektif_alis FLOAT NOT NULL,
+            efektif_satis FLOAT NOT NULL,
+            created_at TIMESTAMP,
+            CONSTRAINT doviz_kurlari_pkey PRIMARY KEY (id, tarih),
+            CONSTRAINT unique_tarih_doviz UNIQUE (tarih, doviz_kodu)
+        ) PARTITION BY RANGE (tarih)
+        """,
+        "ALTER SEQUENCE doviz_kurlari_id_seq OWNED BY doviz_kurlari.id",
+        """
+        CREATE INDEX ix_doviz_kurlari_kod_tarih
+        ON doviz_kurlari (doviz_kodu, tarih)
+        INCLUDE (alis_kuru, satis_kuru, efektif_alis, efektif_satis)
+        """,
+        # Mevcut verinin yılları ve gelecek yıl için bölümler; sonrakileri yazım yolu açar
+        """
+        DO $$
+        DECLARE
+            y INTEGER;
+        BEGIN
+            FOR y IN
+                SELECT generate_series(
+                    LEAST(COALESCE(EXTRACT(YEAR FROM min(tarih)), EXTRACT(YEAR FROM current_date)),
+                          EXTRACT(YEAR FROM current_date))::int,
+                    GREATEST(COALESCE(EXTRACT(YEAR FROM max(tarih)), 0), EXTRACT(YEAR FROM current_date) + 1)::int
+                )
+                FROM doviz_kurlari_eski
+            LOOP
+                EXECUTE 'CREATE TABLE ' || quote_ident('doviz_kurlari_y' || y)
+                    || ' PARTITION OF doviz_kurlari FOR VALUES FROM ('
+                    || quote_literal(make_date(y, 1, 1)) || ') TO ('
+                    || quote_literal(make_date(y + 1, 1, 1)) || ')';
+            END LOOP;
+        END
+        $$
+        """,
+        """
+        INSERT INTO doviz_kurlari (id, tarih, doviz_kodu, doviz_adi, alis_kuru, satis_kuru,
+                                   efektif_alis, efektif_satis, created_at)
+        SELECT id, tarih, doviz_kodu, doviz_adi, alis_kuru, satis_kuru,
+               efektif_alis, efektif_satis, created_at
+        FROM doviz_kurlari_eski
+        """,
+        "DROP TABLE doviz_kurlari_eski",
+        "ANALYZE doviz_kurlari",
+    ]),
+    (4, "doviz_kurlari_aylik ve doviz_kurlari_yillik OHLC özet tabloları", [
+        *[
+            f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                doviz_kodu VARCHAR(10) NOT NULL,
+                donem DATE NOT NULL,
+                gun_sayisi INTEGER NOT NULL,
+                {', '.join(f'{field}_{part} FLOAT' for field in OHLC_FIELDS for part in OHLC_PARTS.values())},
+                PRIMARY KEY (doviz_kodu, donem)
+            )
+            """
+            for table in ('doviz_kurlari_aylik', 'doviz_kurlari_yillik')
+        ],
+        # Mevcut veriden ilk doldurma; sonrasında yazım yolu değişen dönemleri günceller
+        refresh_rollups,
+    ]),
+]
+
+
+def apply_migrations(connection):
+    """Uygulanmamış migrasyonları sırayla çalıştırır, uygulananların sürümlerini döndürür"""
+    # Migrasyonlar PostgreSQL'e özeldir (INCLUDE, advisory lock vb.)
+    if connection.dialect.name != 'postgresql':
+        return []
+
+    # Migrasyonlar uzun sürebilir; bağlantıdaki statement_timeout bu transaction için kaldırılır
+    connection.execute(text("SET LOCAL statement_timeout = 0"))
+    connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {'key': MIGRATION_LOCK_KEY})
+    connection.execute(text("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT now()
+        )
+    """))
+
+    applied = {row[0] for row in connection.execute(text("SELECT version FROM schema_migrations"))}
+
+    newly_applied = []
+    for version, description, statements in MIGRATIONS:
+        if version in applied:
+            continue
+        for statement in statements:
+            if callable(statement):
+                statement(connection)
+            else:
+                connection.execute(text(statement))
+        connection.execute(
+            text("INSERT INTO schema_migrations (version, description) VALUES (:version, :description)"),
+            {'version': version, 'description': description}
+        )
+        newly_applied.append(version)
+
+    return newly_applied
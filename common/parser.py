@@ -0,0 +1,184 @@
+"""TCMB kur XML'lerinin akış halinde ayrıştırılması ve kaynak adaptörleri.
+
+XML ağacı bellekte kurulmaz: ``iterparse`` ile her ``Currency`` elemanı
+kapandığı anda okunup silinir, HTTP yanıtı veya dosya okundukça ayrıştırma
+ilerler. Kurlar sözlük yerine ``Rate`` demetleri olarak döner; sözlüğe
+çevirme yalnızca veritabanı sınırında yapılır.
+
+Ayrıştırılan baytların SHA-256 özeti de döner; scheduler aynı içerik tekrar
+geldiğinde yazımı, cache temizliğini ve bildirimleri atlar.
+
+Kaynaklar ortak bir ``open(date)`` arayüzü sunar: canlı TCMB adresi, yerel
+arşiv dizini veya arşivin zip paketi. Dosya yoksa (yayınlanmamış gün) akış
+yerine None verilir.
+"""
+import hashlib
+import io
+import os
+import xml.etree.ElementTree as ET
+import zipfile
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime
+
+from common.fetcher import TCMBFetcher, daily_url
+
+# Alan adları doviz_kurlari kolonlarıyla aynıdır
+Rate = namedtuple('Rate', ['doviz_kodu', 'doviz_adi', 'alis_kuru', 'satis_kuru', 'efektif_alis', 'efektif_satis'])
+
+# tarih: bültenin yayın tarihi (Tarih_Date/@Date), okunamazsa None
+# digest: okunan ham içeriğin SHA-256 özeti
+ParsedRates = namedtuple('ParsedRates', ['tarih', 'rates', 'digest'])
+
+
+def payload_digest(content):
+    """Ham içeriğin (bayt) SHA-256 özeti"""
+    return hashlib.sha256(content).hexdigest()
+
+
+class DigestReader:
+    """Okunan baytların özetini çıkaran ikili akış sarmalayıcısı"""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._hash = hashlib.sha256()
+
+    def read(self, size=-1):
+        data = self._stream.read(size)
+        self._hash.update(data)
+        return data
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+
+def _safe_float(value):
+    """Güvenli float dönüşümü"""
+    try:
+        return float(value) if value else 0.0
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def _publication_date(value):
+    """Tarih_Date elemanındaki MM/DD/YYYY biçimli tarihi okur"""
+    try:
+        return datetime.strptime(value, '%m/%d/%Y').date()
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_rates(stream):
+    """TCMB XML'ini (bayt veya ikili dosya nesnesi) akış halinde ayrıştırır.
+
+    Hatalı XML'de ``ET.ParseError`` fırlatır.
+    """
+    if isinstance(stream, (bytes, bytearray)):
+        stream = io.BytesIO(stream)
+    stream = DigestReader(stream)
+
+    root = None
+    tarih = None
+    rates = []
+    for event, elem in ET.iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            if root is None:
+                root = elem
+                tarih = _publication_date(elem.get('Date'))
+            continue
+
+        if elem.tag != 'Currency':
+            continue
+
+        forex_buying = _safe_float(elem.findtext('ForexBuying'))
+        if forex_buying > 0:  # Sadece geçerli kurları al
+            rates.append(Rate(
+                elem.get('Kod'),
+                elem.findtext('Isim'),
+                forex_buying,
+                _safe_float(elem.findtext('ForexSelling')),
+                _safe_float(elem.findtext('BanknoteBuying')),
+                _safe_float(elem.findtext('BanknoteSelling'))
+            ))
+
+        # Okunan elemanlar kökten de silinir, bellek kullanımı sabit kalır
+        root.clear()
+
+    return ParsedRates(tarih, rates, stream.hexdigest())
+
+
+def archive_name(date):
+    """TCMB'nin arşivde kullandığı dosya adı (DDMMYYYY.xml)"""
+    return f"{date:%d%m%Y}.xml"
+
+
+class UrlSource:
+    """TCMB sitesinden canlı okuma; yanıt gövdesi indikçe ayrıştırılır"""
+
+    live = True
+
+    def __init__(self, fetcher=None):
+        self.fetcher = fetcher or TCMBFetcher()
+        self.concurrency = self.fetcher.max_concurrency
+
+    def open(self, date):
+        return self.fetcher.open(daily_url(date))
+
+
+class DirectorySource:
+    """Yerel arşiv dizini; TCMB düzeni (YYYYMM/DDMMYYYY.xml) veya düz dizin"""
+
+    live = False
+    concurrency = 1
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, date):
+        for path in (os.path.join(self.root, f"{date:%Y%m}", archive_name(date)),
+                     os.path.join(self.root, archive_name(date))):
+            if os.path.isfile(path):
+                return path
+        return None
+
+    @contextmanager
+    def open(self, date):
+        path = self._path(date)
+        if path is None:
+            yield None
+            return
+        with open(path, 'rb') as f:
+            yield f
+
+
+class ZipSource:
+    """Arşivin zip paketi; dosyalar iç dizinlerden bağımsız olarak adıyla bulunur"""
+
+    live = False
+    concurrency = 1
+
+    def __init__(self, path):
+        self.path = path
+        self._zip = zipfile.ZipFile(path)
+        self._members = {
+            os.path.basename(info.filename): info
+            for info in self._zip.infolist() if not info.is_dir()
+        }
+
+    @contextmanager
+    def open(self, date):
+        info = self._members.get(archive_name(date))
+        if info is None:
+            yield None
+            return
+        with self._zip.open(info) as f:
+            yield f
+
+
+def open_archive(path):
+    """Yol zip dosyasıysa ZipSource, dizinse DirectorySource döndürür"""
+    if os.path.isdir(path):
+        return DirectorySource(path)
+    if zipfile.is_zipfile(path):
+        return ZipSource(path)
+    raise ValueError(f"Arşiv dizini veya zip dosyası değil: {path}")
@@ -0,0 +1,204 @@
+"""Gün içi kur kaynakları (provider) ve kaynak yapılandırması.
+
+Her kaynak ``fetch()`` ile o anki kotasyonları ve içeriğin özetini ``Feed``
+olarak döndürür; kaynakta değişiklik yoksa (304 veya içerik özeti bir önceki
+çekimle aynıysa) None döner. Kaynak türleri
+``register_provider`` ile kaydedilir, scheduler hangi kaynağın hangi
+aralıkla çalışacağını ``INTRADAY_SOURCES`` (JSON) veya
+``INTRADAY_SOURCES_FILE`` yapılandırmasından okur:
+
+    [
+      {"name": "tcmb", "type": "tcmb_today", "interval": 900},
+      {"name": "banka", "type": "json", "url": "https://.../quotes.json", "cron": "*/5 9-18 * * 1-5",
+       "items": "data", "code": "symbol", "buy": "bid", "sell": "ask", "time": "ts"}
+    ]
+
+Adres ``file://`` ile başlıyorsa veya şema içermiyorsa yerel dosya okunur;
+kaynaklar yerel sahte sunucu ya da dosyalarla denenebilir.
+"""
+import json
+import os
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+from common.fetcher import TODAY_URL, TCMBFetcher
+from common.parser import parse_rates, payload_digest
+
+# Alanlar doviz_kurlari_anlik kolonlarıyla aynıdır; zaman UTC'dir
+Quote = namedtuple('Quote', ['kaynak', 'doviz_kodu', 'zaman', 'alis_kuru', 'satis_kuru'])
+
+# digest: ham içeriğin özeti, quotes: Quote listesi
+Feed = namedtuple('Feed', ['digest', 'quotes'])
+
+# Kaynak adı kotasyonlarda saklandığı için kısa ve sabit olmalı
+MAX_NAME_LENGTH = 32
+
+PROVIDERS = {}
+
+
+def register_provider(kind):
+    """Kaynak sınıfını yapılandırmadaki ``type`` adıyla kaydeder"""
+    def decorator(cls):
+        PROVIDERS[kind] = cls
+        return cls
+    return decorator
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def _parse_time(value):
+    """ISO 8601 metni veya epoch saniyesini UTC datetime'a çevirir"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, timezone.utc)
+    parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def _last_modified(value):
+    try:
+        return parsedate_to_datetime(value).astimezone(timezone.utc) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+class Provider(ABC):
+    """Adresten belge okuyan kaynakların ortak kısmı; alt sınıflar ``parse``'ı tanımlar"""
+
+    def __init__(self, name, url, fetcher=None):
+        self.name = name
+        self.url = url
+        self.fetcher = fetcher or TCMBFetcher()
+
+    def _read(self):
+        """``(içerik, değişiklik zamanı)`` döndürür; belge değişmemişse içerik None'dır"""
+        parsed = urlparse(self.url)
+        if parsed.scheme in ('', 'file'):
+            path = parsed.path if parsed.scheme else self.url
+            with open(path, 'rb') as f:
+                content = f.read()
+            return content, datetime.fromtimestamp(os.path.getmtime(path), timezone.utc).replace(microsecond=0)
+
+        # Aynı belge tekrar indirilmez, sunucu değişmediyse 304 döner
+        result = self.fetcher.fetch(self.url, conditional=True)
+        if result.status == 304:
+            return None, None
+        if result.status != 200:
+            raise ValueError(f"{self.name} kaynağı yanıtı: {result.status}")
+        return result.content, _last_modified(result.last_modified)
+
+    def fetch(self, last_digest=None):
+        """İçerik ``last_digest`` ile aynıysa ayrıştırmadan None döndürür"""
+        content, modified = self._read()
+        if content is None:
+            return None
+        digest = payload_digest(content)
+        if digest == last_digest:
+            return None
+        return Feed(digest, self.parse(content, modified or _utcnow()))
+
+    @abstractmethod
+    def parse(self, content, modified):
+        """Ham içeriği ``Quote`` listesine çevirir; ``modified`` belgenin değişiklik zamanıdır"""
+
+
+@register_provider('xml')
+class XmlFeedProvider(Provider):
+    """TCMB kur dosyası biçimindeki herhangi bir XML akışı.
+
+    Kotasyon zamanı belgenin değişiklik zamanıdır (Last-Modified veya dosya
+    zamanı); TCMB dosyasında yalnızca gün bulunur.
+    """
+
+    def parse(self, content, modified):
+        return [
+            Quote(self.name, rate.doviz_kodu, modified, rate.alis_kuru, rate.satis_kuru)
+            for rate in parse_rates(content).rates
+        ]
+
+
+@register_provider('tcmb_today')
+class TCMBTodayProvider(XmlFeedProvider):
+    """TCMB'nin gün içinde yayınladığı gösterge niteliğindeki kurlar (today.xml)"""
+
+    def __init__(self, name, url=TODAY_URL, fetcher=None):
+        super().__init__(name, url, fetcher)
+
+
+@register_provider('json')
+class JsonFeedProvider(Provider):
+    """Kotasyon listesi döndüren JSON akışı; alan adları yapılandırılabilir.
+
+    ``items`` listenin belgedeki yoludur (noktayla ayrılmış, boşsa belgenin
+    kendisi). ``time`` alanı yoksa belgenin değişiklik zamanı kullanılır.
+    """
+
+    def __init__(self, name, url, fetcher=None, items='', code='code', buy='buy', sell='sell', time=None):
+        super().__init__(name, url, fetcher)
+        self.items = [key for key in items.split('.') if key]
+        self.fields = {'code': code, 'buy': buy, 'sell': sell, 'time': time}
+
+    def parse(self, content, modified):
+        document = json.loads(content)
+        for key in self.items:
+            document = document[key]
+
+        quotes = []
+        for item in document:
+            code = item.get(self.fields['code'])
+            buy, sell = item.get(self.fields['buy']), item.get(self.fields['sell'])
+            if not code or (buy is None and sell is None):
+                continue
+            zaman = _parse_time(item.get(self.fields['time'])) if self.fields['time'] else None
+            quotes.append(Quote(
+                self.name, str(code).upper(), zaman or modified,
+                float(buy) if buy is not None else None, float(sell) if sell is not None else None
+            ))
+        return quotes
+
+
+SourceConfig = namedtuple('SourceConfig', ['provider', 'interval', 'cron'])
+
+
+def load_source_configs(fetcher=None, value=None, path=None):
+    """Yapılandırmadaki kaynakları kurar; hatalı yapılandırmada ValueError fırlatır"""
+    value = value if value is not None else os.getenv('INTRADAY_SOURCES')
+    path = path if path is not None else os.getenv('INTRADAY_SOURCES_FILE')
+    if path:
+        with open(path, encoding='utf-8') as f:
+            entries = json.load(f)
+    elif value:
+        entries = json.loads(value)
+    else:
+        return []
+
+    configs = []
+    names = set()
+    for entry in entries:
+        options = dict(entry)
+        name = options.pop('name', None)
+        kind = options.pop('type', None)
+        interval = options.pop('interval', None)
+        cron = options.pop('cron', None)
+
+        if not name or len(name) > MAX_NAME_LENGTH:
+            raise ValueError(f"Kaynak adı 1-{MAX_NAME_LENGTH} karakter olmalı: {entry}")
+        if name in names:
+            raise ValueError(f"Aynı adla birden fazla kaynak: {name}")
+        if kind not in PROVIDERS:
+            raise ValueError(f"Bilinmeyen kaynak türü: {kind} (geçerli: {', '.join(sorted(PROVIDERS))})")
+        if (interval is None) == (cron is None):
+            raise ValueError(f"{name} için interval (saniye) veya cron verilmeli")
+
+        names.add(name)
+        provider = PROVIDERS[kind](name, fetcher=fetcher, **options)
+        configs.append(SourceConfig(provider, int(interval) if interval is not None else None, cron))
+    return configs
@@ -0,0 +1,91 @@
+"""Ham kur verisi için saklama süresi.
+
+``doviz_kurlari`` yıllık bölümlere ayrıldığı için eski veri satır satır
+DELETE yerine bölüm tablosu düşürülerek silinir; tablo şişmez, VACUUM
+gerekmez. Aylık/yıllık özetler yazım yolunda güncel tutulduğundan silinen
+yıllar geçmiş uç noktalarında özet tablolardan sunulmaya devam eder.
+
+``RAW_RETENTION_YEARS`` içinde bulunulan yıla ek olarak ham verisi
+saklanacak tam yıl sayısıdır; verilmezse hiçbir şey silinmez.
+"""
+import logging
+import os
+import re
+from datetime import date
+
+from sqlalchemy import delete, func, select, text
+
+from common.db import doviz_kurlari, doviz_ozet, ensure_partitions
+
+logger = logging.getLogger(__name__)
+
+RAW_RETENTION_YEARS = os.getenv('RAW_RETENTION_YEARS')
+
+PARTITION_PATTERN = re.compile(r'^doviz_kurlari_y(\d{4})$')
+
+
+def list_partitions(connection):
+    """``doviz_kurlari`` bölümlerini ``{yıl: tablo adı}`` olarak döndürür"""
+    names = connection.execute(text("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'doviz_kurlari'::regclass
+    """)).scalars()
+    partitions = {}
+    for name in names:
+        match = PARTITION_PATTERN.match(name)
+        if match:
+            partitions[int(match.group(1))] = name
+    return partitions
+
+
+def maintain_partitions(connection, keep_years=RAW_RETENTION_YEARS, today=None):
+    """Bu ve gelecek yılın bölümlerini açar, süresi dolan yılları siler.
+
+    Silinen yılların listesini döndürür. ``doviz_ozet`` kalan veriye göre
+    düzeltilir. Yalnızca Postgres'te çalışır.
+    """
+    if connection.dialect.name != 'postgresql':
+        return []
+
+    today = today or date.today()
+    ensure_partitions(connection, [today.year, today.year + 1])
+    if keep_years in (None, ''):
+        return []
+
+    cutoff = today.year - int(keep_years)
+    expired = sorted(
+        (year, name) for year, name in list_partitions(connection).items() if year < cutoff
+    )
+    if not expired:
+        return []
+
+    # Silinecek satırlar döviz bazında sayılır; tarama yalnızca bu bölümlerde yapılır
+    removed = {}
+    for _, name in expired:
+        for doviz_kodu, count in connection.execute(
+            text(f"SELECT doviz_kodu, count(*) FROM {name} GROUP BY doviz_kodu")
+        ):
+            removed[doviz_kodu] = removed.get(doviz_kodu, 0) + count
+        connection.execute(text(f"DROP TABLE {name}"))
+
+    _adjust_summary(connection, removed)
+
+    years = [year for year, _ in expired]
+    logger.info(f"Saklama süresi dolan ham veri silindi: {years}, {sum(removed.values())} satır")
+    return years
+
+
+def _adjust_summary(connection, removed):
+    """Silinen satırları doviz_ozet'ten düşer; verisi kalmayan dövizleri kaldırır"""
+    for doviz_kodu, count in removed.items():
+        first = select(func.min(doviz_kurlari.c.tarih)).where(
+            doviz_kurlari.c.doviz_kodu == doviz_kodu
+        ).scalar_subquery()
+        connection.execute(
+            doviz_ozet.update()
+            .where(doviz_ozet.c.doviz_kodu == doviz_kodu)
+            .values(kayit_sayisi=doviz_ozet.c.kayit_sayisi - count, ilk_tarih=first)
+        )
+    connection.execute(delete(doviz_ozet).where(doviz_ozet.c.kayit_sayisi <= 0))
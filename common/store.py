@@ -0,0 +1,239 @@
+"""Kur geçmişinin bellek eşlemeli (mmap) sütunlu dosya deposu.
+
+``doviz_kurlari`` tablosunun tamamı tarih × döviz kodu × 4 kur alanı
+boyutunda, C sıralı float64 bir diziye yazılır; eksik değerler NaN'dır.
+Tarihler, döviz kodları ve veri dosyasının adı ``meta.json`` içindedir.
+
+Scheduler her yazımdan sonra depoyu günceller: yeni günler dosyanın sonuna
+eklenir, var olan günler yerinde güncellenir; yeni bir döviz kodu ya da
+araya giren eski bir gün gelirse depo yeni bir dosyaya baştan yazılır.
+Meta dosyası her zaman en son ve atomik olarak değiştirilir, okuyucular
+yarım yazılmış bir durumu görmez.
+
+API worker'ları dosyayı salt okunur mmap'ler; aynı makinedeki süreçler
+sayfa önbelleğini paylaşır, sorgular veritabanına gitmeden yanıtlanır.
+"""
+import fcntl
+import json
+import os
+import uuid
+from contextlib import contextmanager
+from datetime import date
+
+import numpy as np
+from sqlalchemy import select
+
+from common.db import doviz_kurlari
+
+DEFAULT_STORE_DIR = os.getenv('RATE_STORE_DIR', 'rate_store')
+
+FIELDS = ('alis_kuru', 'satis_kuru', 'efektif_alis', 'efektif_satis')
+
+META_FILE = 'meta.json'
+LOCK_FILE = '.lock'
+FETCH_CHUNK_SIZE = 10000
+
+
+def _load_rows(connection, since=None):
+    """Kur satırlarını tarih sırasıyla, sunucu tarafı cursor ile okur"""
+    columns = [doviz_kurlari.c.tarih, doviz_kurlari.c.doviz_kodu] + [doviz_kurlari.c[f] for f in FIELDS]
+    stmt = select(*columns)
+    if since:
+        stmt = stmt.where(doviz_kurlari.c.tarih >= since)
+    stmt = stmt.order_by(doviz_kurlari.c.tarih)
+
+    result = connection.execution_options(stream_results=True).execute(stmt)
+    for partition in result.partitions(FETCH_CHUNK_SIZE):
+        yield from partition
+
+
+def _read_meta(directory):
+    try:
+        with open(os.path.join(directory, META_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _write_meta(directory, meta):
+    path = os.path.join(directory, META_FILE)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class RateStoreWriter:
+    """Depoyu veritabanından kurar ve yazımlardan sonra günceller (yalnızca scheduler)"""
+
+    def __init__(self, directory=DEFAULT_STORE_DIR):
+        self.directory = directory
+
+    @contextmanager
+    def _locked(self):
+        # Scheduler ve backfill aynı anda yazmasın diye süreçler arası dosya kilidi
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, LOCK_FILE), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def rebuild(self, connection):
+        """Bütün geçmişi yeni bir veri dosyasına yazar, gün sayısını döndürür"""
+        with self._locked():
+            return self._rebuild(connection)
+
+    def refresh(self, connection, since=None):
+        """``since`` ve sonrasındaki günleri depoya işler.
+
+        ``since`` verilmezse depodaki son günden sonrası okunur. Depo yoksa,
+        yeni bir döviz kodu veya depoda olmayan eski bir gün gelirse baştan
+        kurulur. İşlenen gün sayısını döndürür.
+        """
+        with self._locked():
+            return self._refresh(connection, since)
+
+    def _rebuild(self, connection):
+        rows = list(_load_rows(connection))
+        dates = sorted({row.tarih for row in rows})
+        codes = sorted({row.doviz_kodu for row in rows})
+
+        values = np.full((len(dates), len(codes), len(FIELDS)), np.nan)
+        date_index = {day: i for i, day in enumerate(dates)}
+        code_index = {code: i for i, code in enumerate(codes)}
+        for row in rows:
+            values[date_index[row.tarih], code_index[row.doviz_kodu]] = row[2:]
+
+        data_file = f'rates-{uuid.uuid4().hex[:12]}.f64'
+        with open(os.path.join(self.directory, data_file), 'wb') as f:
+            values.tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+
+        previous = _read_meta(self.directory)
+        _write_meta(self.directory, {
+            'data_file': data_file,
+            'dates': [day.isoformat() for day in dates],
+            'codes': codes,
+            'fields': list(FIELDS)
+        })
+
+        # Eski dosyayı mmap'lemiş okuyucular, kapatana kadar onu görmeye devam eder
+        if previous and previous['data_file'] != data_file:
+            try:
+                os.remove(os.path.join(self.directory, previous['data_file']))
+            except FileNotFoundError:
+                pass
+
+        return len(dates)
+
+    def _refresh(self, connection, since):
+        meta = _read_meta(self.directory)
+        if meta is None or not meta['dates']:
+            return self._rebuild(connection)
+
+        dates = [date.fromisoformat(day) for day in meta['dates']]
+        codes = meta['codes']
+        last = dates[-1]
+
+        rows = list(_load_rows(connection, since or last))
+        if not rows:
+            return 0
+
+        code_index = {code: i for i, code in enumerate(codes)}
+        date_index = {day: i for i, day in enumerate(dates)}
+        new_dates = sorted({row.tarih for row in rows if row.tarih not in date_index})
+
+        if any(row.doviz_kodu not in code_index for row in rows) or (new_dates and new_dates[0] <= last):
+            return self._rebuild(connection)
+
+        path = os.path.join(self.directory, meta['data_file'])
+        shape = (len(codes), len(FIELDS))
+
+        # Var olan günler yerinde güncellenir
+        existing = [row for row in rows if row.tarih in date_index]
+        updated_days = {row.tarih for row in existing}
+        if existing:
+            values = np.memmap(path, dtype=np.float64, mode='r+', shape=(len(dates),) + shape)
+            for row in existing:
+                values[date_index[row.tarih], code_index[row.doviz_kodu]] = row[2:]
+            values.flush()
+            del values
+
+        # Yeni günler dosyanın sonuna eklenir, meta güncellenene kadar okuyucular görmez
+        if new_dates:
+            appended = np.full((len(new_dates),) + shape, np.nan)
+            new_index = {day: i for i, day in enumerate(new_dates)}
+            for row in rows:
+                if row.tarih in new_index:
+                    appended[new_index[row.tarih], code_index[row.doviz_kodu]] = row[2:]
+            with open(path, 'ab') as f:
+                appended.tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+
+            meta['dates'].extend(day.isoformat() for day in new_dates)
+            _write_meta(self.directory, meta)
+
+        return len(updated_days) + len(new_dates)
+
+
+class RateStore:
+    """Deponun salt okunur, mmap'lenmiş bir sürümü"""
+
+    def __init__(self, directory, meta):
+        self.dates = np.array(meta['dates'], dtype='datetime64[D]')
+        self.codes = tuple(meta['codes'])
+        self.fields = tuple(meta['fields'])
+        self.code_index = {code: i for i, code in enumerate(self.codes)}
+
+        shape = (len(self.dates), len(self.codes), len(self.fields))
+        if len(self.dates):
+            self.values = np.memmap(
+                os.path.join(directory, meta['data_file']), dtype=np.float64, mode='r', shape=shape
+            )
+        else:
+            self.values = np.empty(shape)
+
+    def position(self, day):
+        """``day`` veya ondan önceki son kur gününün indeksi, yoksa -1"""
+        return int(np.searchsorted(self.dates, np.datetime64(day, 'D'), side='right')) - 1
+
+    def date_range(self, start=None, end=None):
+        """[start, end] aralığındaki günlerin dilim sınırları"""
+        lo = int(np.searchsorted(self.dates, np.datetime64(start, 'D'), side='left')) if start else 0
+        hi = int(np.searchsorted(self.dates, np.datetime64(end, 'D'), side='right')) if end else len(self.dates)
+        return lo, hi
+
+
+class RateStoreReader:
+    """Güncel depo sürümünü verir; meta dosyası değişince yeniden mmap'ler"""
+
+    def __init__(self, directory=DEFAULT_STORE_DIR):
+        self.directory = directory
+        self._store = None
+        self._stamp = None
+
+    def get(self):
+        """Depo henüz kurulmamışsa None döndürür"""
+        try:
+            stat = os.stat(os.path.join(self.directory, META_FILE))
+        except FileNotFoundError:
+            return None
+
+        stamp = (stat.st_ino, stat.st_mtime_ns)
+        if stamp != self._stamp:
+            meta = _read_meta(self.directory)
+            if meta is None:
+                return None
+            try:
+                self._store = RateStore(self.directory, meta)
+            except FileNotFoundError:
+                # Okuma sırasında depo yeniden kuruldu, bir sonraki çağrıda yüklenir
+                return self._store
+            self._stamp = stamp
+        return self._store
@@ -0,0 +1,8 @@
+"""Ortak modül testleri; ``common`` paketi depo kökünden içe aktarılır."""
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
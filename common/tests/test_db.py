@@ -0,0 +1,37 @@
+from datetime import date
+
+from common.db import _count_returning
+
+
+def test_count_returning_splits_inserted_and_updated():
+    summary = {}
+    result = [
+        ('USD', 'ABD DOLARI', date(2024, 5, 2), True),
+        ('USD', 'ABD DOLARI', date(2024, 5, 3), False),
+        ('EUR', 'EURO', date(2024, 5, 3), True),
+    ]
+
+    assert _count_returning(result, summary) == (2, 1)
+    assert summary == {
+        'USD': ['ABD DOLARI', 1, date(2024, 5, 2), date(2024, 5, 3)],
+        'EUR': ['EURO', 1, date(2024, 5, 3), date(2024, 5, 3)],
+    }
+
+
+def test_count_returning_tracks_date_range_and_latest_name():
+    summary = {}
+    # Satırlar tarih sırasıyla gelmeyebilir; ad en yeni tarihtekinden alınır
+    _count_returning([
+        ('GBP', 'İNGİLİZ STERLİNİ', date(2024, 5, 6), True),
+        ('GBP', 'ESKİ AD', date(2024, 5, 1), True),
+    ], summary)
+    _count_returning([('GBP', 'İNGİLİZ STERLİNİ', date(2024, 5, 7), False)], summary)
+
+    assert summary['GBP'] == ['İNGİLİZ STERLİNİ', 2, date(2024, 5, 1), date(2024, 5, 7)]
+
+
+def test_count_returning_empty_result():
+    summary = {}
+
+    assert _count_returning([], summary) == (0, 0)
+    assert summary == {}
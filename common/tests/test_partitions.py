@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+
+from common.db import ensure_partitions
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+
+class FakePostgres:
+    """Eksik bölüm sorgusuna sırayla verilen yanıtları döndüren bağlantı"""
+
+    dialect = SimpleNamespace(name='postgresql')
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        sql = ' '.join(str(statement).split())
+        self.statements.append(sql)
+        return FakeResult(self.answers.pop(0) if 'unnest' in sql else [])
+
+    def created(self):
+        return [sql.split()[5] for sql in self.statements if sql.startswith('CREATE TABLE')]
+
+    def locked(self):
+        return any('pg_advisory_xact_lock' in sql for sql in self.statements)
+
+
+def test_nothing_missing_takes_no_lock():
+    connection = FakePostgres([])
+
+    assert ensure_partitions(connection, [2024, 2024]) == []
+    assert not connection.locked()
+
+
+def test_missing_partitions_are_rechecked_under_lock():
+    # 2025'i kilidi bekleyen sırada başka bir süreç oluşturdu
+    connection = FakePostgres([2025, 2026], [2026])
+
+    assert ensure_partitions(connection, [2026, 2025]) == [2026]
+    assert connection.created() == ['doviz_kurlari_y2026']
+    lock = next(i for i, sql in enumerate(connection.statements) if 'pg_advisory_xact_lock' in sql)
+    assert lock < len(connection.statements) - 1
+    assert 'unnest' in connection.statements[lock + 1]
+
+
+def test_other_dialects_are_skipped():
+    connection = FakePostgres()
+    connection.dialect = SimpleNamespace(name='sqlite')
+
+    assert ensure_partitions(connection, [2024]) == []
+    assert connection.statements == []
@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+from common.providers import PROVIDERS, JsonFeedProvider, Provider, load_source_configs, register_provider
+
+
+def test_provider_without_parse_fails_on_creation(monkeypatch):
+    monkeypatch.setattr('common.providers.PROVIDERS', dict(PROVIDERS))
+
+    @register_provider('eksik')
+    class MissingParse(Provider):
+        pass
+
+    with pytest.raises(TypeError):
+        MissingParse('eksik', 'quotes.json', fetcher=object())
+    # Yapılandırma okunurken, ilk çekimden önce hata verir
+    with pytest.raises(TypeError):
+        load_source_configs(fetcher=object(), value=json.dumps([
+            {'name': 'eksik', 'type': 'eksik', 'url': 'quotes.json', 'interval': 60}
+        ]))
+
+
+def test_json_provider_reads_local_file(tmp_path):
+    path = tmp_path / 'quotes.json'
+    path.write_text(json.dumps({'data': [
+        {'symbol': 'usd', 'bid': 32.1, 'ask': 32.3},
+        {'symbol': 'eur'},
+    ]}))
+    provider = JsonFeedProvider('banka', str(path), fetcher=object(), items='data', code='symbol', buy='bid', sell='ask')
+
+    feed = provider.fetch()
+
+    assert [(q.doviz_kodu, q.alis_kuru, q.satis_kuru) for q in feed.quotes] == [('USD', 32.1, 32.3)]
+    assert provider.fetch(last_digest=feed.digest) is None
@@ -0,0 +1,61 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, select
+
+from common.db import doviz_kurlari, doviz_kurlari_aylik, doviz_kurlari_yillik, metadata, refresh_rollups
+
+ROWS = [
+    (date(2024, 1, 30), 'USD', 30.0),
+    (date(2024, 1, 31), 'USD', 29.0),
+    (date(2024, 2, 1), 'USD', 31.0),
+    (date(2024, 2, 2), 'USD', 33.0),
+    (date(2024, 2, 5), 'USD', 32.0),
+    (date(2024, 2, 1), 'EUR', 34.0),
+]
+
+
+@pytest.fixture
+def connection():
+    engine = create_engine('sqlite://')
+    metadata.create_all(engine, tables=[doviz_kurlari, doviz_kurlari_aylik, doviz_kurlari_yillik])
+    with engine.begin() as connection:
+        connection.execute(doviz_kurlari.insert(), [
+            {
+                'tarih': day, 'doviz_kodu': code, 'doviz_adi': code, 'alis_kuru': value,
+                'satis_kuru': value, 'efektif_alis': value, 'efektif_satis': value
+            }
+            for day, code, value in ROWS
+        ])
+        refresh_rollups(connection)
+        yield connection
+
+
+def monthly(connection, code, month):
+    c = doviz_kurlari_aylik.c
+    return connection.execute(
+        select(c.gun_sayisi, c.satis_kuru_acilis, c.satis_kuru_en_yuksek, c.satis_kuru_en_dusuk, c.satis_kuru_kapanis)
+        .where(c.doviz_kodu == code, c.donem == month)
+    ).one()
+
+
+def test_ohlc_uses_first_and_last_day_of_period(connection):
+    assert tuple(monthly(connection, 'USD', date(2024, 1, 1))) == (2, 30.0, 30.0, 29.0, 29.0)
+    assert tuple(monthly(connection, 'USD', date(2024, 2, 1))) == (3, 31.0, 33.0, 31.0, 32.0)
+
+    yearly = connection.execute(
+        select(doviz_kurlari_yillik.c.gun_sayisi, doviz_kurlari_yillik.c.satis_kuru_kapanis)
+        .where(doviz_kurlari_yillik.c.doviz_kodu == 'USD')
+    ).one()
+    assert tuple(yearly) == (5, 32.0)
+
+
+def test_partial_refresh_rewrites_only_touched_periods_and_codes(connection):
+    connection.execute(doviz_kurlari.update().values(satis_kuru=40.0))
+
+    refresh_rollups(connection, date(2024, 2, 2), date(2024, 2, 2), codes=['USD'])
+
+    # Değişen dönemin tamamı yeniden hesaplanır, diğer dönem ve dövizler dokunulmadan kalır
+    assert tuple(monthly(connection, 'USD', date(2024, 2, 1))) == (3, 40.0, 40.0, 40.0, 40.0)
+    assert monthly(connection, 'USD', date(2024, 1, 1)).satis_kuru_kapanis == 29.0
+    assert monthly(connection, 'EUR', date(2024, 2, 1)).satis_kuru_kapanis == 34.0
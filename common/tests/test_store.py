@@ -0,0 +1,126 @@
+import json
+import os
+from datetime import date
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+
+from common.db import doviz_kurlari, metadata
+from common.store import META_FILE, RateStoreReader, RateStoreWriter
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite://')
+    metadata.create_all(engine, tables=[doviz_kurlari])
+    return engine
+
+
+@pytest.fixture
+def insert(engine):
+    def insert(day, rates):
+        with engine.begin() as connection:
+            connection.execute(doviz_kurlari.insert(), [
+                {
+                    'tarih': day, 'doviz_kodu': code, 'doviz_adi': code, 'alis_kuru': value,
+                    'satis_kuru': value + 0.1, 'efektif_alis': value, 'efektif_satis': value + 0.2
+                }
+                for code, value in rates.items()
+            ])
+    return insert
+
+
+@pytest.fixture
+def writer(tmp_path):
+    return RateStoreWriter(str(tmp_path))
+
+
+def data_file(writer):
+    with open(os.path.join(writer.directory, META_FILE), encoding='utf-8') as f:
+        return json.load(f)['data_file']
+
+
+def test_refresh_appends_new_days_to_same_file(engine, insert, writer):
+    insert(date(2024, 5, 2), {'USD': 32.0, 'EUR': 34.0})
+    with engine.connect() as connection:
+        assert writer.refresh(connection) == 1
+    first_file = data_file(writer)
+
+    insert(date(2024, 5, 3), {'USD': 32.5})
+    with engine.connect() as connection:
+        # Depodaki son gün de yeniden okunur
+        assert writer.refresh(connection) == 2
+
+    assert data_file(writer) == first_file
+    store = RateStoreReader(writer.directory).get()
+    assert store.codes == ('EUR', 'USD')
+    assert store.values[1, store.code_index['USD'], 0] == 32.5
+    # Gelmeyen kurlar NaN kalır
+    assert np.isnan(store.values[1, store.code_index['EUR'], 0])
+
+
+def test_refresh_updates_existing_day_in_place(engine, insert, writer):
+    insert(date(2024, 5, 2), {'USD': 32.0})
+    with engine.connect() as connection:
+        writer.rebuild(connection)
+    first_file = data_file(writer)
+
+    with engine.begin() as connection:
+        connection.execute(doviz_kurlari.update().values(alis_kuru=31.0))
+        writer.refresh(connection, since=date(2024, 5, 2))
+
+    assert data_file(writer) == first_file
+    assert RateStoreReader(writer.directory).get().values[0, 0, 0] == 31.0
+
+
+@pytest.mark.parametrize('day, rates', [
+    (date(2024, 5, 6), {'GBP': 41.0}),
+    (date(2024, 5, 1), {'USD': 31.5}),
+])
+def test_refresh_rebuilds_on_new_code_or_older_day(engine, insert, writer, day, rates):
+    insert(date(2024, 5, 2), {'USD': 32.0})
+    insert(date(2024, 5, 3), {'USD': 32.5})
+    with engine.connect() as connection:
+        writer.rebuild(connection)
+    first_file = data_file(writer)
+
+    insert(day, rates)
+    with engine.connect() as connection:
+        writer.refresh(connection, since=day)
+
+    assert data_file(writer) != first_file
+    assert not os.path.exists(os.path.join(writer.directory, first_file))
+    store = RateStoreReader(writer.directory).get()
+    assert len(store.dates) == 3
+    assert set(rates) <= set(store.codes)
+
+
+def test_reader_reloads_after_refresh(engine, insert, writer):
+    reader = RateStoreReader(writer.directory)
+    assert reader.get() is None
+
+    insert(date(2024, 5, 2), {'USD': 32.0})
+    with engine.connect() as connection:
+        writer.refresh(connection)
+    assert len(reader.get().dates) == 1
+
+    insert(date(2024, 5, 3), {'USD': 32.5})
+    with engine.connect() as connection:
+        writer.refresh(connection)
+    assert len(reader.get().dates) == 2
+
+
+def test_store_position_and_date_range(engine, insert, writer):
+    for day in (date(2024, 5, 2), date(2024, 5, 3), date(2024, 5, 6)):
+        insert(day, {'USD': 32.0})
+    with engine.connect() as connection:
+        writer.rebuild(connection)
+    store = RateStoreReader(writer.directory).get()
+
+    # Hafta sonu, önceki iş gününe düşer
+    assert store.position(date(2024, 5, 5)) == 1
+    assert store.position(date(2024, 5, 1)) == -1
+    assert store.date_range(date(2024, 5, 3), date(2024, 5, 5)) == (1, 2)
+    assert store.date_range(None, date(2024, 5, 2)) == (0, 1)
+    assert store.date_range(date(2024, 5, 7)) == (3, 3)
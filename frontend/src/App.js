@@ -12,6 +12,9 @@ import {
   ArrowPathIcon
 } from '@heroicons/react/24/outline';
 
+// Canlı akış reddedilirse (503, sunucu bağlantı sınırı) yeniden deneme aralığı; Retry-After ile aynı
+const STREAM_RETRY_MS = 30000;
+
 function App() {
   const [rates, setRates] = useState([]);
   const [history, setHistory] = useState([]);
@@ -62,14 +65,30 @@ function App() {
     }
   };
 
+  const waitForJob = async (jobId, attempts = 60) => {
+    for (let i = 0; i < attempts; i++) {
+      const response = await axios.get(`${API_BASE}/api/rates/jobs/${jobId}`);
+      if (response.data.state === 'done' || response.data.state === 'failed') {
+        return response.data;
+      }
+      await new Promise((resolve) => setTimeout(resolve, 1000));
+    }
+    return { state: 'timeout', error: 'Güncelleme zaman aşımına uğradı' };
+  };
+
   const updateRates = async () => {
     try {
       setLoading(true);
-      await axios.post(`${API_BASE}/api/rates/update`);
+      // Güncelleme kuyruğa alınır, iş bitene kadar durumu sorgulanır
+      const response = await axios.post(`${API_BASE}/api/rates/update`);
+      const job = await waitForJob(response.data.job_id);
+      if (job.state !== 'done') {
+        throw new Error(job.error || 'Güncelleme işi tamamlanamadı');
+      }
       await fetchLatestRates();
       await fetchStats();
       await fetchCurrencies();
-      alert('Kurlar başarıyla güncellendi!');
+      alert(job.result?.message || 'Kurlar başarıyla güncellendi!');
     } catch (error) {
       alert('Kurlar güncellenirken hata oluştu!');
       console.error('Güncelleme hatası:', error);
@@ -141,13 +160,60 @@ function App() {
     fetchHistory(selectedCurrency);
   }, [selectedCurrency]);
 
-  // Otomatik yenileme (5 dakikada bir)
+  // Canlı güncelleme: kurlar yalnızca sunucu yeni veri yazdığında gönderilir
   useEffect(() => {
-    const interval = setInterval(() => {
-      fetchLatestRates();
-    }, 5 * 60 * 1000);
+    let source = null;
+    let retryTimer = null;
+    let disconnected = false;
 
-    return () => clearInterval(interval);
+    const handleRates = (event) => {
+      const update = JSON.parse(event.data);
+
+      if (update.type === 'full') {
+        // Yeni gün: tüm kurlar değişti
+        setRates(update.data);
+        fetchStats();
+        fetchCurrencies();
+      } else {
+        setRates((current) => {
+          const changed = new Map(update.changed.map((rate) => [rate.doviz_kodu, rate]));
+          const merged = current
+            .filter((rate) => !update.removed.includes(rate.doviz_kodu))
+            .map((rate) => changed.get(rate.doviz_kodu) || rate);
+          const known = new Set(merged.map((rate) => rate.doviz_kodu));
+          return merged.concat(update.changed.filter((rate) => !known.has(rate.doviz_kodu)));
+        });
+      }
+      setLastUpdate(new Date());
+    };
+
+    const connect = () => {
+      source = new EventSource(`${API_BASE}/api/rates/stream`);
+      source.addEventListener('rates', handleRates);
+
+      // Bağlantı koptuğu sırada kaçırılan güncellemeler için yeniden bağlanınca bir kez çek
+      source.onerror = () => {
+        disconnected = true;
+        // Sunucunun akış sınırı doluysa (503) tarayıcı kendisi yeniden bağlanmaz
+        if (source.readyState === EventSource.CLOSED) {
+          source.close();
+          retryTimer = setTimeout(connect, STREAM_RETRY_MS);
+        }
+      };
+      source.onopen = () => {
+        if (disconnected) {
+          disconnected = false;
+          fetchLatestRates();
+        }
+      };
+    };
+
+    connect();
+
+    return () => {
+      clearTimeout(retryTimer);
+      source.close();
+    };
   }, []);
 
   // Grafik verilerini hazırla
@@ -0,0 +1,202 @@
+"""TCMB arşivinden geçmiş döviz kurlarını toplu olarak yükler.
+
+Kullanım:
+    python backfill.py --start 2015-01-01 --end 2024-12-31 --workers 8
+    python backfill.py --start 2015-01-01 --end 2024-12-31 --archive kurlar.zip
+    python backfill.py --offline
+
+Günler ortak ``TCMBFetcher`` ile, eş zamanlı istek sayısı sınırlanarak ve tek
+bir bağlantı havuzu üzerinden paralel çekilir. ``--archive`` ile TCMB yerine
+yerel arşiv dizininden veya zip paketinden okunur. Daha önce çekilmiş günler
+ham XML arşivinden (``TCMB_ARCHIVE_DIR``) okunur; ``--offline`` ile ağa hiç
+çıkılmaz ve veritabanı yalnızca bu arşivden yeniden kurulur. İşlenen günler checkpoint dosyasına
+yazılır; yarıda kalan bir yükleme aynı komutla kaldığı yerden devam eder.
+"""
+import argparse
+import json
+import os
+from datetime import datetime, timedelta
+
+from common.db import UpsertResult, rate_rows
+from common.fetcher import TCMBFetcher
+from common.archive import ArchiveSource, RawArchive
+from common.parser import open_archive
+from metrics import observe_fetch, record_failure, time_ingest
+from scheduler import TCMBDataCollector, DatabaseManager, logger
+
+DEFAULT_CHECKPOINT = 'backfill_checkpoint.json'
+
+
+class BackfillCheckpoint:
+    """İşlenmiş (kaydedilmiş veya atlanmış) günleri diskte tutar"""
+
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        self.skipped = set()
+
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                state = json.load(f)
+            self.done = set(state.get('done', []))
+            self.skipped = set(state.get('skipped', []))
+
+    def is_processed(self, day):
+        key = day.isoformat()
+        return key in self.done or key in self.skipped
+
+    def mark_done(self, day):
+        self.done.add(day.isoformat())
+
+    def mark_skipped(self, day):
+        self.skipped.add(day.isoformat())
+
+    def save(self):
+        """Checkpoint'i yarım yazılmış dosya bırakmadan kaydeder"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'done': sorted(self.done), 'skipped': sorted(self.skipped)}, f)
+        os.replace(tmp_path, self.path)
+
+
+class BackfillJob:
+    def __init__(self, start, end, workers=8, batch_size=100, checkpoint_path=DEFAULT_CHECKPOINT, source=None):
+        self.start = start
+        self.end = end
+        self.workers = workers
+        self.batch_size = batch_size
+        self.checkpoint = BackfillCheckpoint(checkpoint_path)
+
+        # Bağlantı havuzu ve eş zamanlılık sınırı worker sayısı kadardır
+        self.collector = TCMBDataCollector(fetcher=TCMBFetcher(max_concurrency=workers, on_response=observe_fetch), source=source)
+        self.db_manager = DatabaseManager()
+
+    def pending_days(self):
+        """Hafta içi olup henüz işlenmemiş günleri döndürür"""
+        days = []
+        day = self.start
+        while day <= self.end:
+            # TCMB hafta sonu kur yayınlamaz, istek atmaya gerek yok
+            if day.weekday() < 5 and not self.checkpoint.is_processed(day):
+                days.append(day)
+            day += timedelta(days=1)
+        return days
+
+    def run(self):
+        """Geçmiş kurları paralel olarak çekip veritabanına kaydeder"""
+        with time_ingest('backfill'):
+            return self._run()
+
+    def _run(self):
+        days = self.pending_days()
+        logger.info(f"Backfill başladı: {self.start} - {self.end}, {len(days)} gün işlenecek")
+
+        inserted_count = 0
+        updated_count = 0
+        skipped_count = 0
+        failed_days = []
+
+        for offset in range(0, len(days), self.batch_size):
+            batch = days[offset:offset + self.batch_size]
+
+            fetched_days = []
+            rows = []
+            for day, rates in self.collector.fetch_many_rates(batch):
+                if isinstance(rates, Exception):
+                    logger.error(f"{day} çekilemedi: {rates}")
+                    failed_days.append(day)
+                    continue
+
+                if rates is None:
+                    # Resmi tatil, kur yayınlanmamış. Yerel arşivde olmayan gün
+                    # tatil olmayabilir, sonraki canlı yükleme için işaretlenmez.
+                    if self.collector.source.live:
+                        self.checkpoint.mark_skipped(day)
+                    skipped_count += 1
+                    continue
+
+                fetched_days.append(day)
+                rows.extend(rate_rows(rates, day))
+
+            # Bütün grup tek seferde COPY ile yazılır
+            try:
+                result = self.db_manager.write_rows(rows, use_copy=True)
+            except Exception as e:
+                logger.error(f"{len(fetched_days)} günlük grup kaydedilemedi: {e}")
+                failed_days.extend(fetched_days)
+            else:
+                inserted_count += result.inserted
+                updated_count += result.updated
+                for day in fetched_days:
+                    self.checkpoint.mark_done(day)
+
+            self.checkpoint.save()
+            logger.info(f"Backfill ilerlemesi: {min(offset + self.batch_size, len(days))}/{len(days)} gün")
+
+        # Depo ve güncelleme duyurusu yalnızca bir kez, yükleme sonunda yenilenir
+        if inserted_count or updated_count:
+            self.db_manager.refresh_store(self.start)
+            self.db_manager.publish_update()
+
+        logger.info(
+            f"Backfill tamamlandı. {inserted_count} yeni kayıt, {updated_count} güncelleme, "
+            f"{skipped_count} tatil günü atlandı, {len(failed_days)} gün başarısız"
+        )
+        if failed_days:
+            record_failure('backfill')
+            logger.warning("Başarısız günler için komutu tekrar çalıştırın, checkpoint kaldığı yerden devam eder")
+
+        return UpsertResult(inserted_count, updated_count)
+
+
+def parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='TCMB geçmiş döviz kurlarını toplu yükle')
+    parser.add_argument('--start', type=parse_date, help='Başlangıç tarihi (YYYY-MM-DD)')
+    parser.add_argument('--end', type=parse_date, help='Bitiş tarihi (YYYY-MM-DD)')
+    parser.add_argument('--workers', type=int, default=8, help='Eş zamanlı istek sayısı')
+    parser.add_argument('--batch-size', type=int, default=100, help='Checkpoint aralığı (gün)')
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT, help='Checkpoint dosyası')
+    parser.add_argument('--archive', help='TCMB yerine okunacak arşiv dizini veya zip dosyası')
+    parser.add_argument('--offline', action='store_true',
+                        help='Ağa çıkmadan yalnızca yerel ham XML arşivinden yükle')
+    args = parser.parse_args()
+
+    source = None
+    if args.archive:
+        try:
+            source = open_archive(args.archive)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+    elif args.offline:
+        raw_archive = RawArchive()
+        source = ArchiveSource(raw_archive)
+        # Tarih verilmezse arşivin tamamı yüklenir
+        archived = raw_archive.dates()
+        if archived:
+            args.start = args.start or archived[0]
+            args.end = args.end or archived[-1]
+
+    if not args.start or not args.end:
+        parser.error('--start ve --end gerekli')
+    if args.start > args.end:
+        parser.error('--start, --end tarihinden sonra olamaz')
+
+    DatabaseManager().ensure_schema()
+
+    job = BackfillJob(
+        args.start,
+        args.end,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        checkpoint_path=args.checkpoint,
+        source=source
+    )
+    job.run()
+
+
+if __name__ == "__main__":
+    main()
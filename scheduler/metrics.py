@@ -0,0 +1,80 @@
+"""Scheduler için Prometheus metrikleri.
+
+Veri toplama işlerinin süresi, yazılan kur satırı sayısı ve TCMB isteklerinin
+gecikmesi ``METRICS_PORT`` (varsayılan 9100) üzerinden ayrı bir HTTP
+sunucusuyla sunulur. Backfill komutu kısa ömürlü ayrı bir süreç olduğu için
+sunucu açmaz; değerleri yalnızca loglara yansır.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Histogram, start_http_server
+
+INGEST_DURATION = Histogram(
+    'doviz_scheduler_ingest_duration_seconds', 'Kur toplama işlerinin süresi',
+    ['job'],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 900, 1800)
+)
+
+INGEST_FAILURES = Counter(
+    'doviz_scheduler_ingest_failures_total', 'Veri yazamadan biten kur toplama işleri',
+    ['job']
+)
+
+ROWS_WRITTEN = Counter(
+    'doviz_scheduler_rows_written_total', 'Veritabanına yazılan kur satırları',
+    ['kind']
+)
+
+INGEST_UNCHANGED = Counter(
+    'doviz_scheduler_ingest_unchanged_total', 'İçeriği bir öncekiyle aynı olduğu için yazılmayan çekimler',
+    ['source']
+)
+
+FETCH_LATENCY = Histogram(
+    'doviz_scheduler_tcmb_fetch_duration_seconds', 'TCMB isteklerinin yanıt süresi',
+    ['status'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+
+
+def observe_fetch(status, seconds):
+    """``TCMBFetcher(on_response=...)`` için geri çağırım"""
+    FETCH_LATENCY.labels(str(status)).observe(seconds)
+
+
+def record_rows(result):
+    ROWS_WRITTEN.labels('inserted').inc(result.inserted)
+    ROWS_WRITTEN.labels('updated').inc(result.updated)
+
+
+def record_quotes(count):
+    ROWS_WRITTEN.labels('quotes').inc(count)
+
+
+def record_unchanged(source):
+    INGEST_UNCHANGED.labels(source).inc()
+
+
+def record_failure(job):
+    INGEST_FAILURES.labels(job).inc()
+
+
+@contextmanager
+def time_ingest(job):
+    """Bloğun süresini ölçer; istisnayla biterse iş başarısız sayılır"""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        record_failure(job)
+        raise
+    finally:
+        INGEST_DURATION.labels(job).observe(time.perf_counter() - started)
+
+
+def start_metrics_server():
+    port = int(os.getenv('METRICS_PORT', '9100'))
+    start_http_server(port)
+    return port
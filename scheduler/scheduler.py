@@ -2,16 +2,36 @@ import os
 import sys
 import time
 import logging
+import threading
 from datetime import datetime, timedelta
 from apscheduler.schedulers.blocking import BlockingScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 import pytz
 import requests
 import xml.etree.ElementTree as ET
-from sqlalchemy import create_engine, text
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 import redis
 
+from common.db import (
+    UpsertResult, insert_quotes, last_ingest_digest, load_latest_rates, metadata, rate_rows, record_ingest,
+    upsert_rates
+)
+from common.events import publish_quotes_update, publish_rates_update
+from common.fetcher import TCMBFetcher, TODAY_URL, daily_url
+from common.jobs import consume_jobs
+from common.parser import parse_rates
+from common.archive import ArchiveSource, RawArchive, store_quietly
+from common.migrations import apply_migrations
+from common.store import RateStoreWriter
+from common.retention import maintain_partitions
+from common.providers import load_source_configs
+from metrics import (
+    observe_fetch, record_failure, record_quotes, record_rows, record_unchanged, start_metrics_server, time_ingest
+)
+
 # Logging konfigürasyonu
 logging.basicConfig(
     level=logging.INFO,
@@ -34,126 +54,207 @@ redis_client = redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379'))
 # Türkiye saati
 turkey_tz = pytz.timezone('Europe/Istanbul')
 
+# Günlük toplama zamanı (crontab biçiminde, Türkiye saati)
+DAILY_CRON = os.getenv('DAILY_CRON', '0 4 * * *')
+
+# Günlük ve manuel güncellemenin ortak içerik özeti anahtarı (ingest_durumu)
+TCMB_SOURCE = 'tcmb'
+
+# Bölüm bakımı ve saklama süresi zamanı (crontab biçiminde, Türkiye saati)
+MAINTENANCE_CRON = os.getenv('MAINTENANCE_CRON', '30 3 * * *')
+
 class TCMBDataCollector:
-    def __init__(self):
-        self.base_url = "https://www.tcmb.gov.tr/kurlar"
+    def __init__(self, fetcher=None, source=None, archive=None):
+        # Bağlantı havuzlu, yeniden denemeli ortak HTTP istemcisi
+        self.fetcher = fetcher or TCMBFetcher(on_response=observe_fetch)
+        # Çekilen ham XML'ler yerel arşive yazılır, geçmiş günler önce oradan okunur
+        self.archive = archive or RawArchive()
+        # Toplu yüklemede arşiv yerine başka bir kaynak (dizin, zip) verilebilir
+        self.source = source or ArchiveSource(
+            self.archive, self.fetcher, today=lambda: datetime.now(turkey_tz).date()
+        )
     
-    def get_daily_rates(self, date=None):
-        """TCMB'den günlük döviz kurlarını çeker"""
-        if not date:
-            date = datetime.now(turkey_tz).strftime('%d%m%Y')
+    def fetch_bulletin(self, date):
+        """Tek bir günün bültenini (yayın tarihi, kurlar, içerik özeti) çeker, hataları çağırana iletir.
+        
+        Hafta sonu ve resmi tatillerde TCMB dosya yayınlamaz (404), bu durumda None döner.
+        """
+        with self.source.open(date) as stream:
+            if stream is None:
+                return None
+            return parse_rates(stream)
+    
+    def fetch_rates(self, date):
+        """Tek bir günün kurlarını çeker; yayınlanmamışsa None döner"""
+        bulletin = self.fetch_bulletin(date)
+        return bulletin.rates if bulletin is not None else None
+    
+    def fetch_today_rates(self):
+        """TCMB'nin güncel bültenini (today.xml) çeker, hataları çağırana iletir.
+        
+        Hafta sonu ve tatillerde dosya son iş gününün kurlarını içerir; yazım
+        bugünün değil bültenin yayın tarihiyle yapılmalıdır.
+        """
+        result = self.fetcher.fetch(TODAY_URL, conditional=False)
         
-        year = date[:4]
-        month = date[4:6]
+        if result.status != 200:
+            raise requests.exceptions.HTTPError(f"TCMB yanıtı: {result.status}")
         
-        url = f"{self.base_url}/{year}/{month}/{date}.xml"
+        parsed = parse_rates(result.content)
+        # Dosya adında tarih olmadığı için bülten tarihiyle arşivlenir
+        if parsed.tarih:
+            store_quietly(self.archive, parsed.tarih, result.content)
+        return parsed
+    
+    def fetch_many_rates(self, dates):
+        """Günleri kaynağın eş zamanlılık sınırı içinde paralel çeker.
+        
+        Tamamlanma sırasıyla (gün, kurlar | None | istisna) üretir.
+        """
+        with ThreadPoolExecutor(max_workers=self.source.concurrency) as pool:
+            futures = {pool.submit(self.fetch_rates, date): date for date in dates}
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result()
+                except Exception as e:
+                    yield futures[future], e
+    
+    def get_daily_bulletin(self, date=None):
+        """TCMB'den günlük bülteni çeker; alınamazsa None döner"""
+        if not date:
+            date = datetime.now(turkey_tz).date()
         
         try:
-            logger.info(f"TCMB'den veri çekiliyor: {url}")
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-            
-            # XML'i parse et
-            root = ET.fromstring(response.content)
+            logger.info(f"TCMB'den veri çekiliyor: {daily_url(date)}")
+            bulletin = self.fetch_bulletin(date)
             
-            rates = []
-            for currency in root.findall('.//Currency'):
-                code = currency.get('Kod')
-                name = currency.find('Isim').text
-                
-                # Sayısal değerleri güvenli şekilde al
-                forex_buying = self._safe_float(currency.find('ForexBuying').text)
-                forex_selling = self._safe_float(currency.find('ForexSelling').text)
-                banknote_buying = self._safe_float(currency.find('BanknoteBuying').text)
-                banknote_selling = self._safe_float(currency.find('BanknoteSelling').text)
-                
-                if forex_buying > 0:  # Sadece geçerli kurları al
-                    rates.append({
-                        'doviz_kodu': code,
-                        'doviz_adi': name,
-                        'alis_kuru': forex_buying,
-                        'satis_kuru': forex_selling,
-                        'efektif_alis': banknote_buying,
-                        'efektif_satis': banknote_selling
-                    })
+            if bulletin is None:
+                logger.warning(f"{date} için TCMB kur dosyası yayınlanmamış")
+                return None
             
-            logger.info(f"{len(rates)} adet döviz kuru çekildi")
-            return rates
+            logger.info(f"{len(bulletin.rates)} adet döviz kuru çekildi")
+            return bulletin
             
         except requests.exceptions.RequestException as e:
             logger.error(f"TCMB API hatası: {e}")
-            return []
+            return None
         except ET.ParseError as e:
             logger.error(f"XML parse hatası: {e}")
-            return []
+            return None
         except Exception as e:
             logger.error(f"Beklenmeyen hata: {e}")
-            return []
-    
-    def _safe_float(self, value):
-        """Güvenli float dönüşümü"""
-        try:
-            return float(value) if value else 0.0
-        except (ValueError, TypeError):
-            return 0.0
+            return None
 
 class DatabaseManager:
     def __init__(self):
         self.engine = engine
         self.SessionLocal = SessionLocal
     
-    def save_rates(self, rates, date):
-        """Döviz kurlarını veritabanına kaydet"""
-        session = self.SessionLocal()
+    def ensure_schema(self):
+        """Eksik tabloları oluşturur ve bekleyen migrasyonları uygular"""
+        metadata.create_all(self.engine)
+        with self.engine.begin() as connection:
+            applied = apply_migrations(connection)
+        if applied:
+            logger.info(f"Migrasyonlar uygulandı: {applied}")
+    
+    def ingest_bulletin(self, bulletin, kaynak=TCMB_SOURCE):
+        """Bülteni yayın tarihiyle yazar, hataları çağırana iletir.
         
+        İçerik kaynaktan en son alınanla aynıysa yazmadan None döndürür. Yeni
+        içeriğin özeti kurlarla aynı transaction'da kaydedilir.
+        """
+        with self.engine.begin() as connection:
+            if last_ingest_digest(connection, kaynak) == bulletin.digest:
+                record_unchanged(kaynak)
+                return None
+            result = upsert_rates(connection, rate_rows(bulletin.rates, bulletin.tarih))
+            record_ingest(connection, kaynak, bulletin.digest, bulletin.tarih)
+        record_rows(result)
+        return result
+    
+    def write_rows(self, rows, use_copy=None):
+        """Tarih içeren kur satırlarını tek transaction'da toplu olarak yazar"""
+        with self.engine.begin() as connection:
+            result = upsert_rates(connection, rows, use_copy=use_copy)
+        record_rows(result)
+        return result
+    
+    def last_digest(self, kaynak):
+        """Kaynaktan en son işlenen içeriğin özeti"""
+        with self.engine.connect() as connection:
+            return last_ingest_digest(connection, kaynak)
+    
+    def insert_quotes(self, feed, kaynak):
+        """Gün içi kotasyonları ve içerik özetini kısa bir transaction'da ekler, eklenen sayısını döndürür"""
+        with self.engine.begin() as connection:
+            inserted = insert_quotes(connection, feed.quotes)
+            record_ingest(connection, kaynak, feed.digest)
+        record_quotes(inserted)
+        return inserted
+    
+    def refresh_store(self, since=None, rebuild=False):
+        """API'nin okuduğu mmap kur deposunu ``since`` gününden itibaren (veya baştan) günceller"""
         try:
-            saved_count = 0
-            
-            for rate_data in rates:
-                # Veritabanında var mı kontrol et
-                existing = session.execute(
-                    text("SELECT id FROM doviz_kurlari WHERE tarih = :tarih AND doviz_kodu = :doviz_kodu"),
-                    {"tarih": date, "doviz_kodu": rate_data['doviz_kodu']}
-                ).first()
-                
-                if not existing:
-                    # Yeni kayıt ekle
-                    session.execute(
-                        text("""
-                            INSERT INTO doviz_kurlari 
-                            (tarih, doviz_kodu, doviz_adi, alis_kuru, satis_kuru, efektif_alis, efektif_satis, created_at)
-                            VALUES (:tarih, :doviz_kodu, :doviz_adi, :alis_kuru, :satis_kuru, :efektif_alis, :efektif_satis, :created_at)
-                        """),
-                        {
-                            "tarih": date,
-                            "doviz_kodu": rate_data['doviz_kodu'],
-                            "doviz_adi": rate_data['doviz_adi'],
-                            "alis_kuru": rate_data['alis_kuru'],
-                            "satis_kuru": rate_data['satis_kuru'],
-                            "efektif_alis": rate_data['efektif_alis'],
-                            "efektif_satis": rate_data['efektif_satis'],
-                            "created_at": datetime.now()
-                        }
-                    )
-                    saved_count += 1
-            
-            session.commit()
-            logger.info(f"{saved_count} yeni döviz kuru kaydedildi")
-            
-            # Cache'i temizle
-            redis_client.delete('latest_rates')
-            
-            return saved_count
-            
+            with self.engine.connect() as connection:
+                writer = RateStoreWriter()
+                days = writer.rebuild(connection) if rebuild else writer.refresh(connection, since)
+        except Exception as e:
+            logger.error(f"Kur deposu güncellenemedi: {e}")
+            return
+        logger.info(f"Kur deposu güncellendi: {days} gün")
+    
+    def maintain_partitions(self):
+        """Bölümleri açar ve saklama süresi dolan ham veriyi siler; silinen yılları döndürür"""
+        with self.engine.begin() as connection:
+            dropped = maintain_partitions(connection)
+        
+        # Depo yalnızca ekleyerek güncellendiği için silinen günlerden sonra baştan kurulur
+        if dropped:
+            self.refresh_store(rebuild=True)
+            self.publish_update()
+        return dropped
+    
+    def publish_update(self, date=None):
+        """Kur sürümünü artırır; API'lerin ıskalamaması için latest_rates yeni kurlarla doldurulur"""
+        try:
+            started = time.perf_counter()
+            with self.engine.connect() as connection:
+                latest = load_latest_rates(connection)
+            load_seconds = time.perf_counter() - started
+        except Exception as e:
+            # Okunamazsa anahtar silinir, API ilk istekte kendisi yükler
+            logger.error(f"Güncel kurlar okunamadı: {e}")
+            latest, load_seconds = None, 0.0
+        publish_rates_update(redis_client, date, latest=latest, load_seconds=load_seconds)
+    
+    def save_rates(self, bulletin):
+        """Bülteni veritabanına kaydet; içerik değişmemişse None döner"""
+        try:
+            result = self.ingest_bulletin(bulletin)
         except Exception as e:
-            session.rollback()
             logger.error(f"Veritabanı hatası: {e}")
-            return 0
-        finally:
-            session.close()
+            return UpsertResult(0, 0)
+        
+        if result is None:
+            logger.info(f"{bulletin.tarih} bülteni son alınanla aynı, yazım atlandı")
+            return None
+        
+        logger.info(f"{result.inserted} yeni döviz kuru kaydedildi, {result.updated} kur güncellendi")
+        
+        # Değişiklik varsa depoyu güncelle ve API süreçlerine duyur
+        if result.inserted or result.updated:
+            self.refresh_store(bulletin.tarih)
+            self.publish_update(bulletin.tarih)
+        
+        return result
 
 def collect_daily_rates():
     """Günlük döviz kurlarını topla ve kaydet"""
+    with time_ingest('daily'):
+        _collect_daily_rates()
+
+def _collect_daily_rates():
     logger.info("Günlük döviz kuru toplama işlemi başladı")
     
     collector = TCMBDataCollector()
@@ -163,30 +264,173 @@ def collect_daily_rates():
     today = datetime.now(turkey_tz).date()
     
     # TCMB'den veri çek
-    rates = collector.get_daily_rates()
+    bulletin = collector.get_daily_bulletin(today)
     
-    if rates:
-        # Veritabanına kaydet
-        saved_count = db_manager.save_rates(rates, today)
-        logger.info(f"İşlem tamamlandı. {saved_count} yeni kayıt eklendi.")
+    if bulletin and bulletin.rates:
+        # Veritabanına bültenin yayın tarihiyle kaydet (okunamadıysa istenen gün)
+        result = db_manager.save_rates(bulletin._replace(tarih=bulletin.tarih or today))
+        if result is not None:
+            logger.info(f"İşlem tamamlandı. {result.inserted} yeni kayıt eklendi, {result.updated} kayıt güncellendi.")
     else:
         logger.warning("TCMB'den veri çekilemedi")
+        record_failure('daily')
+
+def run_maintenance():
+    """Günlük bölüm bakımı; hatalar loglanır"""
+    try:
+        with time_ingest('maintenance'):
+            DatabaseManager().maintain_partitions()
+    except Exception as e:
+        logger.error(f"Bölüm bakımı başarısız: {e}")
+
+def run_manual_update():
+    """API'den kuyruğa alınan manuel güncelleme işini çalıştırır.
+    
+    Hatalar iş kaydına yazılması için çağırana iletilir.
+    """
+    logger.info("Manuel döviz kuru güncellemesi başladı")
+    
+    collector = TCMBDataCollector()
+    db_manager = DatabaseManager()
+    today = datetime.now(turkey_tz).date()
+    
+    bulletin = collector.fetch_today_rates()
+    if not bulletin.rates:
+        raise ValueError("TCMB'den veri çekilemedi")
+    
+    # Hafta sonu today.xml cuma gününün kurlarını içerir, bugünün tarihiyle yazılmaz
+    bulletin = bulletin._replace(tarih=bulletin.tarih or today)
+    tarih = bulletin.tarih.strftime('%Y-%m-%d')
+    
+    result = db_manager.ingest_bulletin(bulletin)
+    if result is None:
+        logger.info(f"{tarih} bülteni son alınanla aynı, yazım atlandı")
+        return {
+            'message': f'{tarih} kurları değişmemiş, yazım yapılmadı',
+            'inserted': 0,
+            'updated': 0,
+            'date': tarih,
+            'unchanged': True
+        }
+    
+    logger.info(f"{result.inserted} yeni döviz kuru kaydedildi, {result.updated} kur güncellendi")
+    
+    if result.inserted or result.updated:
+        db_manager.refresh_store(bulletin.tarih)
+        db_manager.publish_update(bulletin.tarih)
+    
+    return {
+        'message': f'{result.inserted} yeni kur kaydedildi, {result.updated} kur güncellendi',
+        'inserted': result.inserted,
+        'updated': result.updated,
+        'date': tarih
+    }
+
+def collect_intraday_quotes(provider):
+    """Gün içi kaynağın kotasyonlarını çeker ve ekler; hatalar loglanır"""
+    try:
+        with time_ingest(f'intraday_{provider.name}'):
+            _collect_intraday_quotes(provider)
+    except Exception as e:
+        logger.error(f"{provider.name} kaynağından kotasyon alınamadı: {e}")
+
+def _collect_intraday_quotes(provider):
+    db_manager = DatabaseManager()
+    kaynak = f'intraday:{provider.name}'
+    
+    # 304 veya bir önceki çekimle aynı içerik; yazım ve bildirim yapılmaz
+    feed = provider.fetch(db_manager.last_digest(kaynak))
+    if feed is None:
+        record_unchanged(kaynak)
+        logger.debug(f"{provider.name} kaynağında değişiklik yok")
+        return
+    
+    inserted = db_manager.insert_quotes(feed, kaynak)
+    if inserted:
+        logger.info(f"{provider.name}: {inserted} yeni kotasyon kaydedildi")
+        publish_quotes_update(redis_client, provider.name, inserted)
+
+def add_intraday_jobs(scheduler):
+    """Yapılandırılmış gün içi kaynakları kendi aralıklarıyla zamanlar"""
+    fetcher = TCMBFetcher(on_response=observe_fetch)
+    configs = load_source_configs(fetcher)
+    
+    for config in configs:
+        if config.cron:
+            trigger = CronTrigger.from_crontab(config.cron, timezone=turkey_tz)
+            next_run_time = None
+        else:
+            trigger = IntervalTrigger(seconds=config.interval, timezone=turkey_tz)
+            # Aralıklı kaynaklar başlangıçta bir kez hemen çalışır
+            next_run_time = datetime.now(turkey_tz)
+        
+        scheduler.add_job(
+            collect_intraday_quotes,
+            trigger,
+            args=[config.provider],
+            id=f'intraday_{config.provider.name}',
+            name=f'Gün içi kotasyon: {config.provider.name}',
+            # Yavaş bir kaynağın çekimleri üst üste binmez, kaçanlar tek seferde telafi edilir
+            max_instances=1,
+            coalesce=True,
+            next_run_time=next_run_time,
+            replace_existing=True
+        )
+        logger.info(f"Gün içi kaynak zamanlandı: {config.provider.name} ({config.cron or f'{config.interval} sn'})")
+    
+    return configs
+
+def timed_manual_update():
+    with time_ingest('manual'):
+        return run_manual_update()
+
+def start_job_worker():
+    """Manuel güncelleme kuyruğunu dinleyen arka plan thread'ini başlatır"""
+    worker = threading.Thread(
+        target=consume_jobs,
+        args=(redis_client, timed_manual_update),
+        kwargs={'logger': logger},
+        name='rate-update-jobs',
+        daemon=True
+    )
+    worker.start()
+    return worker
 
 def main():
     """Ana scheduler fonksiyonu"""
     logger.info("Döviz kuru scheduler başlatılıyor...")
     
+    db_manager = DatabaseManager()
+    db_manager.ensure_schema()
+    # Depo yoksa kurulur, varsa son günden sonrası eklenir
+    db_manager.refresh_store()
+    
+    port = start_metrics_server()
+    logger.info(f"Metrikler {port} portunda sunuluyor")
+    
+    # API'nin kuyruğa aldığı manuel güncellemeler
+    start_job_worker()
+    
     scheduler = BlockingScheduler(timezone=turkey_tz)
     
-    # Her gün saat 04:00'da çalıştır
+    # Varsayılan olarak her gün saat 04:00'da çalıştır
     scheduler.add_job(
         collect_daily_rates,
-        CronTrigger(hour=4, minute=0, timezone=turkey_tz),
+        CronTrigger.from_crontab(DAILY_CRON, timezone=turkey_tz),
         id='daily_rate_collection',
         name='Günlük döviz kuru toplama',
         replace_existing=True
     )
     
+    # Gelecek yılın bölümü önceden açılır, RAW_RETENTION_YEARS verildiyse eski yıllar silinir
+    scheduler.add_job(
+        run_maintenance,
+        CronTrigger.from_crontab(MAINTENANCE_CRON, timezone=turkey_tz),
+        id='partition_maintenance',
+        name='Bölüm bakımı ve saklama süresi',
+        replace_existing=True
+    )
+    
     # Test modu için (geliştirme sırasında kullanılabilir)
     # scheduler.add_job(
     #     collect_daily_rates,
@@ -197,7 +441,10 @@ def main():
     #     replace_existing=True
     # )
     
-    logger.info("Scheduler başlatıldı. Her gün saat 04:00'da çalışacak.")
+    # Gün içi kaynaklar (INTRADAY_SOURCES)
+    add_intraday_jobs(scheduler)
+    
+    logger.info(f"Scheduler başlatıldı. Günlük toplama zamanı: {DAILY_CRON}")
     
     try:
         scheduler.start()
@@ -0,0 +1,39 @@
+"""Scheduler testleri için ortak ayarlar.
+
+Modüller Docker imajındaki düzende (scheduler dizini ve ``common`` paketi
+import yolunda) yüklenir. Veritabanı, arşiv ve kur deposu geçici dizinlere
+yönlendirilir; testler ağa, Postgres'e ve Redis'e bağlanmaz.
+"""
+import os
+import sys
+import tempfile
+
+SCHEDULER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROOT_DIR = os.path.dirname(SCHEDULER_DIR)
+
+_tmp = tempfile.mkdtemp(prefix='doviz-scheduler-test-')
+os.environ['DATABASE_URL'] = f'sqlite:///{_tmp}/test.db'
+os.environ['REDIS_URL'] = 'redis://127.0.0.1:1'
+os.environ['TCMB_ARCHIVE_DIR'] = os.path.join(_tmp, 'tcmb_archive')
+os.environ['RATE_STORE_DIR'] = os.path.join(_tmp, 'rate_store')
+
+for path in (ROOT_DIR, SCHEDULER_DIR):
+    if path in sys.path:
+        sys.path.remove(path)
+    sys.path.insert(0, path)
+
+# Backend testleriyle aynı oturumda backend'in metrics modülü yüklenmiş olabilir
+module = sys.modules.get('metrics')
+if module is not None and os.path.dirname(os.path.abspath(module.__file__)) != SCHEDULER_DIR:
+    del sys.modules['metrics']
+
+# metrics'i kullanan modüller burada yüklenir; ardından backend conftest'i import yolunu
+# değiştirse de doğru modüle bağlı kalırlar. scheduler.py içe aktarılırken çalışma
+# dizinine scheduler.log açar; dosya geçici dizinde oluşsun
+_cwd = os.getcwd()
+os.chdir(_tmp)
+try:
+    import scheduler  # noqa: F401
+    import backfill  # noqa: F401
+finally:
+    os.chdir(_cwd)
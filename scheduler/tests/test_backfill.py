@@ -0,0 +1,43 @@
+from datetime import date
+
+from backfill import BackfillCheckpoint, BackfillJob
+
+
+def make_job(tmp_path, start, end):
+    return BackfillJob(start, end, workers=2, checkpoint_path=str(tmp_path / 'checkpoint.json'))
+
+
+def test_pending_days_skips_weekends(tmp_path):
+    # 2024-05-03 cuma, 2024-05-06 pazartesi
+    job = make_job(tmp_path, date(2024, 5, 3), date(2024, 5, 7))
+
+    assert job.pending_days() == [date(2024, 5, 3), date(2024, 5, 6), date(2024, 5, 7)]
+
+
+def test_pending_days_skips_processed_days(tmp_path):
+    job = make_job(tmp_path, date(2024, 5, 6), date(2024, 5, 10))
+    job.checkpoint.mark_done(date(2024, 5, 7))
+    job.checkpoint.mark_skipped(date(2024, 5, 9))
+
+    assert job.pending_days() == [date(2024, 5, 6), date(2024, 5, 8), date(2024, 5, 10)]
+
+
+def test_checkpoint_round_trip(tmp_path):
+    path = str(tmp_path / 'checkpoint.json')
+    checkpoint = BackfillCheckpoint(path)
+    checkpoint.mark_done(date(2024, 1, 2))
+    checkpoint.mark_skipped(date(2024, 1, 1))
+    checkpoint.save()
+
+    restored = BackfillCheckpoint(path)
+    assert restored.is_processed(date(2024, 1, 2))
+    assert restored.is_processed(date(2024, 1, 1))
+    assert not restored.is_processed(date(2024, 1, 3))
+    assert not (tmp_path / 'checkpoint.json.tmp').exists()
+
+
+def test_checkpoint_missing_file_is_empty(tmp_path):
+    checkpoint = BackfillCheckpoint(str(tmp_path / 'missing.json'))
+
+    assert checkpoint.done == set()
+    assert checkpoint.skipped == set()
@@ -0,0 +1,33 @@
+from contextlib import contextmanager
+from datetime import date
+import xml.etree.ElementTree as ET
+
+import pytest
+import requests
+
+from scheduler import TCMBDataCollector
+
+
+class FailingSource:
+    def __init__(self, error):
+        self.error = error
+
+    @contextmanager
+    def open(self, day):
+        if self.error is None:
+            # Hafta sonu/tatil: dosya yayınlanmamış
+            yield None
+            return
+        raise self.error
+
+
+@pytest.mark.parametrize('error', [
+    None,
+    requests.exceptions.ConnectionError('bağlantı koptu'),
+    ET.ParseError('bozuk XML'),
+    RuntimeError('beklenmeyen'),
+])
+def test_daily_bulletin_is_none_on_every_failure(error):
+    collector = TCMBDataCollector(fetcher=object(), source=FailingSource(error), archive=object())
+
+    assert collector.get_daily_bulletin(date(2024, 5, 4)) is None